@@ -30,6 +30,8 @@
 /*********************************************************************************************************************/
 #include "IfxAsclin_Asc.h"
 #include "IfxCpu_Irq.h"
+#include "IfxStm.h"
+#include "ASCLIN_UART.h"
 #include <stdarg.h>
 #include <stdio.h>
 #include <string.h>
@@ -68,6 +70,9 @@ uint8 g_rxData[SIZE] = {''};
 /* Size of the message */
 Ifx_SizeT g_count = sizeof(g_txData);
 
+/* Sequence number of the next binary telemetry frame */
+static uint16 g_frameSeq = 0;
+
 /*********************************************************************************************************************/
 /*---------------------------------------------Function Implementations----------------------------------------------*/
 /*********************************************************************************************************************/
@@ -149,4 +154,57 @@ void send_UART(const char *format, ...)
     IfxAsclin_Asc_write(&g_ascHandle, buffer, &size, TIME_INFINITE);
 }
 
+/* CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF), bitwise to avoid a 512 byte table */
+static uint16 crc16_ccitt(const uint8 *data, Ifx_SizeT length)
+{
+    uint16 crc = 0xFFFFu;
+    Ifx_SizeT i;
+    uint8 bit;
+    for (i = 0; i < length; i++)
+    {
+        crc ^= (uint16)((uint16)data[i] << 8);
+        for (bit = 0; bit < 8; bit++)
+        {
+            crc = (crc & 0x8000u) ? (uint16)((crc << 1) ^ 0x1021u) : (uint16)(crc << 1);
+        }
+    }
+    return crc;
+}
+
+/* Send raw ADC results as one compact binary frame (see ASCLIN_UART.h for the layout).
+ * 13 bytes for one channel instead of ~50 ASCII bytes, and no floating point formatting on the MCU. */
+void send_UART_frame(const uint16 *values, uint8 count)
+{
+    uint8 frame[2 + 2 + 4 + 1 + 2 * UART_FRAME_MAX_CHANNELS + 2];
+    uint32 tick = IfxStm_getLower(&MODULE_STM0);
+    Ifx_SizeT size = 0;
+    uint16 crc;
+    uint8 ch;
 
+    if (count > UART_FRAME_MAX_CHANNELS)
+    {
+        count = UART_FRAME_MAX_CHANNELS;
+    }
+
+    frame[size++] = UART_FRAME_SYNC0;
+    frame[size++] = UART_FRAME_SYNC1;
+    frame[size++] = (uint8)(g_frameSeq & 0xFFu);
+    frame[size++] = (uint8)(g_frameSeq >> 8);
+    frame[size++] = (uint8)(tick & 0xFFu);
+    frame[size++] = (uint8)((tick >> 8) & 0xFFu);
+    frame[size++] = (uint8)((tick >> 16) & 0xFFu);
+    frame[size++] = (uint8)(tick >> 24);
+    frame[size++] = count;
+    for (ch = 0; ch < count; ch++)
+    {
+        frame[size++] = (uint8)(values[ch] & 0xFFu);
+        frame[size++] = (uint8)(values[ch] >> 8);
+    }
+
+    crc = crc16_ccitt(&frame[2], size - 2);
+    frame[size++] = (uint8)(crc & 0xFFu);
+    frame[size++] = (uint8)(crc >> 8);
+
+    g_frameSeq++;
+    IfxAsclin_Asc_write(&g_ascHandle, frame, &size, TIME_INFINITE);
+}
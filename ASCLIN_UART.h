@@ -27,6 +27,16 @@
 #ifndef ASCLIN_UART_H_
 #define ASCLIN_UART_H_
 
+/*********************************************************************************************************************/
+/*------------------------------------------------------Macros-------------------------------------------------------*/
+/*********************************************************************************************************************/
+/* Binary telemetry frame (little-endian), decoded by Tools/cocowatt/binproto.py:
+ *   sync word A5 5A | uint16 sequence | uint32 STM0 tick | uint8 channel count N | uint16 raw[N] | uint16 CRC
+ * The CRC is CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF) over everything between the sync word and the CRC. */
+#define UART_FRAME_SYNC0        0xA5
+#define UART_FRAME_SYNC1        0x5A
+#define UART_FRAME_MAX_CHANNELS 8
+
 /*********************************************************************************************************************/
 /*------------------------------------------------Function Prototypes------------------------------------------------*/
 /*********************************************************************************************************************/
@@ -35,5 +45,6 @@ void send_receive_ASCLIN_UART_message(void); /* Send and receive function */
 void send_ASCLIN_UART_message(void);
 void send_receive_UART(uint8 *Locu8_Data,Ifx_SizeT Locu8_Size);
 void send_UART(const char *format, ...);
+void send_UART_frame(const uint16 *values, uint8 count);   /* Send one binary telemetry frame */
 
 #endif /* ASCLIN_UART_H_ */
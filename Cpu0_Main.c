@@ -60,6 +60,7 @@ unsigned int RESULTReg = 0u;
 
 #define ADC_RESOLUTION 4096   // 12-bit -> 2^12 = 4096 steps
 #define VREF_MV 5000          // Max voltage reference in millivolts (5000mV = 5.0V)
+#define TELEMETRY_BINARY 0    // 1: send_UART_frame() binary frames, 0: ASCII text lines
 
 /*********************************************************************************************************************/
 /*-------------------------------------------- Utility Functions ----------------------------------------------------*/
@@ -110,6 +111,11 @@ int core0_main(void)
         /* Update LEDs depending on the measured value */
         RESULTReg = indicateConversionValue();
 
+#if TELEMETRY_BINARY
+        /* Send the raw 12-bit result; the monitor does the mV/V conversion */
+        uint16 raw = (uint16)RESULTReg;
+        send_UART_frame(&raw, 1);
+#else
         /* Convert ADC bits to mV */
         unsigned int mv = adcToMilliVolt(RESULTReg);
 
@@ -122,6 +128,7 @@ int core0_main(void)
 
         // Print the converted voltage in volts with 3 decimal places (e.g., 2.345 V)
         send_UART("ADC Volt: %.3f V\n\r", mv / 1000.0f);
+#endif
 
         wait(ticksFor100ms);
     }
@@ -1,20 +1,42 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog, colorchooser, font
+import os
 import serial
 import serial.tools.list_ports
+import csv
 import threading
 import time
-import queue
-import csv
 from datetime import datetime
-import re
-import matplotlib
-matplotlib.use("TkAgg")
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-from matplotlib.figure import Figure
 from collections import deque
-import math
-from PIL import Image, ImageTk
+# matplotlib, PIL, the plotting/spectrum/import modules and the multi-port dashboard are imported by the
+# tabs and dialogs that need them, so the window comes up before any of them load
+from cocowatt.engine import CaptureEngine, DEFAULT_PATTERNS, READER_MODES, PARITY, STOPBITS, BYTESIZE
+from cocowatt.sessionlog import SessionLogger
+from cocowatt.clock import now_ns, from_epoch, format_ns
+from cocowatt.logview import VirtualLogView
+from cocowatt.icon import cached_icon
+
+FRAME_INTERVAL_MS = 33  # ~30 fps UI refresh budget
+FRAME_MAX_LINES = 10_000  # Lines taken per frame; after a stall the backlog is worked off over several frames
+RX_VIEW_MAX_LINES = 1_000_000  # Lines kept in the RX terminal; only the visible window is rendered
+IMPORT_VIEW_LINES = 100_000  # Last imported lines shown in the RX terminal; the graph gets the history capacity
+IMPORT_POLL_MS = 100
+SPECTRUM_REFRESH_MS = 250  # Spectrum recompute period while its tab is visible
+STATS_REFRESH_S = 0.5  # Statistics table refresh; the numbers themselves are updated per sample
+METRICS_REFRESH_MS = 1000  # Metrics tab refresh while it is visible
+SHARED_BACKLOG_LINES = 10_000  # Recent lines shown when attaching to a background capture that is already running
+CAPTURE_MODES = ["In-process", "Background"]
+LOGO_PATH = "cocowatt_logo.png"
+
+
+def tk_matplotlib():
+    """``(Figure, FigureCanvasTkAgg, NavigationToolbar2Tk)``, importing matplotlib on first use."""
+    import matplotlib
+    matplotlib.use("TkAgg")
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+    from matplotlib.figure import Figure
+    return Figure, FigureCanvasTkAgg, NavigationToolbar2Tk
+
 
 class SerialTerminalApp:
     def __init__(self, root):
@@ -23,31 +45,41 @@ class SerialTerminalApp:
         self.root.geometry("1100x750")
         self.root.configure(bg="white")
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-        # Set window icon
+        # Set window icon; the 32 px copy is made once, Tk reads the cached PNG itself
         try:
-            logo_path = "cocowatt_logo.png"
-            original_logo = Image.open(logo_path)
-            resized_logo = original_logo.resize((32, 32), Image.LANCZOS)
-            self.icon_image = ImageTk.PhotoImage(resized_logo)
+            self.icon_image = tk.PhotoImage(file=cached_icon(LOGO_PATH))
             self.root.iconphoto(True, self.icon_image)
         except Exception:
             pass
         # State
-        self.serial_conn = None
-        self.running = False
-        self.data_queue = queue.Queue()
-        self.display_data = []
-        self._last_display_count = 0  # Track received messages
-        self.last_activity = time.time()
+        self.engine = CaptureEngine()
+        self.register_ui_metrics(self.engine.metrics)
         self.auto_scroll = True
-        self.buffer = ""
+        # Next display_data sequence number the RX view has not shown yet
+        self.rx_seq = 0
+        self.view_skipped = 0
+        self.coalesced_lines = 0
+        self.dropped_frames = 0
+        self._last_frame_time = None
+        self._frame_job = None
+        self._zoom_job = None
+        # Live graph view: following the data, or held on a window the user zoomed/panned to
+        self._graph_zoomed = False
+        self._graph_t0 = 0.0
+        self._graph_follow_xlim = None
+        self._graph_own_limits = False
         self.current_theme = "light"
         self.auto_clear_on_connect = False
         # New features
         self.command_history = []
         self.history_index = -1
         self.session_log_file = None
-        self._last_rx_count = 0
+        self.csv_import = None
+        self.search_window = None
+        self._metrics_job = None
+        self._spectrum_job = None
+        self._pending_tabs = {}
+        self._stats_time = 0.0
         # Theme colors
         self.theme_colors = {
             "light": {
@@ -68,18 +100,46 @@ class SerialTerminalApp:
         # Parser config
         self.parser_entries = []
         self.parser_labels = []
-        self.parser_values = {}
-        self.parser_history = {}
-        self.max_history = 2000
-        self.default_parsers = ["ADC Volt:", "ADC Volt2:"]
+        self.default_parsers = list(DEFAULT_PATTERNS)
         self.current_font = ("Consolas", 10)
         self.parser_colors = ['#4CAF50', '#2196F3', '#FF9800', '#9C27B0', '#FF5722', '#00BCD4', '#8BC34A', '#E91E63']
         # Session log (will be opened conditionally)
         self.session_log_file = None
-        self.session_log_writer = None
+        # Options other code reads whether or not their tab has been built yet
+        self.replay_speed_var = tk.StringVar(value="1x")
+        self.graph_auto_var = tk.BooleanVar(value=True)
+        self.graph_live_var = tk.BooleanVar(value=True)
+        self.stats_samples_var = tk.StringVar(value=str(self.engine.stats_window[0]))
+        self.stats_seconds_var = tk.StringVar(value=f"{self.engine.stats_window[1]:g}")
+        self.accent_color_var = tk.StringVar(value=self.theme_colors[self.current_theme]["accent"])
+        self.auto_clear_var = tk.BooleanVar(value=self.auto_clear_on_connect)
+        self.history_var = tk.StringVar(value=str(self.engine.max_history))
+        self.retention_var = tk.StringVar(value=str(self.engine.max_display))
+        self.session_log_var = tk.BooleanVar(value=True)  # Default ON
         self.create_widgets()
-        self.processor_thread = threading.Thread(target=self.process_queue, daemon=True)
-        self.processor_thread.start()
+        self.engine.start()
+        self._frame_job = self.root.after(FRAME_INTERVAL_MS, self.refresh_frame)
+
+    # The engine owns the capture state; these keep the old attribute names working
+    @property
+    def running(self):
+        return self.engine.running
+
+    @property
+    def serial_conn(self):
+        return self.engine.serial_conn
+
+    @property
+    def display_data(self):
+        return self.engine.display_data
+
+    @property
+    def parser_values(self):
+        return self.engine.parser_values
+
+    @property
+    def parser_history(self):
+        return self.engine.parser_history
 
     def create_widgets(self):
         main_container = tk.Frame(self.root, bg=self.theme_colors[self.current_theme]["bg"])
@@ -106,12 +166,20 @@ class SerialTerminalApp:
                                        bg=self.theme_colors[self.current_theme]["button_bg"], fg=self.theme_colors[self.current_theme]["button_fg"], 
                                        command=self.disconnect_serial, state="disabled", relief="raised", padx=5, pady=2)
         self.disconnect_btn.pack(side=tk.LEFT, padx=5)
+        self.pipeline_label = tk.Label(status_frame, text="", fg=self.theme_colors[self.current_theme]["header_fg"],
+                                      bg=self.theme_colors[self.current_theme]["header_bg"], font=("Segoe UI", 8))
+        self.pipeline_label.pack(side=tk.RIGHT, padx=10)
         
         self.import_csv_btn = tk.Button(status_frame, text="📥 Import CSV", font=("Segoe UI", 9, "bold"),
                                 bg=self.theme_colors[self.current_theme]["button_bg"],
                                 fg=self.theme_colors[self.current_theme]["button_fg"],
                                 command=self.import_csv_data, relief="raised", padx=5, pady=2)
         self.import_csv_btn.pack(side=tk.LEFT, padx=5)
+        self.multiport_btn = tk.Button(status_frame, text="🧩 Multi-port", font=("Segoe UI", 9, "bold"),
+                                       bg=self.theme_colors[self.current_theme]["button_bg"],
+                                       fg=self.theme_colors[self.current_theme]["button_fg"],
+                                       command=self.open_dashboard, relief="raised", padx=5, pady=2)
+        self.multiport_btn.pack(side=tk.LEFT, padx=5)
 
         # Serial Configuration
         config_frame = tk.Frame(main_container, bg=self.theme_colors[self.current_theme]["bg"])
@@ -137,33 +205,57 @@ class SerialTerminalApp:
         self.stopbits_var = tk.StringVar(value="1")
         stopbits_combo = ttk.Combobox(config_frame, textvariable=self.stopbits_var, values=["1", "1.5", "2"], state="readonly", width=5)
         stopbits_combo.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(config_frame, text="Format:").pack(side=tk.LEFT, padx=(10, 0))
+        self.protocol_var = tk.StringVar(value="Text")
+        protocol_combo = ttk.Combobox(config_frame, textvariable=self.protocol_var, values=["Text", "Binary"], state="readonly", width=7)
+        protocol_combo.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(config_frame, text="Reader:").pack(side=tk.LEFT, padx=(10, 0))
+        self.reader_var = tk.StringVar(value=self.engine.reader_mode)
+        reader_combo = ttk.Combobox(config_frame, textvariable=self.reader_var, values=list(READER_MODES), state="readonly", width=7)
+        reader_combo.pack(side=tk.LEFT, padx=(0, 10))
+        # Background: a separate capture process reads the port and keeps recording while this window is closed
+        ttk.Label(config_frame, text="Capture:").pack(side=tk.LEFT, padx=(10, 0))
+        self.capture_mode_var = tk.StringVar(value=CAPTURE_MODES[0])
+        capture_combo = ttk.Combobox(config_frame, textvariable=self.capture_mode_var, values=CAPTURE_MODES, state="readonly", width=10)
+        capture_combo.pack(side=tk.LEFT, padx=(0, 10))
         self.refresh_btn = ttk.Button(config_frame, text="🔄 Refresh Ports", command=self.refresh_ports)
         self.refresh_btn.pack(side=tk.LEFT, padx=(10, 0))
         # Notebook
         notebook = ttk.Notebook(main_container)
         notebook.pack(fill="both", expand=True)
+        self.notebook = notebook
         # Clear All button
         clear_btn = tk.Button(main_container, text="🧹 Clear All", font=("Segoe UI", 10, "bold"), 
                               bg=self.theme_colors[self.current_theme]["accent"], fg="white",
                               command=self.clear_all_data, relief="raised", padx=10, pady=5)
         clear_btn.pack(pady=(0, 10))
-        # Tabs
-        terminal_frame = ttk.Frame(notebook)
-        notebook.add(terminal_frame, text="Terminal")
-        self.build_terminal_tab(terminal_frame)
-        parser_config_frame = ttk.Frame(notebook)
-        notebook.add(parser_config_frame, text="Parser")
-        self.build_parser_config_tab(parser_config_frame)
-        graph_frame = ttk.Frame(notebook)
-        notebook.add(graph_frame, text="📈 Live Graph")
-        self.build_graph_tab(graph_frame)
-        settings_frame = ttk.Frame(notebook)
-        notebook.add(settings_frame, text="⚙️ Settings")
-        self.build_settings_tab(settings_frame)
+        # Tabs; all but the terminal are built the first time they are selected
+        self.add_tab("Terminal", self.build_terminal_tab, lazy=False)
+        self.add_tab("Parser", self.build_parser_config_tab)
+        self.add_tab("📈 Live Graph", self.build_graph_tab)
+        self.spectrum_frame = self.add_tab("〰️ Spectrum", self.build_spectrum_tab)
+        self.metrics_frame = self.add_tab("📊 Metrics", self.build_metrics_tab)
+        self.add_tab("⚙️ Settings", self.build_settings_tab)
+        notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
         # Keyboard shortcuts
         self.root.bind('<Control-l>', lambda e: self.clear_all_data())
         self.root.bind('<Control-L>', lambda e: self.clear_all_data())
 
+    def add_tab(self, text, builder, lazy=True):
+        frame = ttk.Frame(self.notebook)
+        self.notebook.add(frame, text=text)
+        if lazy:
+            self._pending_tabs[str(frame)] = (builder, frame)
+        else:
+            builder(frame)
+        return frame
+
+    def on_tab_changed(self, event=None):
+        pending = self._pending_tabs.pop(self.notebook.select(), None)
+        if pending is not None:
+            builder, frame = pending
+            builder(frame)
+
     def build_terminal_tab(self, parent):
         main_frame = ttk.Frame(parent)
         main_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -191,12 +283,22 @@ class SerialTerminalApp:
         tools_frame.pack(fill="x", pady=(10, 0))
         ttk.Button(tools_frame, text="Clear RX", command=self.clear_rx).pack(side=tk.LEFT, fill="x", expand=True, padx=(0, 5))
         ttk.Button(tools_frame, text="Clear TX", command=self.clear_tx).pack(side=tk.RIGHT, fill="x", expand=True, padx=(5, 0))
+        goto_frame = ttk.Frame(left_frame)
+        goto_frame.pack(fill="x", pady=(5, 0))
+        ttk.Label(goto_frame, text="Go to line:").pack(side=tk.LEFT)
+        self.goto_entry = ttk.Entry(goto_frame, width=10)
+        self.goto_entry.pack(side=tk.LEFT, fill="x", expand=True, padx=5)
+        self.goto_entry.bind("<Return>", lambda e: self.goto_rx_line())
+        ttk.Button(goto_frame, text="End", width=4, command=lambda: self.rx_text.see_end()).pack(side=tk.RIGHT)
+        ttk.Button(left_frame, text="🔍 Search / Filter (Ctrl+F)", command=self.open_search).pack(fill="x", pady=(5, 0))
+        self.root.bind("<Control-f>", lambda e: self.open_search())
         # === DUAL PANE: RX and TX ===
         rx_frame = ttk.LabelFrame(right_frame, text="📡 Received Data (RX)")
         rx_frame.pack(fill="both", expand=True, pady=(0, 5))
-        self.rx_text = scrolledtext.ScrolledText(rx_frame, wrap=tk.WORD, font=("Consolas", 10))
+        self.rx_text = VirtualLogView(rx_frame, max_lines=RX_VIEW_MAX_LINES, font=("Consolas", 10))
         self.rx_text.pack(fill="both", expand=True, padx=5, pady=5)
-        self.rx_text.config(state="disabled")
+        self.rx_text.tag_config("rx_timestamp", foreground="#2196F3", font=("Consolas", 10, "bold"))
+        self.rx_text.tag_config("rx_data", foreground="#4CAF50", font=("Consolas", 10))
         tx_frame = ttk.LabelFrame(right_frame, text="📤 Sent Commands (TX)")
         tx_frame.pack(fill="both", expand=True, pady=(5, 0))
         self.tx_text = scrolledtext.ScrolledText(tx_frame, wrap=tk.WORD, font=("Consolas", 10, "bold"))
@@ -215,12 +317,35 @@ class SerialTerminalApp:
         btn_frame = ttk.Frame(parent)
         btn_frame.pack(fill="x", padx=10, pady=5)
         ttk.Button(btn_frame, text="➕ Add Parser", command=self.add_parser_row).pack(side=tk.LEFT)
+        ttk.Button(btn_frame, text="✔ Update", command=self.update_parsers).pack(side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="🗑️ Clear All", command=self.clear_parsers).pack(side=tk.RIGHT)
         output_frame = ttk.LabelFrame(parent, text="Parsed Values (Latest)")
         output_frame.pack(fill="x", padx=10, pady=10)
-        self.parsed_output = scrolledtext.ScrolledText(output_frame, height=8, font=self.current_font)
+        colors = self.theme_colors[self.current_theme]
+        self.parsed_output = scrolledtext.ScrolledText(output_frame, height=8, font=self.current_font,
+                                                       bg=colors["output_bg"], fg=colors["output_fg"],
+                                                       insertbackground=colors["output_fg"])
         self.parsed_output.pack(fill="x", padx=5, pady=5)
-        self.parsed_output.config(state="disabled")
+        self.show_parsed_values()
+        stats_frame = ttk.LabelFrame(parent, text="📊 Statistics")
+        stats_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        window_bar = ttk.Frame(stats_frame)
+        window_bar.pack(fill="x", padx=5, pady=5)
+        ttk.Label(window_bar, text="Window: last").pack(side=tk.LEFT)
+        ttk.Entry(window_bar, textvariable=self.stats_samples_var, width=8).pack(side=tk.LEFT, padx=5)
+        ttk.Label(window_bar, text="samples / last").pack(side=tk.LEFT)
+        ttk.Entry(window_bar, textvariable=self.stats_seconds_var, width=6).pack(side=tk.LEFT, padx=5)
+        ttk.Label(window_bar, text="s").pack(side=tk.LEFT)
+        ttk.Button(window_bar, text="Apply / Reset", command=self.reset_stats).pack(side=tk.LEFT, padx=10)
+        columns = ["window", "count", "min", "max", "mean", "std", "rms", "rate"]
+        self.stats_table = ttk.Treeview(stats_frame, columns=columns, show="tree headings", height=9)
+        self.stats_table.heading("#0", text="Pattern")
+        self.stats_table.column("#0", width=110)
+        for column, title in zip(columns, ["Window", "Count", "Min", "Max", "Mean", "Std", "RMS", "Samples/s"]):
+            self.stats_table.heading(column, text=title)
+            self.stats_table.column(column, width=80, anchor="e")
+        self.stats_table.pack(fill="both", expand=True, padx=5, pady=(0, 5))
+        self.update_stats_table()
 
     def add_parser_row(self, default_text=""):
         row = ttk.Frame(self.parser_container)
@@ -230,6 +355,8 @@ class SerialTerminalApp:
         entry = ttk.Entry(row, width=30)
         entry.pack(side=tk.LEFT, padx=5)
         entry.insert(0, default_text)
+        # Patterns take effect on Enter or the Update button, not per keystroke: each change rebuilds the parser
+        entry.bind("<Return>", lambda e: self.update_parsers())
         remove_btn = ttk.Button(row, text="❌", width=3, command=lambda: self.remove_parser_row(row, entry))
         remove_btn.pack(side=tk.RIGHT)
         self.parser_entries.append(entry)
@@ -253,94 +380,113 @@ class SerialTerminalApp:
         self.parser_entries[0].delete(0, tk.END)
         self.update_parsers()
 
+    def get_parser_patterns(self):
+        patterns = [e.get().strip() for e in self.parser_entries if e.get().strip()]
+        return patterns or list(DEFAULT_PATTERNS)
+
     def update_parsers(self):
-        patterns = []
-        for entry in self.parser_entries:
-            text = entry.get().strip()
-            if text and text not in patterns:
-                patterns.append(text)
-        self.current_patterns = patterns
-        self.parser_history = {p: deque(maxlen=self.max_history) for p in patterns}
-        self.parser_values = {p: None for p in patterns}
+        self.engine.set_patterns(self.get_parser_patterns(), reset=True)
+        self.current_patterns = self.engine.patterns
 
     def import_csv_data(self):
+        """Stream a CSV log on a background thread; only the bounded history and terminal tail are filled."""
+        from cocowatt.csvimport import CsvImporter
         filename = filedialog.askopenfilename(filetypes=[("CSV files", "*.csv")])
+        if not filename:
+            return
+        if self.csv_import is not None and not self.csv_import.done:
+            messagebox.showinfo("Info", "An import is already running")
+            return
+        # Get parser patterns and reset parser history, terminal and data
+        self.update_parsers()
+        self.clear_all_data(confirm=False)
+        self.import_tail = deque(maxlen=IMPORT_VIEW_LINES)
+        self.csv_import = CsvImporter(filename, self.engine.patterns, self.on_import_chunk)
+        self.import_dialog = tk.Toplevel(self.root)
+        self.import_dialog.title("Importing CSV")
+        self.import_dialog.transient(self.root)
+        self.import_dialog.protocol("WM_DELETE_WINDOW", self.csv_import.cancel)
+        self.import_label = ttk.Label(self.import_dialog, text=filename, width=60)
+        self.import_label.pack(padx=10, pady=(10, 5))
+        self.import_bar = ttk.Progressbar(self.import_dialog, maximum=100, length=400)
+        self.import_bar.pack(padx=10, pady=5)
+        ttk.Button(self.import_dialog, text="Cancel", command=self.csv_import.cancel).pack(pady=(5, 10))
+        self.csv_import.start()
+        self.root.after(IMPORT_POLL_MS, self.poll_csv_import)
+
+    def on_import_chunk(self, times, lines, parsed):
+        # Runs on the import thread
+        for pattern, (rows, values) in parsed.items():
+            if pattern in self.parser_history:
+                self.engine.extend_series(pattern, times[rows], values)
+        keep = self.import_tail.maxlen
+        self.import_tail.extend(zip(times[-keep:].tolist(), lines[-keep:]))
+
+    def poll_csv_import(self):
+        job = self.csv_import
+        self.import_bar['value'] = job.progress * 100
+        self.import_label.config(text=f"{job.rows:,} rows  ({job.progress:.0%})")
+        if not job.done:
+            if self.graph_auto_var.get():
+                self.update_graph()
+            self.root.after(IMPORT_POLL_MS, self.poll_csv_import)
+            return
+        self.import_dialog.destroy()
+        if job.error is not None:
+            messagebox.showerror("Import Error", str(job.error))
+            return
+        tail = list(self.import_tail)
+        self.import_tail.clear()
+        entries = [{'t': from_epoch(t), 'data': data} for t, data in tail]
+        # Already shown below, keep refresh_frame from adding them again
+        self.rx_seq = self.engine.load_display(entries)
+        # Show in RX terminal (same format as live data)
+        self.rx_text.append((f"{format_ns(entry['t'])} ← {entry['data']}" for entry in entries),
+                            self.rx_seq - len(entries))
+        self.update_graph(force=True)
+        self.update_stats_table()
+        self.show_parsed_values()
+        status = "Import cancelled after" if job.cancelled else "Imported"
+        skipped = f"\n{job.skipped:,} rows skipped (sent or malformed)" if job.skipped else ""
+        messagebox.showinfo("Success", f"{status} {job.rows:,} records{skipped}")
+
+    def open_dashboard(self):
+        from cocowatt.dashboard import MultiPortDashboard
+        # One capture for all boards; the main window keeps its own single-port connection
+        MultiPortDashboard(self.root, self.engine.patterns, self.baud_var.get(), self.engine.max_history)
+
+    def open_capture(self):
+        """Load the tail of a .cwcap file; only the blocks in that window are read."""
+        from cocowatt.capfile import CaptureReader
+        filename = filedialog.askopenfilename(filetypes=[("COCOWATT capture", "*.cwcap")])
         if not filename:
             return
         try:
-            with open(filename, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
-            if not rows:
-                messagebox.showinfo("Info", "CSV is empty")
-                return
-
-            # Get parser patterns
-            patterns = [e.get().strip() for e in self.parser_entries if e.get().strip()]
-            if not patterns:
-                patterns = ["ADC Volt:", "ADC Volt2:"]
-
-            # Reset parser history
-            self.parser_history = {p: deque(maxlen=self.max_history) for p in patterns}
-            self.parser_values = {p: None for p in patterns}
-
-            # Clear current terminal and data
-            self.display_data.clear()
-            self.rx_text.config(state="normal")
-            self.rx_text.delete(1.0, tk.END)
-            # (No need to clear TX since CSV has only RX)
-
-            base_time = None
-            for row in rows:
-                # Assume all rows are RECEIVED (no 'Direction' column)
-                data = row['Data']
-                ts_str = row['Timestamp']
-
-                # Parse timestamp for graph (numeric)
-                try:
-                    if '.' in ts_str:
-                        dt = datetime.strptime(ts_str, "%H:%M:%S.%f")
-                    else:
-                        dt = datetime.strptime(ts_str, "%H:%M:%S")
-                    current_ts_numeric = dt.timestamp()
-                    if base_time is None:
-                        base_time = current_ts_numeric
-                except Exception:
-                    continue  # Skip invalid timestamps
-
-                # Add to display_data (used by graph parser and RX terminal)
-                entry = {'timestamp': ts_str, 'data': data}
-                self.display_data.append(entry)
-
-                # Parse for graph
-                parsed = self.parse_line_for_patterns(data, patterns)
-                for pat, val in parsed.items():
-                    if isinstance(val, (int, float)) and not math.isnan(val):
-                        if pat in self.parser_history:
-                            self.parser_history[pat].append((current_ts_numeric, val))
-
-                # Show in RX terminal (same format as live data)
-                self.rx_text.insert(tk.END, f"{ts_str} ← {data}\n", "received")
-
-            # Finalize terminal state
-            self.rx_text.config(state="disabled")
-            self.rx_text.see(tk.END)
-
-            # Force graph update
-            self.update_graph()
-
-            # Optional: Update parser output panel
-            self.parsed_output.config(state="normal")
-            self.parsed_output.delete(1.0, tk.END)
-            for pattern in patterns:
-                val = self.parser_values.get(pattern, "—")
-                self.parsed_output.insert(tk.END, f"{pattern} {val}\n")
-            self.parsed_output.config(state="disabled")
-
-            messagebox.showinfo("Success", f"Imported {len(rows)} records")
+            with CaptureReader(filename) as reader:
+                if not reader.rows:
+                    messagebox.showinfo("Info", "Capture is empty")
+                    return
+                self.update_parsers()
+                self.clear_all_data(confirm=False)
+                import numpy as np
+                lo, hi = reader.tail(self.engine.max_history)
+                times, columns, lines = reader.read(lo, hi, self.engine.patterns, lines=True)
+                for pattern, values in columns.items():
+                    keep = ~np.isnan(values)
+                    self.engine.extend_series(pattern, times[keep], values[keep])
+                entries = [{'t': from_epoch(t), 'data': line} for t, line in zip(times.tolist(), lines)]
+                self.rx_seq = self.engine.load_display(entries)
+                self.rx_text.append((f"{format_ns(entry['t'])} ← {entry['data']}" for entry in entries),
+                                    self.rx_seq - len(entries))
+                span = reader.t_max - reader.t_min
+                rows, recovered = reader.rows, reader.recovered
+            self.update_graph(force=True)
+            self.update_stats_table()
+            note = "\n(no index found: recovered from block headers)" if recovered else ""
+            messagebox.showinfo("Success", f"{rows} records over {span:.0f} s; showing the last {len(times)}{note}")
         except Exception as e:
-            messagebox.showerror("Import Error", str(e))    
-           
+            messagebox.showerror("Open Error", str(e))
+
     def export_all_terminal_data(self):
         """Export both RX and TX terminal content to a single CSV file."""
         filename = filedialog.asksaveasfilename(
@@ -357,9 +503,9 @@ class SerialTerminalApp:
                 writer.writerow(['Timestamp', 'Data', 'Direction'])
 
                 # Export RX (Received)
-                for entry in self.display_data:
+                for entry in self.engine.iter_entries():
                     clean = entry['data'].replace('\x00', '').replace('\r', '').replace('\n', ' ')
-                    writer.writerow([entry['timestamp'], clean, 'Received'])
+                    writer.writerow([format_ns(entry['t']), clean, 'Received'])
 
                 # Export TX (Sent) — parse from tx_text widget
                 tx_content = self.tx_text.get(1.0, tk.END).strip()
@@ -378,6 +524,7 @@ class SerialTerminalApp:
             messagebox.showerror("Export Error", f"Failed to export:\n{str(e)}")
 
     def build_graph_tab(self, parent):
+        from cocowatt.liveplot import LivePlot
         # Configure colors
         bg = self.theme_colors[self.current_theme]["graph_bg"]
         fg = self.theme_colors[self.current_theme]["graph_fg"]
@@ -388,10 +535,15 @@ class SerialTerminalApp:
 
         # Place "Import CSV" next to Connect/Disconnect? No — keep here for now, or move later.
         ttk.Button(control_frame, text="📥 Import CSV", command=self.import_csv_data).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(control_frame, text="📂 Open Capture", command=self.open_capture).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="▶ Replay", command=self.start_replay).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Combobox(control_frame, textvariable=self.replay_speed_var, values=["1x", "10x", "100x", "max"],
+                     state="readonly", width=5).pack(side=tk.LEFT, padx=(2, 5))
         ttk.Button(control_frame, text="📤 Export All Data", command=self.export_all_terminal_data).pack(side=tk.LEFT, padx=5)
-        self.graph_auto_var = tk.BooleanVar(value=True)
         ttk.Checkbutton(control_frame, text="Auto-update", variable=self.graph_auto_var).pack(side=tk.LEFT, padx=5)
-        ttk.Button(control_frame, text="🔄 Refresh", command=self.update_graph).pack(side=tk.RIGHT)
+        ttk.Checkbutton(control_frame, text="Fast live plot", variable=self.graph_live_var,
+                        command=self.switch_graph_mode).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="🔄 Refresh", command=lambda: self.update_graph(force=True)).pack(side=tk.RIGHT)
         ttk.Button(control_frame, text="💾 Export Graph", command=self.export_graph).pack(side=tk.RIGHT, padx=5)
 
         # === GRAPH AREA WITH TOOLBAR AT TOP ===
@@ -399,6 +551,7 @@ class SerialTerminalApp:
         graph_frame.pack(fill="both", expand=True, padx=5, pady=0)
 
         # Create figure and canvas
+        Figure, FigureCanvasTkAgg, NavigationToolbar2Tk = tk_matplotlib()
         self.figure = Figure(figsize=(10, 6), dpi=100, facecolor=bg)
         self.ax = self.figure.add_subplot(111, facecolor=bg)
         self.ax.set_title("Live Parsed Values", color=fg, fontsize=12)
@@ -415,6 +568,7 @@ class SerialTerminalApp:
 
         # Create and place toolbar inside toolbar_frame (centered horizontally)
         toolbar = NavigationToolbar2Tk(self.canvas, toolbar_frame)
+        self.toolbar = toolbar
         toolbar.config(bg=bg)
         toolbar._message_label.config(bg=bg, fg=fg)
         for child in toolbar.winfo_children():
@@ -427,8 +581,190 @@ class SerialTerminalApp:
 
         # Now pack the canvas BELOW the toolbar
         self.canvas.get_tk_widget().pack(fill="both", expand=True, pady=(2, 0))
-    
-            
+        self.live_plot = LivePlot(self.ax, self.canvas, self.parser_colors)
+        self.ax.callbacks.connect('xlim_changed', self.on_graph_limits_changed)
+        self.live_plot.restyle(fg, {"facecolor": bg, "edgecolor": fg})
+        # History collected before the tab existed, once the canvas has its size
+        self.root.after_idle(lambda: self.update_graph(force=True))
+
+    def build_spectrum_tab(self, parent):
+        from cocowatt.liveplot import SpectrumPlot
+        from cocowatt.spectrum import Spectrum, WINDOWS, SIZES
+        bg = self.theme_colors[self.current_theme]["graph_bg"]
+        fg = self.theme_colors[self.current_theme]["graph_fg"]
+        control_frame = tk.Frame(parent, bg=bg)
+        control_frame.pack(fill="x", padx=5, pady=5)
+        ttk.Label(control_frame, text="Pattern:").pack(side=tk.LEFT)
+        self.spectrum_pattern_var = tk.StringVar(value=self.engine.patterns[0])
+        self.spectrum_pattern_combo = ttk.Combobox(control_frame, textvariable=self.spectrum_pattern_var, width=14,
+                                                   postcommand=self.refresh_spectrum_patterns)
+        self.spectrum_pattern_combo.pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(control_frame, text="Points:").pack(side=tk.LEFT)
+        self.spectrum_size_var = tk.StringVar(value="4096")
+        ttk.Combobox(control_frame, textvariable=self.spectrum_size_var, values=[str(n) for n in SIZES],
+                     state="readonly", width=7).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(control_frame, text="Segments:").pack(side=tk.LEFT)
+        self.spectrum_segments_var = tk.StringVar(value="4")
+        ttk.Combobox(control_frame, textvariable=self.spectrum_segments_var, values=["1", "4", "8", "16"],
+                     state="readonly", width=4).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(control_frame, text="Window:").pack(side=tk.LEFT)
+        self.spectrum_window_var = tk.StringVar(value="hann")
+        ttk.Combobox(control_frame, textvariable=self.spectrum_window_var, values=list(WINDOWS),
+                     state="readonly", width=9).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Button(control_frame, text="Apply", command=self.apply_spectrum_settings).pack(side=tk.LEFT)
+        self.spectrum_pause_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(control_frame, text="Pause", variable=self.spectrum_pause_var).pack(side=tk.LEFT, padx=10)
+        self.spectrum_label = ttk.Label(control_frame, text="")
+        self.spectrum_label.pack(side=tk.RIGHT)
+
+        Figure, FigureCanvasTkAgg, _ = tk_matplotlib()
+        self.spectrum_figure = Figure(figsize=(10, 6), dpi=100, facecolor=bg)
+        self.spectrum_ax = self.spectrum_figure.add_subplot(111, facecolor=bg)
+        self.spectrum_ax.set_title("Power Spectral Density (Welch)", color=fg, fontsize=12)
+        self.spectrum_ax.set_xlabel("Frequency (Hz)", color=fg, fontsize=10)
+        self.spectrum_ax.set_ylabel("PSD (units²/Hz)", color=fg, fontsize=10)
+        self.spectrum_ax.set_yscale("log")
+        self.spectrum_ax.grid(True, which="both", alpha=0.3, color=fg, linestyle='--')
+        self.spectrum_ax.tick_params(colors=fg, labelsize=9)
+        self.spectrum_canvas = FigureCanvasTkAgg(self.spectrum_figure, parent)
+        self.spectrum_canvas.get_tk_widget().pack(fill="both", expand=True, padx=5, pady=5)
+        self.spectrum_plot = SpectrumPlot(self.spectrum_ax, self.spectrum_canvas, self.parser_colors[1])
+        self.spectrum = Spectrum(int(self.spectrum_size_var.get()), int(self.spectrum_segments_var.get()),
+                                 self.spectrum_window_var.get())
+        self._spectrum_last = None
+        self.fit_history_to_spectrum()
+        self._spectrum_job = self.root.after(SPECTRUM_REFRESH_MS, self.refresh_spectrum)
+
+    def refresh_spectrum_patterns(self):
+        self.spectrum_pattern_combo['values'] = self.engine.patterns
+
+    def apply_spectrum_settings(self):
+        self.spectrum.configure(int(self.spectrum_size_var.get()), int(self.spectrum_segments_var.get()),
+                                self.spectrum_window_var.get())
+        self._spectrum_last = None
+        self.fit_history_to_spectrum()
+        self.refresh_spectrum(reschedule=False)
+
+    def fit_history_to_spectrum(self):
+        # The spectrum reads from the graph history, which has to hold a full window
+        if self.spectrum.size > self.engine.max_history:
+            self.engine.set_history_capacity(self.spectrum.size)
+            self.history_var.set(str(self.spectrum.size))
+
+    def refresh_spectrum(self, reschedule=True):
+        # Runs on a fixed schedule; the FFT is only redone when the tab is visible and new samples arrived
+        if reschedule:
+            self._spectrum_job = self.root.after(SPECTRUM_REFRESH_MS, self.refresh_spectrum)
+        if self.spectrum_pause_var.get() or self.notebook.select() != str(self.spectrum_frame):
+            return
+        with self.engine.lock:
+            hist = self.parser_history.get(self.spectrum_pattern_var.get())
+            last = hist.t_max if hist else None
+            if last is None or last == self._spectrum_last:
+                return
+            self._spectrum_last = last
+            have = self.spectrum.load(hist.times, hist.values)
+        start = time.perf_counter()
+        result = self.spectrum.compute()
+        if result is None:
+            self.spectrum_label.config(text=f"Waiting for {self.spectrum.size} samples ({have} so far)")
+            return
+        freqs, psd = result
+        # DC is removed per segment, so start at the first bin
+        self.spectrum_plot.update(freqs[1:], psd[1:], max(int(self.spectrum_ax.bbox.width), 100))
+        self.m_spectrum.observe(time.perf_counter() - start)
+        peak_hz, peak_rms = self.spectrum.peak()
+        grid = "resampled" if self.spectrum.resampled else "evenly spaced"
+        self.spectrum_label.config(text=f"fs {self.spectrum.fs:.1f} Hz ({grid})  "
+                                        f"peak {peak_hz:.2f} Hz, {peak_rms:.4g} RMS")
+
+    def register_ui_metrics(self, metrics):
+        self.m_frame = metrics.histogram("ui_frame_seconds", "Tk frame: new lines, terminal, parsed values, graph")
+        self.m_graph = metrics.histogram("ui_graph_seconds", "Graph decimation and redraw")
+        self.m_spectrum = metrics.histogram("ui_spectrum_seconds", "Spectrum PSD and redraw")
+        metrics.counter("ui_dropped_frames_total", "Frames later than the 33 ms budget", lambda: self.dropped_frames)
+        metrics.counter("ui_skipped_lines_total", "Lines evicted before the terminal showed them",
+                        lambda: self.view_skipped)
+
+    def build_metrics_tab(self, parent):
+        control_frame = ttk.Frame(parent)
+        control_frame.pack(fill="x", padx=10, pady=(10, 5))
+        self.profile_btn = ttk.Button(control_frame, text="⏺ Start Profiling", command=self.toggle_profiling)
+        self.profile_btn.pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(control_frame, text="Reset Histograms", command=self.reset_metrics).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="💾 Save Metrics", command=self.export_metrics).pack(side=tk.LEFT, padx=5)
+        self.metrics_label = ttk.Label(control_frame, text="Latencies in ms; p50/p99 are histogram bucket bounds")
+        self.metrics_label.pack(side=tk.RIGHT)
+        columns = ("value", "p50", "p99", "max")
+        self.metrics_table = ttk.Treeview(parent, columns=columns, show="tree headings")
+        self.metrics_table.heading("#0", text="Metric")
+        self.metrics_table.column("#0", width=260)
+        for column, title in zip(columns, ("Value / count", "p50", "p99", "max")):
+            self.metrics_table.heading(column, text=title)
+            self.metrics_table.column(column, width=110, anchor="e")
+        self.metrics_table.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self._metrics_job = self.root.after(METRICS_REFRESH_MS, self.refresh_metrics)
+
+    def refresh_metrics(self, reschedule=True):
+        if reschedule:
+            self._metrics_job = self.root.after(METRICS_REFRESH_MS, self.refresh_metrics)
+        if self.notebook.select() != str(self.metrics_frame):
+            return
+        table = self.metrics_table
+        for name, value in self.engine.metrics.snapshot().items():
+            if isinstance(value, dict):
+                row = (value["count"], f"{value['p50'] * 1000:.3g}", f"{value['p99'] * 1000:.3g}",
+                       f"{value['max'] * 1000:.3g}")
+            elif value is None:
+                row = ("—", "", "", "")
+            else:
+                row = (f"{value:,.6g}" if isinstance(value, float) else f"{value:,}", "", "", "")
+            if table.exists(name):
+                table.item(name, values=row)
+            else:
+                table.insert("", tk.END, iid=name, text=name, values=row)
+
+    def reset_metrics(self):
+        self.engine.metrics.reset_histograms()
+        self.refresh_metrics(reschedule=False)
+
+    def export_metrics(self):
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".prom",
+            filetypes=[("Prometheus text", "*.prom"), ("JSON", "*.json"), ("All files", "*.*")],
+            initialfile=f"cocowatt_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prom")
+        if not filename:
+            return
+        try:
+            self.engine.metrics.write(filename)
+        except Exception as e:
+            messagebox.showerror("Export Error", str(e))
+
+    def toggle_profiling(self):
+        profiler = self.engine.profiler
+        if not profiler.active:
+            try:
+                profiler.start()
+            except RuntimeError as e:
+                messagebox.showerror("Profiling Error", str(e))
+                return
+            self.profile_btn.config(text="⏹ Stop Profiling")
+            return
+        prefix = f"cocowatt_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.profile_btn.config(text="⏺ Start Profiling")
+        try:
+            report = profiler.stop_to(prefix)
+        except Exception as e:
+            messagebox.showerror("Profiling Error", str(e))
+            return
+        window = tk.Toplevel(self.root)
+        window.title(f"Profile: {os.path.abspath(prefix)}.txt / .prof")
+        window.geometry("1000x600")
+        text = scrolledtext.ScrolledText(window, wrap=tk.NONE, font=("Consolas", 9))
+        text.pack(fill="both", expand=True)
+        text.insert(tk.END, report)
+        text.config(state="disabled")
+
     def build_settings_tab(self, parent):
         settings_frame = ttk.Frame(parent)
         settings_frame.pack(fill="both", expand=True, padx=10, pady=10)
@@ -449,18 +785,25 @@ class SerialTerminalApp:
         ttk.Button(settings_frame, text="Apply Font", command=lambda: self.change_font(font_var.get(), int(font_size_var.get()))).pack(side=tk.LEFT)
         accent_label = ttk.Label(settings_frame, text="💚 Accent Color:")
         accent_label.pack(anchor="w", pady=(10, 0))
-        self.accent_color_var = tk.StringVar(value=self.theme_colors[self.current_theme]["accent"])
         accent_entry = ttk.Entry(settings_frame, textvariable=self.accent_color_var, width=10)
         accent_entry.pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(settings_frame, text="Choose", command=self.choose_accent_color).pack(side=tk.LEFT)
         auto_clear_label = ttk.Label(settings_frame, text="🔄 Auto-Clear on Connect:")
         auto_clear_label.pack(anchor="w", pady=(10, 0))
-        self.auto_clear_var = tk.BooleanVar(value=self.auto_clear_on_connect)
         auto_clear_check = ttk.Checkbutton(settings_frame, text="Clear all data when connecting", variable=self.auto_clear_var)
         auto_clear_check.pack(anchor="w", pady=(0, 10))
+        history_label = ttk.Label(settings_frame, text="📈 Graph history (samples per pattern):")
+        history_label.pack(anchor="w", pady=(5, 0))
+        history_combo = ttk.Combobox(settings_frame, textvariable=self.history_var,
+                                     values=["2000", "20000", "200000", "1000000", "5000000"], width=10)
+        history_combo.pack(anchor="w", pady=(0, 10))
+        retention_label = ttk.Label(settings_frame, text="🧾 Terminal retention (lines kept for export):")
+        retention_label.pack(anchor="w", pady=(5, 0))
+        retention_combo = ttk.Combobox(settings_frame, textvariable=self.retention_var,
+                                       values=["10000", "100000", "1000000", "5000000"], width=10)
+        retention_combo.pack(anchor="w", pady=(0, 10))
 
         # === SESSION LOGGING TOGGLE ===
-        self.session_log_var = tk.BooleanVar(value=True)  # Default ON
         session_log_check = ttk.Checkbutton(
             settings_frame,
             text="Enable Session Logging (to CSV)",
@@ -474,11 +817,13 @@ class SerialTerminalApp:
     def toggle_session_logging(self):
         enabled = self.session_log_var.get()
         if enabled and (not self.session_log_file or self.session_log_file.closed):
-            log_filename = f"session_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            self.session_log_file = open(log_filename, 'w', newline='', encoding='utf-8-sig')
-            self.session_log_writer = csv.writer(self.session_log_file)
-            self.session_log_writer.writerow(['Timestamp', 'Data', 'Direction'])
+            # Written as session_log_<time>_001.csv, _002.csv, ... on the logger thread
+            log_prefix = f"session_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            self.session_log_file = SessionLogger(log_prefix, with_direction=True)
+            self.session_log_file.register_metrics(self.engine.metrics)
+            self.engine.add_listener(self.session_log_file)
         elif not enabled and self.session_log_file and not self.session_log_file.closed:
+            self.engine.remove_listener(self.session_log_file)
             self.session_log_file.close()
             self.session_log_file = None
 
@@ -490,19 +835,36 @@ class SerialTerminalApp:
     def change_font(self, family, size):
         self.current_font = (family, size)
         self.output_text.config(font=self.current_font)
-        self.parsed_output.config(font=self.current_font)
+        if hasattr(self, 'parsed_output'):
+            self.parsed_output.config(font=self.current_font)
 
     def apply_settings(self):
         self.current_theme = "light" if self.theme_colors[self.current_theme]["bg"] == "white" else "dark"
         self.apply_theme()
         self.output_text.config(font=self.current_font)
-        self.parsed_output.config(font=self.current_font)
+        if hasattr(self, 'parsed_output'):
+            self.parsed_output.config(font=self.current_font)
         accent_color = self.accent_color_var.get()
         if accent_color:
             self.theme_colors["light"]["accent"] = accent_color
             self.theme_colors["dark"]["accent"] = accent_color
             self.apply_theme()
         self.auto_clear_on_connect = self.auto_clear_var.get()
+        try:
+            capacity = int(self.history_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Graph history must be a whole number of samples")
+            return
+        if capacity > 0 and capacity != self.engine.max_history:
+            self.engine.set_history_capacity(capacity)
+            self.update_graph(force=True)
+        try:
+            retention = int(self.retention_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Terminal retention must be a whole number of lines")
+            return
+        if retention > 0 and retention != self.engine.max_display:
+            self.engine.set_display_capacity(retention)
 
     def apply_theme(self):
         colors = self.theme_colors[self.current_theme]
@@ -519,7 +881,8 @@ class SerialTerminalApp:
         self.connect_btn.config(bg=colors["button_bg"], fg=colors["button_fg"])
         self.disconnect_btn.config(bg=colors["button_bg"], fg=colors["button_fg"])
         self.output_text.config(bg=colors["output_bg"], fg=colors["output_fg"], insertbackground=colors["output_fg"])
-        self.parsed_output.config(bg=colors["output_bg"], fg=colors["output_fg"], insertbackground=colors["output_fg"])
+        if hasattr(self, 'parsed_output'):
+            self.parsed_output.config(bg=colors["output_bg"], fg=colors["output_fg"], insertbackground=colors["output_fg"])
         if hasattr(self, 'ax'):
             self.ax.set_facecolor(colors["graph_bg"])
             self.ax.tick_params(colors=colors["graph_fg"])
@@ -530,8 +893,21 @@ class SerialTerminalApp:
             self.ax.set_title("Live Parsed Values", color=colors["graph_fg"])
             self.ax.set_xlabel("Time (s)", color=colors["graph_fg"])
             self.ax.set_ylabel("Value", color=colors["graph_fg"])
+            if hasattr(self, 'live_plot'):
+                self.live_plot.restyle(colors["graph_fg"], {"facecolor": colors["graph_bg"], "edgecolor": colors["graph_fg"]})
             if hasattr(self, 'canvas'):
                 self.canvas.draw()
+        if hasattr(self, 'spectrum_ax'):
+            self.spectrum_figure.set_facecolor(colors["graph_bg"])
+            self.spectrum_ax.set_facecolor(colors["graph_bg"])
+            self.spectrum_ax.tick_params(colors=colors["graph_fg"])
+            for spine in self.spectrum_ax.spines.values():
+                spine.set_color(colors["graph_fg"])
+            self.spectrum_ax.set_title("Power Spectral Density (Welch)", color=colors["graph_fg"])
+            self.spectrum_ax.set_xlabel("Frequency (Hz)", color=colors["graph_fg"])
+            self.spectrum_ax.set_ylabel("PSD (units²/Hz)", color=colors["graph_fg"])
+            self.spectrum_plot.needs_full_draw = True
+            self.spectrum_canvas.draw_idle()
 
     def refresh_ports(self):
         ports = [p.device for p in serial.tools.list_ports.comports()]
@@ -540,16 +916,13 @@ class SerialTerminalApp:
             self.port_var.set(ports[0])
 
     def get_parity(self, parity_str):
-        mapping = {"None": serial.PARITY_NONE, "Even": serial.PARITY_EVEN, "Odd": serial.PARITY_ODD, "Mark": serial.PARITY_MARK, "Space": serial.PARITY_SPACE}
-        return mapping.get(parity_str, serial.PARITY_NONE)
+        return PARITY.get(parity_str, serial.PARITY_NONE)
 
     def get_stopbits(self, stopbits_str):
-        mapping = {"1": serial.STOPBITS_ONE, "1.5": serial.STOPBITS_ONE_POINT_FIVE, "2": serial.STOPBITS_TWO}
-        return mapping.get(stopbits_str, serial.STOPBITS_ONE)
+        return STOPBITS.get(stopbits_str, serial.STOPBITS_ONE)
 
     def get_bytesize(self, size_str):
-        mapping = {"5": serial.FIVEBITS, "6": serial.SIXBITS, "7": serial.SEVENBITS, "8": serial.EIGHTBITS}
-        return mapping.get(size_str, serial.EIGHTBITS)
+        return BYTESIZE.get(size_str, serial.EIGHTBITS)
 
     def connect_serial(self):
         port = self.port_var.get()
@@ -558,86 +931,101 @@ class SerialTerminalApp:
             return
         try:
             baud = int(self.baud_var.get())
-            bytesize = self.get_bytesize(self.bytesize_var.get())
-            parity = self.get_parity(self.parity_var.get())
-            stopbits = self.get_stopbits(self.stopbits_var.get())
         except Exception as e:
             messagebox.showerror("Error", f"Invalid setting: {e}")
             return
         try:
-            if self.serial_conn and self.serial_conn.is_open:
-                self.serial_conn.close()
-            self.serial_conn = serial.Serial(
-                port=port,
-                baudrate=baud,
-                timeout=0,
-                bytesize=bytesize,
-                parity=parity,
-                stopbits=stopbits,
-                rtscts=False,
-                dsrdtr=False
-            )
-            self.serial_conn.reset_input_buffer()
-            self.serial_conn.reset_output_buffer()
             if self.auto_clear_on_connect:
                 self.clear_all_data(confirm=False)
-            self.running = True
-            self.last_activity = time.time()
+            if self.capture_mode_var.get() == "Background":
+                self.connect_background(port, baud)
+                return
+            self.engine.set_protocol(self.protocol_var.get().lower())
+            # "asyncio" runs the port on the shared event loop thread; lines still reach Tk via the frame tick
+            self.engine.reader_mode = self.reader_var.get()
+            self.engine.open(port, baud, self.bytesize_var.get(), self.parity_var.get(), self.stopbits_var.get())
             self.status_label.config(text="✅ CONNECTED", foreground=self.theme_colors[self.current_theme]["status_connected"])
             self.connect_btn.config(state="disabled")
             self.disconnect_btn.config(state="normal")
-            self.reader_thread = threading.Thread(target=self.read_serial, daemon=True)
-            self.reader_thread.start()
         except Exception as e:
             messagebox.showerror("Error", f"Connection failed:\n{e}")
 
+    def connect_background(self, port, baud):
+        """Follow the capture process for ``port``, starting one if none is running."""
+        from cocowatt.shmring import find_ring, spawn_capture, ring_name
+        name = ring_name(port)
+        ring = find_ring(name)
+        backlog = SHARED_BACKLOG_LINES
+        if ring is None:
+            args = ["--baud", str(baud), "--bytesize", self.bytesize_var.get(), "--parity", self.parity_var.get(),
+                    "--stopbits", self.stopbits_var.get(), "--protocol", self.protocol_var.get().lower(),
+                    "--reader", self.reader_var.get()]
+            for pattern in self.engine.patterns:
+                args += ["--pattern", pattern]
+            ring = spawn_capture(name, port, args)
+            backlog = ring.write_seq
+        ring.close()
+        self.engine.open_shared(name, backlog)
+        self.status_label.config(text="✅ CONNECTED (background)",
+                                 foreground=self.theme_colors[self.current_theme]["status_connected"])
+        self.connect_btn.config(state="disabled")
+        self.disconnect_btn.config(state="normal")
+
+    def shared_status(self):
+        shared = self.engine.shared
+        if shared is None:
+            return ""
+        stats = shared.stats()
+        state = "ended" if shared.done else f"{stats['lag']:,} lines behind"
+        return f"  Background capture {state}, {stats['skipped']:,} skipped"
+
+    def start_replay(self):
+        """Play a recorded log through the live pipeline, as if the board were connected."""
+        filename = filedialog.askopenfilename(filetypes=[("Recordings", "*.csv *.cwcap"), ("CSV files", "*.csv"),
+                                                         ("COCOWATT capture", "*.cwcap")])
+        if not filename:
+            return
+        speed = self.replay_speed_var.get()
+        speed = 0 if speed == "max" else float(speed.rstrip("x"))
+        if self.auto_clear_on_connect:
+            self.clear_all_data(confirm=False)
+        try:
+            self.engine.open_replay(filename, speed)
+        except Exception as e:
+            messagebox.showerror("Error", f"Replay failed:\n{e}")
+            return
+        label = "max speed" if not speed else f"{speed:g}×"
+        self.status_label.config(text=f"▶ REPLAY {label}",
+                                 foreground=self.theme_colors[self.current_theme]["status_connected"])
+        self.connect_btn.config(state="disabled")
+        self.disconnect_btn.config(state="normal")
+
+    def replay_status(self):
+        replay = self.engine.replay
+        if replay is None:
+            return ""
+        stats = replay.stats()
+        state = "done" if replay.done else "playing"
+        return f"  Replay {state}: {stats['lines']:,} lines, {stats['lines_per_s']:,.0f} lines/s"
+
     def disconnect_serial(self):
-        self.running = False
-        if self.serial_conn and self.serial_conn.is_open:
-            self.serial_conn.close()
-        self.serial_conn = None
+        stop_capture = False
+        if self.engine.shared is not None and not self.engine.shared.done:
+            stop_capture = messagebox.askyesnocancel(
+                "Background capture", "Stop the background capture as well?\n\n"
+                "No keeps it recording; connect in Background mode again to pick it up.")
+            if stop_capture is None:
+                return
+        self.engine.close(stop_capture)
         self.status_label.config(text="❌ DISCONNECTED", foreground=self.theme_colors[self.current_theme]["status_disconnected"])
         self.connect_btn.config(state="normal")
         self.disconnect_btn.config(state="disabled")
 
-    def read_serial(self):
-        last_data_time = time.time()
-        while self.running:
-            if self.serial_conn and self.serial_conn.is_open and self.serial_conn.in_waiting > 0:
-                try:
-                    data = self.serial_conn.read(self.serial_conn.in_waiting)
-                    decoded = data.decode('iso-8859-1', errors='replace')
-                    self.buffer += decoded
-                    last_data_time = time.time()
-                    self.buffer = self.buffer.replace('\r\n', '\n').replace('\r', '\n')
-                    if '\n' in self.buffer:
-                        lines = self.buffer.split('\n')
-                        self.buffer = lines[-1]
-                        for line in lines[:-1]:
-                            if line.strip():
-                                timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-                                self.data_queue.put({
-                                    'timestamp': timestamp,
-                                    'data': line.strip()
-                                })
-                except Exception as e:
-                    if self.running:
-                        self.data_queue.put({
-                            'timestamp': datetime.now().strftime("%H:%M:%S"),
-                            'data': f"[ERROR] {str(e)}"
-                        })
-            else:
-                if self.buffer.strip() and (time.time() - last_data_time) > 0.1:
-                    timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-                    self.data_queue.put({
-                        'timestamp': timestamp,
-                        'data': self.buffer.strip()
-                    })
-                    self.buffer = ""
-                time.sleep(0.01)
-
     def send_data(self, text=None):
-        if not self.running or not self.serial_conn or not self.serial_conn.is_open:
+        if self.engine.replay is not None:
+            messagebox.showwarning("Warning", "Replaying a recording; there is no device to send to")
+            return
+        if not self.engine.is_open:
             messagebox.showwarning("Warning", "Not connected")
             return
         if text is None:
@@ -645,15 +1033,11 @@ class SerialTerminalApp:
             if not text:
                 return
         try:
-            data_to_send = text + '\r\n'
-            encoded = data_to_send.encode('iso-8859-1')
-            self.serial_conn.write(encoded)
-            self.serial_conn.flush()
+            self.engine.write(text)
 
             # Log sent data only if enabled
-            if self.session_log_var.get() and self.session_log_writer:
-                timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-                self.session_log_writer.writerow([timestamp, text, 'Sent'])
+            if self.session_log_var.get() and self.session_log_file:
+                self.session_log_file.write(now_ns(), text, 'Sent')
 
             # Show in TX pane with colored timestamp
             timestamp = datetime.now().strftime("%H:%M:%S")
@@ -687,112 +1071,174 @@ class SerialTerminalApp:
             self.history_index = len(self.command_history)
             self.send_entry.delete(0, tk.END)
 
-    def parse_line_for_patterns(self, line, patterns):
-        results = {}
-        for pattern in patterns:
-            if pattern in line:
-                start_idx = line.find(pattern)
-                after = line[start_idx + len(pattern):]
-                match = re.search(r'[\d.]+', after)
-                if match:
-                    try:
-                        value = float(match.group())
-                        results[pattern] = value
-                    except:
-                        results[pattern] = match.group()
-        return results
-
-    def process_queue(self):
-        while True:
-            try:
-                entry = self.data_queue.get(timeout=0.1)
-                self.display_data.append(entry)
-
-                # Log received data only if enabled
-                if self.session_log_var.get() and self.session_log_writer:
-                    self.session_log_writer.writerow([entry['timestamp'], entry['data'], 'Received'])
-
-                if len(self.display_data) > 500:
-                    self.display_data = self.display_data[-500:]
-                self.update_display()
-                self.update_parsers_and_graph()
-            except:
-                continue
+    def refresh_frame(self):
+        now = time.perf_counter()
+        self.engine.profiler.checkpoint()
+        if self._last_frame_time is not None:
+            late = (now - self._last_frame_time) * 1000 / FRAME_INTERVAL_MS
+            self.dropped_frames += max(0, int(late) - 1)
+        self._last_frame_time = now
+        # What was received since the last frame, up to FRAME_MAX_LINES; lines evicted before we got here are counted
+        first = self.engine.display_data.first_seq
+        if first > self.rx_seq:
+            self.view_skipped += first - self.rx_seq
+        self.rx_seq, batch = self.engine.entries_since(self.rx_seq, FRAME_MAX_LINES)
+        behind = len(batch) == FRAME_MAX_LINES
+        if batch:
+            self.coalesced_lines += len(batch) - 1
+            self.update_display(batch)
+            self.update_parsers_and_graph()
+            if now - self._stats_time >= STATS_REFRESH_S:
+                self._stats_time = now
+                self.update_stats_table()
+        self.pipeline_label.config(
+            text=f"Queue: {self.engine.queue_depth}  Dropped: {self.engine.dropped_lines + self.view_skipped} lines, "
+                 f"{self.dropped_frames} frames  Coalesced: {self.coalesced_lines} lines"
+                 + self.session_log_status() + self.tick_clock_status() + self.replay_status()
+                 + self.shared_status())
+        self.m_frame.observe(time.perf_counter() - now)
+        # Catching up: come back as soon as Tk has handled pending events
+        self._frame_job = self.root.after(1 if behind else FRAME_INTERVAL_MS, self.refresh_frame)
+
+    def update_stats_table(self):
+        if not hasattr(self, 'stats_table'):
+            return
+        table = self.stats_table
+        table.delete(*table.get_children())
+        for pattern, windows in self.engine.stats_snapshot().items():
+            for label, stats in windows.items():
+                if not stats["count"]:
+                    values = [label, 0] + ["—"] * 5 + ["0"]
+                else:
+                    values = [label, stats["count"]] + [f"{stats[k]:.6g}" for k in ("min", "max", "mean", "std", "rms")] \
+                        + [f"{stats['rate']:.1f}"]
+                table.insert("", tk.END, text=pattern if label == "all" else "", values=values)
+
+    def reset_stats(self):
+        try:
+            samples = int(self.stats_samples_var.get())
+            seconds = float(self.stats_seconds_var.get())
+        except ValueError:
+            messagebox.showerror("Error", "Statistics window must be a sample count and a number of seconds")
+            return
+        if samples <= 0 or seconds <= 0:
+            messagebox.showerror("Error", "Statistics window must be positive")
+            return
+        self.engine.set_stats_window(samples, seconds)
+        self.update_stats_table()
+
+    def tick_clock_status(self):
+        stats = self.engine.tick_clock.stats()
+        if not stats['samples']:
+            return ""
+        return f"  STM drift: {stats['drift_ppm']:+.1f} ppm"
+
+    def session_log_status(self):
+        if not self.session_log_file or self.session_log_file.closed:
+            return ""
+        stats = self.session_log_file.stats()
+        return (f"  Log: {stats['rows']} rows, {stats['mb_per_s']:.2f} MB/s, "
+                f"{stats['last_latency_ms']:.0f} ms, {stats['dropped']} dropped"
+                + (f", {stats['errors']} errors ({stats['last_error']})" if stats['errors'] else ""))
 
     def update_parsers_and_graph(self):
-        patterns = [e.get().strip() for e in self.parser_entries if e.get().strip()]
-        if not patterns:
-            patterns = ["ADC Volt:", "ADC Volt2:"]
         if self.display_data:
-            latest_line = self.display_data[-1]['data']
-            parsed = self.parse_line_for_patterns(latest_line, patterns)
-            current_time = time.time()
-            for pattern in patterns:
-                value = parsed.get(pattern, None)
-                self.parser_values[pattern] = value
-                if value is not None and isinstance(value, (int, float)) and not math.isnan(value):
-                    if pattern not in self.parser_history:
-                        self.parser_history[pattern] = deque(maxlen=self.max_history)
-                    self.parser_history[pattern].append((current_time, value))
-            self.parsed_output.config(state="normal")
-            self.parsed_output.delete(1.0, tk.END)
-            for pattern in patterns:
-                val = self.parser_values.get(pattern, "—")
-                self.parsed_output.insert(tk.END, f"{pattern} {val}\n")
-            self.parsed_output.config(state="disabled")
+            self.show_parsed_values()
             if self.graph_auto_var.get():
                 self.update_graph()
 
+    def show_parsed_values(self):
+        if not hasattr(self, 'parsed_output'):
+            return
+        self.parsed_output.config(state="normal")
+        self.parsed_output.delete(1.0, tk.END)
+        if self.display_data:
+            for pattern in self.engine.patterns:
+                val = self.parser_values.get(pattern, "—")
+                self.parsed_output.insert(tk.END, f"{pattern} {val}\n")
+        self.parsed_output.config(state="disabled")
+
     def clear_rx(self):
-        self.display_data = []
-        self.buffer = ""
-        self.rx_text.config(state="normal")
-        self.rx_text.delete(1.0, tk.END)
-        self.rx_text.config(state="disabled")
-        self._last_rx_count = 0
+        self.engine.clear_display()
+        self.rx_seq = self.engine.display_data.next_seq
+        self.rx_text.clear()
 
     def clear_tx(self):
         self.tx_text.config(state="normal")
         self.tx_text.delete(1.0, tk.END)
         self.tx_text.config(state="disabled")
 
-    def update_display(self):
-        self.rx_text.config(state="normal")
-        self.rx_text.tag_config("rx_timestamp", foreground="#2196F3", font=("Consolas", 10, "bold"))
-        self.rx_text.tag_config("rx_data", foreground="#4CAF50", font=("Consolas", 10))
-        if self.auto_scroll:
-            start_idx = getattr(self, '_last_rx_count', 0)
-            for i in range(start_idx, len(self.display_data)):
-                entry = self.display_data[i]
-                self.rx_text.insert(tk.END, f"{entry['timestamp']} ", "rx_timestamp")
-                self.rx_text.insert(tk.END, f"← {entry['data']}\n", "rx_data")
-            self._last_rx_count = len(self.display_data)
-            self.rx_text.see(tk.END)
-        else:
-            self.rx_text.delete(1.0, tk.END)
-            for entry in self.display_data:
-                self.rx_text.insert(tk.END, f"{entry['timestamp']} ", "rx_timestamp")
-                self.rx_text.insert(tk.END, f"← {entry['data']}\n", "rx_data")
-            self.rx_text.see(tk.END)
-        self.rx_text.config(state="disabled")
-
-    def update_graph(self):
+    def update_display(self, entries):
+        # The view only stores the lines; it renders the visible rows once per idle cycle
+        if not self.auto_scroll:
+            self.rx_text.follow = False
+        self.rx_text.append((f"{format_ns(entry['t'])} ← {entry['data']}" for entry in entries), entries[0]['seq'])
+
+    def open_search(self):
+        from cocowatt.searchview import SearchWindow
+        if self.search_window is not None and self.search_window.winfo_exists():
+            self.search_window.lift()
+            return
+        self.search_window = SearchWindow(self.root, self.engine, self.jump_to_seq, self.current_font)
+
+    def jump_to_seq(self, seq):
+        # Matches are display_data sequence numbers; the terminal may have skipped or cleared some
+        line = self.rx_text.line_for_seq(seq)
+        if line is not None:
+            self.rx_text.mark_line(line)
+
+    def goto_rx_line(self):
+        try:
+            line = int(self.goto_entry.get())
+        except ValueError:
+            messagebox.showerror("Error", "Line number must be a whole number")
+            return
+        # Line numbers count from 1 since the last clear
+        self.rx_text.see_line(self.rx_text.store.origin + line - 1)
+
+    def update_graph(self, force=False):
+        if not hasattr(self, 'live_plot'):
+            return  # Graph tab not opened yet; it draws the whole history when it is
+        with self.m_graph.time():
+            self.draw_graph(force)
+
+    def draw_graph(self, force=False):
+        if self.graph_live_var.get():
+            from cocowatt.decimate import decimate
+            # Only the visible window, reduced to about one min/max pair per pixel, is handed to matplotlib
+            autoscale = not self._graph_zoomed
+            width = max(int(self.ax.bbox.width), 100)
+            with self.engine.lock:
+                if autoscale:
+                    starts = [hist.t_min for hist in self.parser_history.values() if hist]
+                    self._graph_t0 = min(starts) if starts else 0.0
+                # While zoomed the origin stays put, or the window would drift as old samples are evicted
+                t0 = self._graph_t0
+                lo, hi = (None, None) if autoscale else [x + t0 for x in self.ax.get_xlim()]
+                series = {}
+                for pattern, hist in self.parser_history.items():
+                    times, values = decimate(hist.times, hist.values, width, lo, hi)
+                    series[pattern] = (times - t0, values.copy())
+            self._graph_own_limits = True
+            try:
+                self.live_plot.update(series, autoscale=autoscale, force=force)
+            finally:
+                self._graph_own_limits = False
+            if autoscale:
+                self._graph_follow_xlim = tuple(self.ax.get_xlim())
+            return
+        with self.engine.lock:
+            history = {p: list(hist) for p, hist in self.parser_history.items()}
         bg = self.theme_colors[self.current_theme]["graph_bg"]
         fg = self.theme_colors[self.current_theme]["graph_fg"]
-        self.ax.clear()
-        self.ax.set_facecolor(bg)
-        self.ax.set_title("Live Parsed Values", color=fg, fontsize=12)
-        self.ax.set_xlabel("Time (s)", color=fg, fontsize=10)
-        self.ax.set_ylabel("Value", color=fg, fontsize=10)
-        self.ax.grid(True, alpha=0.4, color=fg, linestyle='--')
-        self.ax.tick_params(colors=fg, labelsize=9)
-        if not self.parser_history:
+        self.reset_graph_axes()
+        if not history:
             self.ax.text(0.5, 0.5, "No data to plot", transform=self.ax.transAxes, ha="center", color=fg, fontsize=12)
             self.figure.set_facecolor(bg)
             self.canvas.draw()
             return
         all_times = []
-        for hist in self.parser_history.values():
+        for hist in history.values():
             if hist:
                 all_times.extend([t for t, v in hist])
         if not all_times:
@@ -801,8 +1247,7 @@ class SerialTerminalApp:
             self.canvas.draw()
             return
         t0 = min(all_times)
-        patterns = list(self.parser_history.keys())
-        for i, (pattern, hist) in enumerate(self.parser_history.items()):
+        for i, (pattern, hist) in enumerate(history.items()):
             if hist:
                 times = [(t - t0) for t, v in hist]
                 values = [v for t, v in hist]
@@ -812,12 +1257,52 @@ class SerialTerminalApp:
         self.figure.set_facecolor(bg)
         self.canvas.draw()
 
+    def reset_graph_axes(self):
+        bg = self.theme_colors[self.current_theme]["graph_bg"]
+        fg = self.theme_colors[self.current_theme]["graph_fg"]
+        self._graph_own_limits = True
+        try:
+            self.ax.clear()
+        finally:
+            self._graph_own_limits = False
+        self.ax.callbacks.connect('xlim_changed', self.on_graph_limits_changed)  # clear() drops callbacks
+        self._graph_zoomed = False
+        self._graph_follow_xlim = None
+        self.live_plot.reset()
+        self.ax.set_facecolor(bg)
+        self.ax.set_title("Live Parsed Values", color=fg, fontsize=12)
+        self.ax.set_xlabel("Time (s)", color=fg, fontsize=10)
+        self.ax.set_ylabel("Value", color=fg, fontsize=10)
+        self.ax.grid(True, alpha=0.4, color=fg, linestyle='--')
+        self.ax.tick_params(colors=fg, labelsize=9)
+
+    def on_graph_limits_changed(self, ax):
+        # Any limit change we did not make ourselves (zoom, pan, Home, Back, Forward): decimate again for it
+        if self._graph_own_limits or not self.graph_live_var.get():
+            return
+        if self._graph_follow_xlim is not None and tuple(ax.get_xlim()) == self._graph_follow_xlim:
+            # Home (or Back to it) lands on the view the zoom started from: follow the data again
+            self._graph_zoomed = False
+            self.toolbar.update()
+        else:
+            self._graph_zoomed = True
+        if self._zoom_job is None:
+            self.live_plot.needs_full_draw = True
+            self._zoom_job = self.root.after_idle(self._redraw_after_zoom)
+
+    def _redraw_after_zoom(self):
+        self._zoom_job = None
+        self.update_graph(force=True)
+
+    def switch_graph_mode(self):
+        # Drop whatever the other mode left on the axes before drawing again
+        self.reset_graph_axes()
+        self.update_graph(force=True)
+
     def clear_display(self):
-        self.display_data = []
-        self.buffer = ""
-        self.output_text.config(state="normal")
-        self.output_text.delete(1.0, tk.END)
-        self.output_text.config(state="disabled")
+        self.engine.clear_display()
+        self.rx_seq = self.engine.display_data.next_seq
+        self.output_text.clear()
 
     def clear_all_data(self, confirm=True):
         if confirm and len(self.display_data) > 100:
@@ -828,16 +1313,11 @@ class SerialTerminalApp:
             )
             if not result:
                 return
-        self.display_data = []
-        self.buffer = ""
-        self.output_text.config(state="normal")
-        self.output_text.delete(1.0, tk.END)
-        self.output_text.config(state="disabled")
-        self.parsed_output.config(state="normal")
-        self.parsed_output.delete(1.0, tk.END)
-        self.parsed_output.config(state="disabled")
-        self.parser_values = {p: None for p in self.parser_values}
-        self.parser_history = {p: deque(maxlen=self.max_history) for p in self.parser_history}
+        self.engine.clear()
+        self.rx_seq = self.engine.display_data.next_seq
+        self.update_stats_table()
+        self.output_text.clear()
+        self.show_parsed_values()
         self.update_graph()
         if not confirm:
             return
@@ -858,15 +1338,15 @@ class SerialTerminalApp:
             with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
                 writer = csv.writer(f)
                 writer.writerow(['Timestamp', 'Data'])
-                for entry in self.display_data:
+                for entry in self.engine.iter_entries():
                     clean_data = entry['data'].replace('\x00', '').replace('\r', '').replace('\n', ' ')
-                    writer.writerow([entry['timestamp'], clean_data])
+                    writer.writerow([format_ns(entry['t']), clean_data])
             messagebox.showinfo("Success", f"Exported to:\n{filename}")
         except Exception as e:
             messagebox.showerror("Export Error", f"Failed to export:\n{str(e)}")
     
     def export_graph(self):
-        if not self.parser_history:
+        if not self.parser_history or not hasattr(self, 'figure'):
             messagebox.showinfo("Info", "No graph data to export")
             return
         filename = filedialog.asksaveasfilename(
@@ -886,9 +1366,16 @@ class SerialTerminalApp:
         self.apply_theme()
 
     def on_closing(self):
-        self.running = False
-        if self.serial_conn and self.serial_conn.is_open:
-            self.serial_conn.close()
+        if self._frame_job is not None:
+            self.root.after_cancel(self._frame_job)
+        if self._spectrum_job is not None:
+            self.root.after_cancel(self._spectrum_job)
+        if self._metrics_job is not None:
+            self.root.after_cancel(self._metrics_job)
+        if self.engine.profiler.active:
+            self.engine.profiler.stop(timeout=0)
+        # Only detaches from a background capture; it keeps recording until disconnected explicitly
+        self.engine.close()
         if self.session_log_file and not self.session_log_file.closed:
             self.session_log_file.close()
         self.root.destroy()
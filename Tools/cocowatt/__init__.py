@@ -0,0 +1,39 @@
+"""GUI-free capture pipeline used by COCOWATTSerialMonitor and the ``cocowatt`` CLI.
+
+The names below are imported from their modules on first access, so importing
+one module (``cocowatt.engine`` at monitor start-up) does not load asyncio, the
+capture-file, replay and multi-port code with it.
+"""
+import importlib
+
+_EXPORTS = {
+    "engine": ("CaptureEngine", "CsvRecorder", "open_serial", "DEFAULT_PATTERNS", "READER_MODES", "PROTOCOLS"),
+    "parser": ("PatternParser", "parse_line_for_patterns"),
+    "framer": ("LineFramer",),
+    "binproto": ("FrameDecoder", "encode_frame", "generate_frames"),
+    "sessionlog": ("SessionLogger",),
+    "capfile": ("CaptureReader", "CaptureWriter", "csv_to_capture", "capture_to_csv"),
+    "multiport": ("MultiCapture", "Device"),
+    "aio": ("AsyncMonitor", "Sample", "shared_loop"),
+    "stats": ("RunningStats", "WindowStats", "ChannelStats"),
+    "spectrum": ("Spectrum",),
+    "replay": ("Replay",),
+    "search": ("LineIndex", "MatchList"),
+    "metrics": ("Metrics", "Profiler", "Counter", "Gauge", "Histogram"),
+    "shmring": ("ShmRing", "RingFollower", "spawn_capture"),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+__all__ = list(_MODULE_OF)
+
+
+def __getattr__(name):
+    module = _MODULE_OF.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
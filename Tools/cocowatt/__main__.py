@@ -0,0 +1,241 @@
+"""Command line entry point: ``python -m cocowatt capture --port COM3 --out run.csv``."""
+import argparse
+import sys
+import time
+
+from .engine import CaptureEngine, CsvRecorder, DEFAULT_PATTERNS, READER_MODES, PROTOCOLS
+from .sessionlog import SessionLogger
+from .capfile import CaptureWriter, EXTENSION, csv_to_capture, capture_to_csv
+from .multiport import MultiCapture
+from .clock import format_ns
+
+
+def cmd_capture(args):
+    engine = CaptureEngine(patterns=args.pattern, max_history=args.history, max_line_length=args.max_line,
+                           reader_mode=args.reader, protocol=args.protocol)
+    recorder = CsvRecorder(args.out) if args.out else None
+    if recorder:
+        engine.add_listener(recorder)
+    capture = CaptureWriter(args.capture, engine.patterns) if args.capture else None
+    if capture:
+        engine.add_listener(capture)
+    session = None
+    if args.session:
+        session = SessionLogger(args.session, rotate_bytes=int(args.rotate_mb * 1024 * 1024),
+                                rotate_seconds=args.rotate_min * 60, fsync_interval=args.fsync)
+        engine.add_listener(session)
+        session.register_metrics(engine.metrics)
+    if not args.quiet:
+        engine.add_listener(lambda entries, parsed: print(
+            "\n".join(f"{format_ns(e['t'])} {e['data']}" for e in entries), flush=True))
+    ring = None
+    if args.shm:
+        from .shmring import ShmRing, find_ring
+        if find_ring(args.shm) is not None:
+            print(f"{args.shm} is already being written by a running capture", file=sys.stderr)
+            return 1
+        ring = ShmRing.create(args.shm, args.shm_lines, args.shm_text_mb, patterns=engine.patterns)
+        engine.add_listener(ring)
+    if args.profile:
+        engine.profiler.start()
+    replay = None
+    if args.replay:
+        replay = engine.open_replay(args.replay, args.speed, args.loop)
+    else:
+        engine.open(args.port, args.baud, args.bytesize, args.parity, args.stopbits)
+    start = time.time()
+    next_dump = start + args.metrics_interval
+    try:
+        while engine.is_open:
+            time.sleep(0.05 if ring else 0.2)
+            if ring:
+                ring.heartbeat(engine)
+                if ring.stop_requested:
+                    break
+                handle_control(engine, ring.take_control())
+            if args.metrics and time.time() >= next_dump:
+                engine.metrics.write(args.metrics)
+                next_dump += args.metrics_interval
+            if args.duration and time.time() - start >= args.duration:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+        # Let the processor drain what the reader already queued
+        while not engine.data_queue.empty():
+            time.sleep(0.01)
+        time.sleep(0.05)
+        if recorder:
+            recorder.close()
+        if session:
+            session.close()
+        if capture:
+            capture.close()
+        if ring:
+            engine.remove_listener(ring)
+            ring.close()
+        if args.metrics:
+            engine.metrics.write(args.metrics)
+        if args.profile:
+            engine.profiler.stop_to(args.profile)
+            print(f"profile written to {args.profile}.txt and {args.profile}.prof", file=sys.stderr)
+    elapsed = max(time.time() - start, 1e-9)
+    print(f"{engine.lines_received} lines, {engine.bytes_received} bytes in {elapsed:.1f} s "
+          f"({engine.lines_received / elapsed:.1f} lines/s, {engine.wakeups / elapsed:.1f} reader wakeups/s, "
+          f"{engine.dropped_lines} dropped)",
+          file=sys.stderr)
+    if replay:
+        stats = replay.stats()
+        speed = f"{args.speed:g}x" if args.speed else "max speed"
+        print(f"replay ({speed}): {stats['lines']} lines in {stats['seconds']:.2f} s, "
+              f"{stats['lines_per_s']:,.0f} lines/s fed, {stats['mb_per_s']:.1f} MB/s"
+              + (f", error: {replay.error}" if replay.error else ""), file=sys.stderr)
+    if engine.decoder is not None:
+        decoder = engine.decoder
+        print(f"{decoder.frames} frames, {decoder.lost_frames} lost (sequence gaps), {decoder.crc_errors} CRC errors, "
+              f"{decoder.skipped_bytes} bytes skipped", file=sys.stderr)
+        clock = engine.tick_clock.stats()
+        if clock['samples']:
+            print(f"STM tick vs host: {clock['drift_ppm']:+.1f} ppm drift, {clock['host_jitter_us']:.0f} us host jitter, "
+                  f"{clock['wraps']} wraps", file=sys.stderr)
+    for pattern, windows in engine.stats_snapshot().items():
+        total = windows["all"]
+        if total["count"]:
+            print(f"{pattern} n={total['count']} min={total['min']:.6g} max={total['max']:.6g} "
+                  f"mean={total['mean']:.6g} std={total['std']:.3g} rms={total['rms']:.6g} "
+                  f"{total['rate']:.1f} samples/s", file=sys.stderr)
+    if session:
+        stats = session.stats()
+        print(f"log: {stats['rows']} rows in {stats['files']} files, {stats['mb_per_s']:.2f} MB/s, "
+              f"max latency {stats['max_latency_ms']:.1f} ms, max fsync {stats['max_fsync_ms']:.1f} ms, "
+              f"{stats['dropped']} dropped, {stats['errors']} I/O errors", file=sys.stderr)
+    return 0
+
+
+def handle_control(engine, message):
+    """Apply a message the monitor posted to the ring's mailbox."""
+    if not message:
+        return
+    if "patterns" in message:
+        engine.set_patterns(message["patterns"])
+    if "send" in message:
+        try:
+            engine.write(message["send"])
+        except Exception as e:
+            print(f"send failed: {e}", file=sys.stderr)
+
+
+def cmd_multi(args):
+    capture = MultiCapture(patterns=args.pattern, max_history=args.history, max_line_length=args.max_line,
+                           protocol=args.protocol)
+    recorder = CsvRecorder(args.out, with_device=True) if args.out else None
+    if recorder:
+        capture.add_listener(recorder)
+    if not args.quiet:
+        capture.add_listener(lambda entries, parsed: print(
+            "\n".join(f"{format_ns(e['t'])} [{e['device']}] {e['data']}" for e in entries), flush=True))
+    for port in args.port:
+        capture.add(port, args.baud, args.bytesize, args.parity, args.stopbits)
+    start = time.time()
+    try:
+        while any(d.is_open for d in capture.devices.values()):
+            time.sleep(0.2)
+            if args.duration and time.time() - start >= args.duration:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        snapshot = capture.snapshot()
+        capture.close()
+        if recorder:
+            recorder.close()
+    elapsed = max(time.time() - start, 1e-9)
+    for name, info in snapshot.items():
+        error = f"  ({info['error']})" if info['error'] else ""
+        print(f"{name}: {info['lines']} lines, {info['lines'] / elapsed:.1f} lines/s{error}", file=sys.stderr)
+    print(f"total {capture.lines_received} lines, {capture.wakeups / elapsed:.1f} selector wakeups/s, "
+          f"{capture.dropped_lines} dropped", file=sys.stderr)
+    return 0
+
+
+def cmd_convert(args):
+    start = time.time()
+    if args.source.endswith(EXTENSION):
+        rows = capture_to_csv(args.source, args.dest)
+    else:
+        rows = csv_to_capture(args.source, args.dest, args.pattern or DEFAULT_PATTERNS)
+    print(f"{rows} rows converted in {time.time() - start:.1f} s", file=sys.stderr)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cocowatt", description="COCOWATT headless serial capture")
+    sub = parser.add_subparsers(dest="command", required=True)
+    cap = sub.add_parser("capture", help="capture a serial port (or replay a recording) to CSV")
+    source = cap.add_mutually_exclusive_group(required=True)
+    source.add_argument("--port")
+    source.add_argument("--replay", metavar="FILE",
+                        help=f"feed a CSV log or {EXTENSION} file through the pipeline instead of a port")
+    cap.add_argument("--speed", type=float, default=1.0,
+                     help="replay speed multiplier; 0 = as fast as the pipeline keeps up")
+    cap.add_argument("--loop", action="store_true", help="restart the replay at the end of the file")
+    cap.add_argument("--baud", type=int, default=115200)
+    cap.add_argument("--bytesize", default="8", choices=["5", "6", "7", "8"])
+    cap.add_argument("--parity", default="None", choices=["None", "Even", "Odd", "Mark", "Space"])
+    cap.add_argument("--stopbits", default="1", choices=["1", "1.5", "2"])
+    cap.add_argument("--out", help="CSV file (Timestamp,Data)")
+    cap.add_argument("--capture", metavar="FILE", help=f"native {EXTENSION} capture with parsed columns")
+    cap.add_argument("--session", metavar="PREFIX",
+                     help="rotating, fsynced session log written to PREFIX_001.csv, PREFIX_002.csv, ...")
+    cap.add_argument("--rotate-mb", type=float, default=256, help="start a new session part after N MB")
+    cap.add_argument("--rotate-min", type=float, default=60, help="start a new session part after N minutes")
+    cap.add_argument("--fsync", type=float, default=1.0, help="seconds between flush + fsync of the session log")
+    cap.add_argument("--protocol", default="text", choices=PROTOCOLS,
+                     help="text: ASCII lines; binary: send_UART_frame() frames")
+    cap.add_argument("--reader", default="select", choices=READER_MODES,
+                     help="select: block until bytes arrive; poll: legacy 10 ms in_waiting loop")
+    cap.add_argument("--max-line", type=int, default=4096, help="longest line before it is force-split")
+    cap.add_argument("--history", type=int, default=2000, help="samples kept in memory per parser pattern")
+    cap.add_argument("--pattern", action="append", help="parser pattern, may be repeated")
+    cap.add_argument("--duration", type=float, default=0, help="stop after N seconds (0 = until Ctrl+C)")
+    cap.add_argument("--quiet", action="store_true", help="do not echo lines to stdout")
+    cap.add_argument("--metrics", metavar="FILE",
+                     help="pipeline metrics dump, JSON if FILE ends in .json, else Prometheus text")
+    cap.add_argument("--metrics-interval", type=float, default=5.0, help="seconds between metrics dumps")
+    cap.add_argument("--profile", metavar="PREFIX",
+                     help="cProfile + tracemalloc the capture; writes PREFIX.txt and PREFIX.prof")
+    cap.add_argument("--shm", metavar="NAME",
+                     help="publish lines and parsed values in shared memory NAME for the monitor to follow")
+    cap.add_argument("--shm-lines", type=int, default=1 << 18, help="lines the shared ring holds")
+    cap.add_argument("--shm-text-mb", type=float, default=32, help="MB of line text the shared ring holds")
+    cap.set_defaults(func=cmd_capture)
+    multi = sub.add_parser("multi", help="capture several ports at once into one tagged stream")
+    multi.add_argument("--port", action="append", required=True, help="serial port, repeat for each device")
+    multi.add_argument("--baud", type=int, default=115200)
+    multi.add_argument("--bytesize", default="8", choices=["5", "6", "7", "8"])
+    multi.add_argument("--parity", default="None", choices=["None", "Even", "Odd", "Mark", "Space"])
+    multi.add_argument("--stopbits", default="1", choices=["1", "1.5", "2"])
+    multi.add_argument("--out", help="CSV file (Timestamp,Data,Device)")
+    multi.add_argument("--protocol", default="text", choices=PROTOCOLS)
+    multi.add_argument("--max-line", type=int, default=4096)
+    multi.add_argument("--history", type=int, default=2000)
+    multi.add_argument("--pattern", action="append", help="parser pattern, may be repeated")
+    multi.add_argument("--duration", type=float, default=0, help="stop after N seconds (0 = until Ctrl+C)")
+    multi.add_argument("--quiet", action="store_true")
+    multi.set_defaults(func=cmd_multi)
+    conv = sub.add_parser("convert", help=f"convert a CSV log to {EXTENSION} or back, by the source extension")
+    conv.add_argument("source")
+    conv.add_argument("dest")
+    conv.add_argument("--pattern", action="append", help="parser pattern stored as a column, may be repeated")
+    conv.set_defaults(func=cmd_convert)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
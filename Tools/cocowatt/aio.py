@@ -0,0 +1,262 @@
+"""asyncio capture path: serial ports as read-pipe transports, consumed with ``async for``.
+
+    monitor = AsyncMonitor(patterns=["ADC Volt:"])
+    async for sample in monitor.stream("/dev/ttyUSB0"):
+        print(sample.device, sample.values)
+
+Non-async callers (Tk, ``CaptureEngine(reader_mode="asyncio")``) share one loop running
+on a daemon thread, see ``shared_loop``.
+"""
+import asyncio
+import os
+import threading
+from collections import namedtuple
+
+from .engine import DEFAULT_PATTERNS, PARTIAL_LINE_FLUSH, IDLE_WAKEUP, open_serial, frame_entries
+from .framer import LineFramer
+from .binproto import FrameDecoder
+from .parser import PatternParser
+from .clock import now_ns
+
+# ``t`` is monotonic ns at read time; cocowatt.clock.format_ns / to_epoch convert it
+Sample = namedtuple('Sample', 'device t data values')
+HIGH_WATER = 256  # Batches buffered per port before reading is paused
+LOW_WATER = 64
+
+
+class ReaderProtocol(asyncio.Protocol):
+    """Passes raw chunks to ``on_data`` and calls ``on_quiet`` once the port has been silent for ``quiet`` s."""
+
+    def __init__(self, on_data, on_quiet=None, on_lost=None, quiet=PARTIAL_LINE_FLUSH):
+        self.on_data = on_data
+        self.on_quiet = on_quiet
+        self.on_lost = on_lost
+        self.quiet = quiet
+        self.transport = None
+        self._timer = None
+        self._last_data = 0.0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        self.on_data(data)
+        if self.on_quiet is not None:
+            loop = asyncio.get_running_loop()
+            self._last_data = loop.time()
+            # One pending timer at a time; it re-arms itself instead of being replaced on every chunk
+            if self._timer is None:
+                self._timer = loop.call_later(self.quiet, self._check_quiet)
+
+    def _check_quiet(self):
+        loop = asyncio.get_running_loop()
+        remaining = self._last_data + self.quiet - loop.time()
+        if remaining > 0:
+            self._timer = loop.call_later(remaining, self._check_quiet)
+        else:
+            self._timer = None
+            self.on_quiet()
+
+    def eof_received(self):
+        return False
+
+    def connection_lost(self, exc):
+        if self._timer is not None:
+            self._timer.cancel()
+        if self.on_lost is not None:
+            self.on_lost(exc)
+
+
+class ExecutorReader:
+    """Transport stand-in for ports without a selectable handle (Windows): blocking reads in a worker."""
+
+    def __init__(self, conn, protocol):
+        self.conn = conn
+        self.protocol = protocol
+        self._resume = asyncio.Event()
+        self._resume.set()
+        self._closing = False
+        self.task = asyncio.get_running_loop().create_task(self._run())
+        protocol.connection_made(self)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        self.conn.timeout = IDLE_WAKEUP
+        exc = None
+        try:
+            while not self._closing:
+                await self._resume.wait()
+                data = await loop.run_in_executor(None, lambda: self.conn.read(max(1, self.conn.in_waiting)))
+                if data:
+                    self.protocol.data_received(data)
+        except Exception as e:
+            exc = e
+        self.protocol.connection_lost(exc)
+
+    def pause_reading(self):
+        self._resume.clear()
+
+    def resume_reading(self):
+        self._resume.set()
+
+    def close(self):
+        self._closing = True
+        self._resume.set()
+
+
+async def connect(conn, protocol):
+    """Attach ``protocol`` to an open pyserial ``conn``; returns the transport.
+
+    On POSIX the port's descriptor is duplicated and driven by the loop's read-pipe
+    transport, so no thread is involved; elsewhere an ``ExecutorReader`` is used.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        fd = conn.fileno()
+    except Exception:
+        fd = None
+    if fd is None or os.name != 'posix':
+        return ExecutorReader(conn, protocol)
+    pipe = os.fdopen(os.dup(fd), 'rb', buffering=0)
+    transport, _ = await loop.connect_read_pipe(lambda: protocol, pipe)
+    return transport
+
+
+class AsyncPort:
+    """One open port: framer, a batch queue with pause/resume backpressure, and the transport."""
+
+    def __init__(self, name, conn, max_line_length=4096, protocol="text", high_water=HIGH_WATER,
+                 low_water=LOW_WATER):
+        self.name = name
+        self.conn = conn
+        self.framer = LineFramer(max_line_length)
+        self.decoder = FrameDecoder() if protocol == "binary" else None
+        self.queue = asyncio.Queue()
+        self.high_water = high_water
+        self.low_water = low_water
+        self.paused = False
+        self.pauses = 0
+        self.transport = None
+        self.error = None
+
+    def _push(self, entries):
+        self.queue.put_nowait(entries)
+        if not self.paused and self.queue.qsize() >= self.high_water:
+            # The kernel buffer (and then the device's flow control) absorbs the rest
+            self.paused = True
+            self.pauses += 1
+            self.transport.pause_reading()
+
+    def on_data(self, data):
+        t = now_ns()
+        if self.decoder is not None:
+            entries = frame_entries(self.decoder.feed(data), t)
+        else:
+            entries = [{'t': t, 'data': line} for line in self.framer.feed(data)]
+        if entries:
+            self._push(entries)
+
+    def on_quiet(self):
+        line = self.framer.flush()
+        if line:
+            self._push([{'t': now_ns(), 'data': line}])
+
+    def on_lost(self, exc):
+        self.error = exc
+        self.queue.put_nowait(None)
+
+    async def get(self):
+        """Next batch of entries, or None once the port is closed or lost."""
+        entries = await self.queue.get()
+        if self.paused and self.queue.qsize() <= self.low_water:
+            self.paused = False
+            self.transport.resume_reading()
+        return entries
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+        if self.conn.is_open:
+            self.conn.close()
+
+
+class AsyncMonitor:
+    """Opens ports on the running loop and turns their lines into parsed ``Sample`` streams."""
+
+    def __init__(self, patterns=None, max_line_length=4096, protocol="text", high_water=HIGH_WATER,
+                 low_water=LOW_WATER):
+        self.parser = PatternParser(patterns or DEFAULT_PATTERNS)
+        self.max_line_length = max_line_length
+        self.protocol = protocol
+        self.high_water = high_water
+        self.low_water = low_water
+        self.ports = {}
+
+    async def open(self, port, baudrate=115200, bytesize="8", parity="None", stopbits="1", name=None):
+        name = name or os.path.basename(port)
+        conn = open_serial(port, baudrate, bytesize, parity, stopbits)
+        aport = AsyncPort(name, conn, self.max_line_length, self.protocol, self.high_water, self.low_water)
+        aport.transport = await connect(conn, ReaderProtocol(aport.on_data, aport.on_quiet, aport.on_lost))
+        self.ports[name] = aport
+        return aport
+
+    async def batches(self, port, **settings):
+        """Yield ``(port, entries, parsed)`` per read; cheaper than ``stream`` at high rates."""
+        aport = await self.open(port, **settings)
+        try:
+            while True:
+                entries = await aport.get()
+                if entries is None:
+                    return
+                parsed = [e.get('values') or self.parser.parse(e['data']) for e in entries]
+                yield aport, entries, parsed
+        finally:
+            self.ports.pop(aport.name, None)
+            aport.close()
+
+    async def stream(self, port, **settings):
+        """Yield one ``Sample`` per line until the port is lost or the consumer stops iterating."""
+        async for aport, entries, parsed in self.batches(port, **settings):
+            for entry, values in zip(entries, parsed):
+                yield Sample(aport.name, entry['t'], entry['data'], values)
+
+    def close(self):
+        for aport in list(self.ports.values()):
+            aport.close()
+        self.ports.clear()
+
+
+class LoopThread:
+    """An asyncio loop on a daemon thread, for callers that are not async themselves.
+
+    Tk keeps its own mainloop; coroutines are submitted here with ``submit`` and
+    results come back through the usual thread-safe queues polled by ``root.after``.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="asyncio-capture", daemon=True)
+        self.thread.start()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call(self, func, *args):
+        self.loop.call_soon_threadsafe(func, *args)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(1.0)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_loop():
+    """The process-wide ``LoopThread``, started on first use."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LoopThread()
+        return _shared
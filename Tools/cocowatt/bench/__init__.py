@@ -0,0 +1,29 @@
+"""Stand-alone micro- and end-to-end benchmarks. Run one with ``python -m cocowatt.bench.<name>``,
+or the regression suite against stored baselines with ``python -m cocowatt.bench``."""
+import time
+
+
+def timeit(func, repeat=3):
+    """Best wall time of ``repeat`` calls to ``func``, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def adc_stream(lines, line_length=0, terminator=b"\n\r"):
+    """Synthetic firmware output: ``lines`` lines, each padded to ``line_length`` bytes."""
+    out = bytearray()
+    for i in range(lines):
+        bits = 2048 + (i * 37) % 2000
+        line = b"ADC Bits:%d ADC Volt:%.3f" % (bits, bits * 5.0 / 4095)
+        if line_length > len(line):
+            line += b" " + b"x" * (line_length - len(line) - 1)
+        out += line + terminator
+    return bytes(out)
+
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
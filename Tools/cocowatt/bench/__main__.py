@@ -0,0 +1,6 @@
+"""``python -m cocowatt.bench``: the regression suite in ``suite``."""
+import sys
+
+from .suite import main
+
+sys.exit(main())
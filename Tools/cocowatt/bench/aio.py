@@ -0,0 +1,104 @@
+"""32 pty devices: threaded CaptureEngine readers vs. the asyncio path (AsyncMonitor and reader_mode="asyncio")."""
+import argparse
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+
+from ..aio import AsyncMonitor
+from ..engine import CaptureEngine
+from ..sim import PtyPair
+from .multiport import drive
+
+
+def run_engines(ptys, rate, seconds, reader_mode):
+    received = [0]
+    lock = threading.Lock()
+
+    def count(entries, parsed):
+        with lock:
+            received[0] += len(entries)
+
+    before = set(threading.enumerate())
+    engines = []
+    for pty in ptys:
+        engine = CaptureEngine(reader_mode=reader_mode)
+        engine.add_listener(count)
+        engine.open(pty.port)
+        engines.append(engine)
+    threads = len(set(threading.enumerate()) - before)
+    time.sleep(0.2)
+    cpu0 = time.process_time()
+    sent = drive(ptys, rate, seconds)
+    time.sleep(0.3)
+    cpu = time.process_time() - cpu0
+    for engine in engines:
+        engine.close()
+    return threads, cpu, received[0], sent
+
+
+def run_asyncio(ptys, rate, seconds):
+    received = [0]
+    result = {}
+
+    async def consume(monitor, port):
+        async for aport, entries, parsed in monitor.batches(port):
+            received[0] += len(entries)
+
+    async def main():
+        monitor = AsyncMonitor()
+        before = set(threading.enumerate())
+        tasks = [asyncio.create_task(consume(monitor, pty.port)) for pty in ptys]
+        await asyncio.sleep(0.2)
+        # The writer runs in a thread so the loop only does the capture work
+        cpu0 = time.process_time()
+        writer = threading.Thread(target=lambda: result.setdefault('sent', drive(ptys, rate, seconds)))
+        writer.start()
+        while writer.is_alive():
+            await asyncio.sleep(0.05)
+        await asyncio.sleep(0.3)
+        result['cpu'] = time.process_time() - cpu0
+        result['threads'] = len(set(threading.enumerate()) - before - {writer})
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run(main())
+    return result['threads'], result['cpu'], received[0], result['sent']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=32)
+    parser.add_argument("--rate", type=float, default=100, help="lines per second per device")
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.mode:
+        return run_mode(args)
+    print(f"{'mode':>16} {'threads':>8} {'CPU %':>7} {'received':>17}")
+    # A fresh interpreter per mode: CaptureEngine processor threads outlive close()
+    for mode in MODES:
+        subprocess.run([sys.executable, "-m", __spec__.name, "--mode", mode, "--devices", str(args.devices),
+                        "--rate", str(args.rate), "--seconds", str(args.seconds)], check=True)
+
+
+MODES = ("threaded", "engine-asyncio", "AsyncMonitor")
+
+
+def run_mode(args):
+    ptys = [PtyPair() for _ in range(args.devices)]
+    if args.mode == "AsyncMonitor":
+        threads, cpu, received, sent = run_asyncio(ptys, args.rate, args.seconds)
+    else:
+        threads, cpu, received, sent = run_engines(ptys, args.rate, args.seconds,
+                                                   "select" if args.mode == "threaded" else "asyncio")
+    for pty in ptys:
+        pty.close()
+    print(f"{args.mode:>16} {threads:>8} {cpu / (args.seconds + 0.3) * 100:>7.1f} "
+          f"{received:>8}/{sent * args.devices:<8}", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Binary frames vs. ASCII lines: bytes per sample, samples/s at 115200 baud and host decode rate."""
+import argparse
+
+from ..binproto import FrameDecoder, generate_frames, channel_values
+from ..framer import LineFramer
+from ..parser import PatternParser
+from . import timeit, chunked
+
+BAUD_BYTES = 115200 / 10  # 8N1: 10 bits on the wire per byte
+
+
+def ascii_stream(count):
+    out = bytearray()
+    for i in range(count):
+        bits = (2048 + i * 37) % 4096
+        mv = bits * 5000 // 4095
+        out += b"ADC Bits: %u ADC mVolt: %u mV ADC Volt: %.3f V\n\r" % (bits, mv, mv / 1000.0)
+    return bytes(out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=50000)
+    parser.add_argument("--chunk", type=int, default=256)
+    args = parser.parse_args(argv)
+    text = ascii_stream(args.samples)
+    binary = generate_frames(args.samples)
+    patterns = PatternParser(["ADC Bits:", "ADC Volt:"])
+
+    def decode_text():
+        framer = LineFramer()
+        for data in chunked(text, args.chunk):
+            for line in framer.feed(data):
+                patterns.parse(line)
+
+    def decode_binary():
+        decoder = FrameDecoder()
+        for data in chunked(binary, args.chunk):
+            for frame in decoder.feed(data):
+                channel_values(frame.values)
+        assert decoder.frames == args.samples
+
+    for name, stream, func in (("ascii", text, decode_text), ("binary", binary, decode_binary)):
+        per_sample = len(stream) / args.samples
+        seconds = timeit(func)
+        print(f"{name:>7}: {per_sample:5.1f} bytes/sample, {BAUD_BYTES / per_sample:7.0f} samples/s at 115200 baud, "
+              f"host decode {args.samples / seconds:>10,.0f} samples/s")
+
+
+if __name__ == "__main__":
+    main()
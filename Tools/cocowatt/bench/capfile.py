@@ -0,0 +1,65 @@
+"""Reopening a run: CSV re-import (DictReader + strptime + parse) vs. .cwcap open and windowed reads."""
+import argparse
+import csv
+import os
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+
+from ..capfile import CaptureReader, CaptureWriter
+from ..parser import PatternParser
+from . import timeit, adc_stream
+
+PATTERNS = ["ADC Bits:", "ADC Volt:"]
+
+
+def legacy_import(path, parser):
+    # What import_csv_data does per row
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    times = [datetime.strptime(row['Timestamp'], "%H:%M:%S.%f") for row in rows]
+    return times, parser.parse_many([row['Data'] for row in rows])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--window", type=float, default=60.0, help="seconds read back at random positions")
+    args = parser.parse_args(argv)
+    lines = adc_stream(args.rows).decode().split("\n\r")[:-1]
+    times = 1.7e9 + np.arange(args.rows) * 0.01
+    compiled = PatternParser(PATTERNS)
+    columns = {}
+    for pattern, (rows, values) in compiled.parse_many(lines).items():
+        columns[pattern] = np.full(args.rows, np.nan)
+        columns[pattern][rows] = values
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "run.csv")
+        cap_path = os.path.join(tmp, "run.cwcap")
+        with open(csv_path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Timestamp', 'Data'])
+            writer.writerows(zip((datetime.fromtimestamp(t).strftime("%H:%M:%S.%f")[:-3] for t in times), lines))
+        start = time.perf_counter()
+        with CaptureWriter(cap_path, PATTERNS) as cap:
+            cap.extend(times, lines, columns)
+        write = time.perf_counter() - start
+        print(f"{args.rows:,} rows: CSV {os.path.getsize(csv_path) / 1e6:.1f} MB, "
+              f".cwcap {os.path.getsize(cap_path) / 1e6:.1f} MB (written in {write:.2f} s)")
+        legacy = timeit(lambda: legacy_import(csv_path, compiled), repeat=1)
+        print(f"CSV re-import         {legacy * 1000:10.1f} ms")
+        opened = timeit(lambda: CaptureReader(cap_path).close())
+        print(f".cwcap open           {opened * 1000:10.3f} ms")
+        rng = np.random.default_rng(1)
+        with CaptureReader(cap_path) as reader:
+            starts = rng.uniform(reader.t_min, reader.t_max - args.window, 20)
+            window = timeit(lambda: [reader.series("ADC Volt:", t, t + args.window) for t in starts]) / len(starts)
+            full = timeit(lambda: reader.series("ADC Volt:"), repeat=1)
+        print(f".cwcap {args.window:g} s window   {window * 1000:10.3f} ms")
+        print(f".cwcap full column    {full * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""CSV import: legacy DictReader + strptime per row vs. the streaming, vectorized importer.
+
+Each measurement runs in a fresh interpreter so its peak RSS can be reported.
+"""
+import argparse
+import csv
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from ..csvimport import iter_csv_chunks
+from ..history import SeriesRing
+from ..parser import PatternParser
+from . import adc_stream
+
+PATTERNS = ["ADC Bits:", "ADC Volt:"]
+HISTORY = 2000
+
+
+def legacy_import(path, parser):
+    # The original import_csv_data, minus the Tk inserts
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    display, times, datas = [], [], []
+    for row in rows:
+        ts_str = row['Timestamp']
+        try:
+            dt = datetime.strptime(ts_str, "%H:%M:%S.%f") if '.' in ts_str else datetime.strptime(ts_str, "%H:%M:%S")
+        except ValueError:
+            continue
+        display.append({'timestamp': ts_str, 'data': row['Data']})
+        times.append(dt.timestamp())
+        datas.append(row['Data'])
+    parser.parse_many(datas)
+    return len(display)
+
+
+def streaming_import(path, parser):
+    history = {p: SeriesRing(HISTORY) for p in parser.patterns}
+    rows = 0
+    for times, lines, parsed in iter_csv_chunks(path, parser):
+        for pattern, (idx, values) in parsed.items():
+            history[pattern].extend(times[idx], values)
+        rows += len(lines)
+    return rows
+
+
+def write_log(path, rows):
+    block = adc_stream(10000).decode().split("\n\r")[:-1]
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Timestamp', 'Data'])
+        for i in range(rows):
+            ms = i * 10 % 86_400_000
+            writer.writerow([f"{ms // 3_600_000:02d}:{ms // 60_000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}",
+                             block[i % len(block)]])
+
+
+def run_one(mode, path):
+    parser = PatternParser(PATTERNS)
+    start = time.perf_counter()
+    rows = (legacy_import if mode == "legacy" else streaming_import)(path, parser)
+    elapsed = time.perf_counter() - start
+    print(rows, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def measure(mode, path):
+    out = subprocess.run([sys.executable, "-m", __spec__.name, "--one", mode, path],
+                         capture_output=True, text=True, check=True).stdout.split()
+    return int(out[0]), float(out[1]), int(out[2]) / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", default="100000,1000000", help="comma separated log sizes, e.g. 100000,10000000")
+    parser.add_argument("--legacy-max", type=int, default=1_000_000, help="skip the legacy import above this size")
+    parser.add_argument("--one", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.one:
+        return run_one(*args.one)
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in map(int, args.rows.split(',')):
+            path = os.path.join(tmp, f"log_{rows}.csv")
+            write_log(path, rows)
+            print(f"{rows:>11,} rows, {os.path.getsize(path) / 1e6:8.1f} MB")
+            for mode in ("legacy", "streaming"):
+                if mode == "legacy" and rows > args.legacy_max:
+                    continue
+                count, elapsed, rss = measure(mode, path)
+                print(f"    {mode:<10} {elapsed:8.2f} s  {count / elapsed:>11,.0f} rows/s  peak RSS {rss:8.1f} MB")
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
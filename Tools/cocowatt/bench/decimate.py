@@ -0,0 +1,55 @@
+"""Redraw time as history grows: full series vs. min/max and LTTB decimation to the canvas width."""
+import argparse
+import time
+
+import numpy as np
+
+from ..decimate import decimate
+from ..history import SeriesRing
+from ..liveplot import LivePlot
+from .plot import new_canvas, COLORS
+
+
+def redraw_ms(hist, method, frames):
+    figure, ax, canvas = new_canvas()
+    plot = LivePlot(ax, canvas, COLORS, max_fps=0)
+    width = int(ax.bbox.width)
+
+    def frame():
+        t0 = hist.t_min
+        if method == "none":
+            times, values = hist.times, hist.values
+        else:
+            times, values = decimate(hist.times, hist.values, width, method=method)
+        # Blit path, as in steady-state live plotting
+        plot.update({"ADC Volt:": (times - t0, values)}, autoscale=False)
+        return len(times)
+
+    plot.update({"ADC Volt:": (hist.times - hist.t_min, hist.values)}, force=True)
+    start = time.perf_counter()
+    for _ in range(frames):
+        drawn = frame()
+    return (time.perf_counter() - start) * 1000 / frames, drawn
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=5)
+    parser.add_argument("--max-full", type=int, default=1_000_000, help="largest history drawn undecimated")
+    args = parser.parse_args(argv)
+    rng = np.random.default_rng(0)
+    print(f"{'samples':>11} {'full ms':>9} {'minmax ms':>10} {'lttb ms':>9} {'points drawn':>13}")
+    for samples in (10_000, 100_000, 1_000_000, 10_000_000):
+        hist = SeriesRing(samples)
+        times = np.arange(samples) * 0.001
+        values = 2.5 + 0.01 * rng.standard_normal(samples)
+        values[rng.integers(0, samples, 5)] = 4.9  # spikes that must stay visible
+        hist.extend(times, values)
+        full = f"{redraw_ms(hist, 'none', args.frames)[0]:>9.1f}" if samples <= args.max_full else f"{'-':>9}"
+        mm, drawn = redraw_ms(hist, "minmax", args.frames)
+        lt, _ = redraw_ms(hist, "lttb", args.frames)
+        print(f"{samples:>11,} {full} {mm:>10.1f} {lt:>9.1f} {drawn:>13,}")
+
+
+if __name__ == "__main__":
+    main()
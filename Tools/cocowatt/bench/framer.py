@@ -0,0 +1,57 @@
+"""Legacy str-buffer splitting vs. LineFramer on synthetic "ADC Bits:2252 ADC Volt:2.749" streams.
+
+The legacy loop was inline in the reader, so for short lines in small reads the
+framer pays one method call per read (a few hundred ns, well under the read
+itself); the gain is on long lines, which the legacy loop rescanned per read.
+"""
+import argparse
+
+from ..framer import LineFramer
+from . import timeit, adc_stream, chunked
+
+
+def legacy_split(chunks):
+    # The pre-framer read_serial algorithm
+    buffer = ""
+    count = 0
+    for data in chunks:
+        out = []
+        buffer += data.decode('iso-8859-1', errors='replace')
+        buffer = buffer.replace('\r\n', '\n').replace('\r', '\n')
+        if '\n' in buffer:
+            lines = buffer.split('\n')
+            buffer = lines[-1]
+            for line in lines[:-1]:
+                if line.strip():
+                    out.append(line.strip())
+        count += len(out)
+    return count
+
+
+def framer_split(chunks, max_line_length):
+    framer = LineFramer(max_line_length)
+    count = 0
+    for data in chunks:
+        count += len(framer.feed(data))
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--chunk", type=int, default=64, help="bytes per serial read")
+    args = parser.parse_args(argv)
+    print(f"{'line bytes':>10} {'legacy lines/s':>15} {'framer lines/s':>15} {'speedup':>8}")
+    for line_length in (30, 256, 4096, 32768):
+        lines = max(args.lines * 30 // line_length, 200)
+        chunks = chunked(adc_stream(lines, line_length), args.chunk)
+        # The engine's default limit; only the longest lines need a larger one
+        limit = max(4096, line_length * 2)
+        assert legacy_split(chunks) == framer_split(chunks, limit) == lines
+        legacy = timeit(lambda: legacy_split(chunks), 5)
+        framed = timeit(lambda: framer_split(chunks, limit), 5)
+        print(f"{line_length:>10} {lines / legacy:>15,.0f} {lines / framed:>15,.0f} {legacy / framed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
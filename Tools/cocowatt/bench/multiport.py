@@ -0,0 +1,85 @@
+"""Many pty devices: one CaptureEngine per port vs. a single MultiCapture, in CPU time and threads."""
+import argparse
+import threading
+import time
+
+from ..engine import CaptureEngine
+from ..multiport import MultiCapture
+from ..sim import PtyPair
+
+LINE = b"ADC Bits:2252 ADC Volt:2.749\n\r"
+
+
+def drive(ptys, rate, seconds):
+    """One writer for all devices: every pty gets ``rate`` lines/s, sent in 10 ms ticks."""
+    tick = 0.01
+    per_tick = max(1, round(rate * tick))
+    start = time.perf_counter()
+    for i in range(int(seconds / tick)):
+        delay = start + i * tick - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        for pty in ptys:
+            pty.write(LINE * per_tick)
+    return int(seconds / tick) * per_tick
+
+
+def run(mode, devices, rate, seconds):
+    ptys = [PtyPair() for _ in range(devices)]
+    counts = {}
+    lock = threading.Lock()
+
+    def count(entries, parsed, name=None):
+        with lock:
+            for entry in entries:
+                key = entry.get('device', name)
+                counts[key] = counts.get(key, 0) + 1
+
+    threads_before = threading.active_count()
+    if mode == "engines":
+        engines = []
+        for i, pty in enumerate(ptys):
+            engine = CaptureEngine()
+            engine.add_listener(lambda entries, parsed, name=pty.port: count(entries, parsed, name))
+            engine.open(pty.port)
+            engines.append(engine)
+        wakeups = lambda: sum(e.wakeups for e in engines)
+    else:
+        multi = MultiCapture()
+        multi.add_listener(count)
+        for pty in ptys:
+            multi.add(pty.port)
+        wakeups = lambda: multi.wakeups
+    threads = threading.active_count() - threads_before
+    time.sleep(0.2)
+    cpu0, wake0 = time.process_time(), wakeups()
+    sent = drive(ptys, rate, seconds)
+    time.sleep(0.3)
+    cpu = time.process_time() - cpu0
+    woke = wakeups() - wake0
+    if mode == "engines":
+        for engine in engines:
+            engine.close()
+    else:
+        multi.close()
+    for pty in ptys:
+        pty.close()
+    received = sum(counts.values())
+    return threads, cpu / (seconds + 0.3) * 100, woke / seconds, received, sent * devices
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", default="1,4,16", help="comma separated device counts")
+    parser.add_argument("--rate", type=float, default=100, help="lines per second per device")
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args(argv)
+    print(f"{'devices':>7} {'mode':>8} {'threads':>8} {'CPU %':>7} {'wake/s':>8} {'received':>17}")
+    for devices in map(int, args.devices.split(',')):
+        for mode in ("engines", "multi"):
+            threads, cpu, wake, received, sent = run(mode, devices, args.rate, args.seconds)
+            print(f"{devices:>7} {mode:>8} {threads:>8} {cpu:>7.1f} {wake:>8.0f} {received:>8}/{sent:<8}")
+
+
+if __name__ == "__main__":
+    main()
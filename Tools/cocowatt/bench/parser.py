@@ -0,0 +1,42 @@
+"""Parser microbenchmarks: legacy find + re.search per pattern vs. PatternParser.parse and parse_many."""
+import argparse
+import re
+
+from ..parser import PatternParser
+from . import timeit, adc_stream
+
+
+def legacy_parse(line, patterns):
+    # The original SerialTerminalApp.parse_line_for_patterns
+    results = {}
+    for pattern in patterns:
+        if pattern in line:
+            start_idx = line.find(pattern)
+            after = line[start_idx + len(pattern):]
+            match = re.search(r'[\d.]+', after)
+            if match:
+                try:
+                    results[pattern] = float(match.group())
+                except ValueError:
+                    results[pattern] = match.group()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=100000)
+    args = parser.parse_args(argv)
+    lines = adc_stream(args.lines).decode().split("\n\r")[:-1]
+    for patterns in (["ADC Volt:", "ADC Volt2:"], ["ADC Bits:", "ADC Volt:", "ADC mVolt:", "Temp:", "Current:", "ADC Volt2:"]):
+        compiled = PatternParser(patterns)
+        for line in lines[:1000]:
+            assert legacy_parse(line, patterns) == compiled.parse(line)
+        legacy = timeit(lambda: [legacy_parse(line, patterns) for line in lines])
+        single = timeit(lambda: [compiled.parse(line) for line in lines])
+        batch = timeit(lambda: compiled.parse_many(lines))
+        print(f"{len(patterns)} patterns: legacy {len(lines) / legacy:>11,.0f} lines/s   "
+              f"compiled {len(lines) / single:>11,.0f} lines/s   batch {len(lines) / batch:>11,.0f} lines/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Frames per second: full ax.clear() + plot() redraw vs. LivePlot set_data + blitting (offscreen Agg)."""
+import argparse
+import math
+import time
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from ..liveplot import LivePlot
+
+COLORS = ['#4CAF50', '#2196F3', '#FF9800', '#9C27B0']
+
+
+def make_series(points, patterns, shift=0):
+    series = {}
+    for k in range(patterns):
+        times = [i * 0.01 for i in range(shift, shift + points)]
+        values = [2.5 + math.sin(t + k) for t in times]
+        series[f"ADC Volt{k or ''}:"] = (times, values)
+    return series
+
+
+def new_canvas():
+    figure = Figure(figsize=(10, 6), dpi=100)
+    ax = figure.add_subplot(111)
+    return figure, ax, FigureCanvasAgg(figure)
+
+
+def legacy_fps(series_frames):
+    figure, ax, canvas = new_canvas()
+    start = time.perf_counter()
+    for series in series_frames:
+        ax.clear()
+        ax.set_title("Live Parsed Values")
+        ax.grid(True, alpha=0.4, linestyle='--')
+        for i, (pattern, (times, values)) in enumerate(series.items()):
+            ax.plot(times, values, marker='o', linestyle='-', label=pattern, linewidth=2, color=COLORS[i])
+        ax.legend(loc='upper right')
+        canvas.draw()
+    return len(series_frames) / (time.perf_counter() - start)
+
+
+def live_fps(series_frames):
+    figure, ax, canvas = new_canvas()
+    ax.set_title("Live Parsed Values")
+    ax.grid(True, alpha=0.4, linestyle='--')
+    plot = LivePlot(ax, canvas, COLORS, max_fps=0)
+    plot.update(series_frames[0])
+    start = time.perf_counter()
+    for series in series_frames:
+        plot.update(series)
+    return len(series_frames) / (time.perf_counter() - start), plot.full_draws
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--patterns", type=int, default=2)
+    args = parser.parse_args(argv)
+    print(f"{'points/series':>14} {'legacy fps':>11} {'live fps':>9} {'full draws':>11}")
+    for points in (2000, 200000):
+        # Each frame appends 10 samples and drops the oldest 10, like a full deque
+        frames = [make_series(points, args.patterns, shift=10 * f) for f in range(args.frames)]
+        legacy = legacy_fps(frames)
+        live, full_draws = live_fps(frames)
+        print(f"{points:>14,} {legacy:>11.1f} {live:>9.1f} {full_draws:>11}")
+
+
+if __name__ == "__main__":
+    main()
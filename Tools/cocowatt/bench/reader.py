@@ -0,0 +1,66 @@
+"""Reader wakeups/s and line latency: select-based reader vs. the legacy 10 ms poll loop, over a pty."""
+import argparse
+import threading
+import time
+
+from ..engine import CaptureEngine, READER_MODES
+from ..sim import PtyPair
+
+
+def run(mode, rate, seconds, idle):
+    with PtyPair() as pty:
+        engine = CaptureEngine(reader_mode=mode)
+        sent = []
+        latencies = []
+
+        def on_entry(entry, parsed):
+            now = time.perf_counter()
+            index = len(latencies)
+            if index < len(sent):
+                latencies.append(now - sent[index])
+
+        engine.add_listener(on_entry)
+        engine.open(pty.port)
+        time.sleep(0.2)
+
+        # Idle phase: nothing on the wire
+        start_wakeups = engine.wakeups
+        time.sleep(idle)
+        idle_rate = (engine.wakeups - start_wakeups) / idle
+
+        # Active phase: one line every 1/rate seconds
+        start_wakeups = engine.wakeups
+        start = time.perf_counter()
+        period = 1.0 / rate
+        for i in range(int(rate * seconds)):
+            target = start + i * period
+            delay = target - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            sent.append(time.perf_counter())
+            pty.write(b"ADC Bits:2252 ADC Volt:2.749\n\r")
+        time.sleep(0.3)
+        active_rate = (engine.wakeups - start_wakeups) / (time.perf_counter() - start)
+        engine.close()
+    latencies.sort()
+    n = len(latencies)
+    pick = (lambda q: latencies[min(n - 1, int(q * n))] * 1e3) if n else (lambda q: float('nan'))
+    return idle_rate, active_rate, n, len(sent), pick(0.5), pick(0.99), pick(1.0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rate", type=float, default=100, help="lines per second")
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--idle", type=float, default=2, help="idle seconds before sending")
+    args = parser.parse_args(argv)
+    print(f"{'mode':>7} {'idle wake/s':>12} {'active wake/s':>14} {'lines':>11} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for mode in READER_MODES:
+        idle_rate, active_rate, got, sent, p50, p99, worst = run(mode, args.rate, args.seconds, args.idle)
+        print(f"{mode:>7} {idle_rate:>12.1f} {active_rate:>14.1f} {f'{got}/{sent}':>11} "
+              f"{p50:>8.2f} {p99:>8.2f} {worst:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
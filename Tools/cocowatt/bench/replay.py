@@ -0,0 +1,116 @@
+"""End-to-end throughput with no hardware: a recorded log replayed through CaptureEngine at max speed.
+
+"engine" is the capture path alone; "monitor" adds what the GUI hangs off it (session
+log, a 33 ms frame loop that reads new lines by sequence number, formats them and
+decimates the graph history, and the statistics table), minus Tk itself. A paced run
+then checks that ``--speed`` keeps the recorded timing.
+"""
+import argparse
+import csv
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from ..clock import format_ns
+from ..decimate import decimate
+from ..engine import CaptureEngine
+from ..sessionlog import SessionLogger
+from . import adc_stream
+
+FRAME_S = 0.033
+
+
+def write_recording(path, lines, rate):
+    start = time.time()
+    rows = adc_stream(lines).decode().split("\n\r")[:-1]
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Timestamp', 'Data', 'Direction'])
+        for i, row in enumerate(rows):
+            stamp = datetime.fromtimestamp(start + i / rate).strftime("%H:%M:%S.%f")[:-3]
+            writer.writerow([stamp, row, 'Received'])
+
+
+def frame_loop(engine, stop, counters):
+    seq = 0
+    next_stats = 0.0
+    while not stop.is_set():
+        time.sleep(FRAME_S)
+        seq, entries = engine.entries_since(seq)
+        text = [f"{format_ns(e['t'])} ← {e['data']}" for e in entries]
+        counters["shown"] += len(text)
+        with engine.lock:
+            for hist in engine.parser_history.values():
+                decimate(hist.times, hist.values, 1000)
+        if time.perf_counter() >= next_stats:
+            engine.stats_snapshot()
+            next_stats = time.perf_counter() + 0.5
+        counters["frames"] += 1
+
+
+def run(path, mode, tmp, lines):
+    engine = CaptureEngine()
+    stop = threading.Event()
+    counters = {"shown": 0, "frames": 0}
+    logger = loop = None
+    if mode == "monitor":
+        logger = SessionLogger(os.path.join(tmp, "session"), with_direction=True)
+        engine.add_listener(logger)
+        loop = threading.Thread(target=frame_loop, args=(engine, stop, counters), daemon=True)
+        loop.start()
+    cpu0, start = time.process_time(), time.perf_counter()
+    engine.open_replay(path, speed=0)
+    while engine.lines_received < lines and time.perf_counter() - start < 120:
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu0
+    engine.close()
+    stop.set()
+    if loop:
+        loop.join()
+    if logger:
+        logger.close()
+    return engine.lines_received, elapsed, cpu, engine.dropped_lines, counters
+
+
+def paced(path, speed, rate, lines):
+    engine = CaptureEngine()
+    arrivals = []
+    engine.add_listener(lambda entries, parsed: arrivals.append((time.perf_counter(), len(entries))))
+    start = time.perf_counter()
+    replay = engine.open_replay(path, speed=speed)
+    while not replay.done:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    engine.close()
+    expected = (lines - 1) / rate / speed
+    taken = arrivals[-1][0] - start if arrivals else 0.0
+    return expected, taken, sum(n for _, n in arrivals)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=500000)
+    parser.add_argument("--rate", type=float, default=1000, help="recorded lines per second")
+    parser.add_argument("--speed", type=float, default=20, help="multiplier for the paced check")
+    args = parser.parse_args(argv)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "recording.csv")
+        write_recording(path, args.lines, args.rate)
+        print(f"{'mode':>8} {'lines':>9} {'seconds':>8} {'lines/s':>10} {'CPU s':>6} {'dropped':>8} {'frames':>7}")
+        for mode in ("engine", "monitor"):
+            received, elapsed, cpu, dropped, counters = run(path, mode, tmp, args.lines)
+            frames = counters["frames"] if mode == "monitor" else "-"
+            print(f"{mode:>8} {received:>9} {elapsed:>8.2f} {received / elapsed:>10,.0f} {cpu:>6.2f} {dropped:>8} "
+                  f"{frames:>7}")
+        short = min(args.lines, int(args.rate * 4))
+        path = os.path.join(tmp, "short.csv")
+        write_recording(path, short, args.rate)
+        expected, taken, received = paced(path, args.speed, args.rate, short)
+        print(f"paced {args.speed:g}x: {received} lines in {taken:.3f} s, recorded span / speed = {expected:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
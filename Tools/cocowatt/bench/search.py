@@ -0,0 +1,60 @@
+"""Search over retained lines: index cost per line and query latency against a linear scan."""
+import argparse
+import random
+import time
+
+from ..engine import CaptureEngine
+from . import adc_stream, timeit
+
+BATCH = 64  # Lines per handle_batch call, about one serial read at full speed
+
+
+def ingest(lines, index):
+    engine = CaptureEngine(max_display=len(lines))
+    if not index:
+        engine.search_index.add = lambda seq, text, parsed=None: None
+    batches = [[{'t': i * 1_000_000, 'data': line} for i, line in enumerate(lines[k:k + BATCH], k)]
+               for k in range(0, len(lines), BATCH)]
+    start = time.perf_counter()
+    for batch in batches:
+        engine.handle_batch(batch)
+    return engine, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--errors", type=int, default=20, help="rare [ERROR] lines scattered through the log")
+    args = parser.parse_args(argv)
+    lines = adc_stream(args.lines).decode().split("\n\r")[:-1]
+    random.seed(0)
+    for i in random.sample(range(len(lines)), args.errors):
+        lines[i] = f"[ERROR] ADC overflow at sample {i}"
+    _, plain = ingest(lines, False)
+    engine, indexed = ingest(lines, True)
+    index = engine.search_index
+    print(f"{len(lines):,} lines: ingest {plain / len(lines) * 1e6:.2f} us/line without index, "
+          f"{indexed / len(lines) * 1e6:.2f} with; index {index.nbytes / len(lines):.1f} bytes/line")
+    t_mid = len(lines) // 2 * 1_000_000
+    queries = [
+        ("[ERROR]", dict(text="[ERROR]")),
+        ("overflow at sample 4", dict(text="overflow at sample 4")),
+        ("Bits:3000", dict(text="Bits:3000")),
+        ("ADC Volt: >= 4.9", dict(pattern="ADC Volt:", lo=4.9)),
+        ("1 s time window", dict(t_from=t_mid, t_to=t_mid + 1_000_000_000)),
+        ("Bits:30 and Volt 3.6..3.7", dict(text="Bits:30", pattern="ADC Volt:", lo=3.6, hi=3.7)),
+        ("ADC (every line, newest 100k)", dict(text="ADC", limit=100_000)),
+    ]
+    print(f"{'query':>30} {'matches':>9} {'index ms':>9} {'scan ms':>8}")
+    for label, query in queries:
+        seqs, _ = engine.search(**query)
+        best = timeit(lambda: engine.search(**query)) * 1000
+        needle = query.get("text", "").lower()
+        scan = ""
+        if needle and "pattern" not in query:
+            scan = f"{timeit(lambda: [i for i, line in enumerate(lines) if needle in line.lower()], 1) * 1000:.0f}"
+        print(f"{label:>30} {len(seqs):>9,} {best:>9.1f} {scan:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Session logging: time spent on the capture thread per batch, CsvRecorder vs. SessionLogger.
+
+The first run floods the logger with every batch at once, far faster than rows can
+be formatted and fsynced, so its enqueue-to-write latency is the time to drain that
+backlog. The paced run feeds ``--rate`` lines/s, as a board would, and shows the
+latency of the writer keeping up.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from ..engine import CsvRecorder
+from ..sessionlog import SessionLogger
+from . import adc_stream
+
+
+def listener_cost(listener, batches):
+    """Per-call wall times, in ms, of ``listener(entries, parsed)``."""
+    costs = []
+    for entries in batches:
+        start = time.perf_counter()
+        listener(entries, [{}] * len(entries))
+        costs.append((time.perf_counter() - start) * 1000)
+    costs.sort()
+    return costs
+
+
+def paced(path, batches, rate):
+    """Max enqueue-to-write latency, in ms, with batches arriving at ``rate`` lines/s."""
+    logger = SessionLogger(path, with_direction=True)
+    start = time.perf_counter()
+    sent = 0
+    for entries in batches:
+        delay = start + sent / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        logger(entries, [{}] * len(entries))
+        sent += len(entries)
+    logger.close(timeout=60)
+    return logger.stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=500000)
+    parser.add_argument("--batch", type=int, default=20, help="lines per engine batch")
+    parser.add_argument("--rotate-mb", type=float, default=8)
+    parser.add_argument("--rate", type=float, default=20000, help="lines per second for the paced run")
+    parser.add_argument("--seconds", type=float, default=5, help="length of the paced run")
+    args = parser.parse_args(argv)
+    lines = adc_stream(args.lines).decode().split("\n\r")[:-1]
+    entries = [{'t': i * 1_000_000, 'data': line} for i, line in enumerate(lines)]
+    batches = [entries[i:i + args.batch] for i in range(0, len(entries), args.batch)]
+    with tempfile.TemporaryDirectory() as tmp:
+        recorder = CsvRecorder(os.path.join(tmp, "legacy.csv"), with_direction=True)
+        start = time.perf_counter()
+        legacy = listener_cost(recorder, batches)
+        recorder.close()
+        legacy_total = time.perf_counter() - start
+
+        logger = SessionLogger(os.path.join(tmp, "session"), with_direction=True,
+                               rotate_bytes=int(args.rotate_mb * 1024 * 1024), max_pending=len(lines))
+        start = time.perf_counter()
+        buffered = listener_cost(logger, batches)
+        logger.close(timeout=60)
+        total = time.perf_counter() - start
+        stats = logger.stats()
+        steady = paced(os.path.join(tmp, "paced"), batches[:int(args.rate * args.seconds) // args.batch], args.rate)
+    for name, costs in (("CsvRecorder", legacy), ("SessionLogger", buffered)):
+        print(f"{name:<14} per batch: median {costs[len(costs) // 2]:.3f} ms   "
+              f"p99 {costs[int(len(costs) * 0.99)]:.3f} ms   max {costs[-1]:.3f} ms")
+    print(f"CsvRecorder    {len(lines) / legacy_total:,.0f} lines/s, not fsynced")
+    print(f"SessionLogger  {stats['rows'] / total:,.0f} lines/s durable, {stats['files']} files, "
+          f"{stats['fsyncs']} fsyncs (max {stats['max_fsync_ms']:.1f} ms), "
+          f"max enqueue-to-write {stats['max_latency_ms']:.1f} ms (flood backlog), {stats['dropped']} dropped")
+    print(f"paced at {args.rate:,.0f} lines/s: {steady['rows']} rows, max enqueue-to-write "
+          f"{steady['max_latency_ms']:.1f} ms, max fsync {steady['max_fsync_ms']:.1f} ms, {steady['dropped']} dropped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""In-process capture vs. a background capture process, while the monitor's process stalls.
+
+The simulated board runs in its own process on a pty and writes on schedule. The
+"monitor" process holds the GIL for ``--stall`` seconds every ``--every`` seconds,
+like a long draw. In-process, the reader thread starves with it and the board's
+writes block (on a real UART the driver buffer overflows and bytes are lost).
+With ``--shm`` capture, the capture process keeps reading and the monitor catches
+up from the ring. Linux/macOS only (pty).
+"""
+import argparse
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+
+from ..clock import now_ns
+from ..engine import CaptureEngine
+from ..shmring import ring_name, spawn_capture
+from ..sim import PtyPair, TC275Simulator
+
+
+def play(pair, rate, lines, burst, conn):
+    blocked = []
+
+    def write(data):
+        start = time.perf_counter()
+        pair.write(data)
+        blocked.append(time.perf_counter() - start)
+
+    sim = TC275Simulator(write, rate, lines=lines, burst=burst, hello=False)
+    sim.start()
+    sim.join()
+    conn.send((sim.sent, blocked))
+
+
+def hog(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def run(mode, rate, lines, burst, stall, every):
+    pair = PtyPair()
+    stamps, arrivals = [], []
+
+    def listener(entries, parsed):
+        now = now_ns()
+        stamps.extend(e['t'] for e in entries)
+        arrivals.extend([now] * len(entries))
+
+    engine = CaptureEngine()
+    engine.add_listener(listener)
+    if mode == "background":
+        name = ring_name(pair.port) + "_bench"
+        spawn_capture(name, pair.port).close()
+        engine.open_shared(name)
+    else:
+        engine.open(pair.port)
+    receiver, sender = multiprocessing.get_context("fork").Pipe(False)
+    board = multiprocessing.get_context("fork").Process(target=play, args=(pair, rate, lines, burst, sender))
+    board.start()
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(stall)  # Nothing else in this process runs until the hog is done
+    try:
+        deadline = time.perf_counter() + lines / rate * 3 + 10
+        while len(stamps) < lines and time.perf_counter() < deadline:
+            time.sleep(every)
+            hog(stall)
+    finally:
+        sys.setswitchinterval(interval)
+    sent, blocked = receiver.recv()
+    board.join()
+    engine.close(stop_capture=True)
+    pair.close()
+    counts, times = zip(*sent)
+    sent_t = np.asarray(times)[np.searchsorted(np.asarray(counts), np.arange(len(stamps)), side='right')]
+    read_ms = (np.asarray(stamps) - sent_t) / 1e6
+    shown_ms = (np.asarray(arrivals) - sent_t) / 1e6
+    blocked = np.asarray(blocked) * 1000
+    return {"received": len(stamps), "dropped": engine.dropped_lines,
+            "read_p99_ms": float(np.percentile(read_ms, 99)), "read_max_ms": float(read_ms.max()),
+            "shown_max_ms": float(shown_ms.max()), "board_blocked_ms": float(blocked.max()),
+            "blocked_writes": int((blocked > 10).sum())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rate", type=float, default=20000, help="board lines per second")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--burst", type=int, default=20, help="lines per board write")
+    parser.add_argument("--stall", type=float, default=0.5, help="seconds the monitor holds the GIL")
+    parser.add_argument("--every", type=float, default=1.0, help="seconds between stalls")
+    args = parser.parse_args(argv)
+    lines = int(args.rate * args.seconds)
+    print(f"{lines} lines at {args.rate:,.0f} lines/s, {args.stall * 1000:.0f} ms GIL stall every {args.every:g} s")
+    print(f"{'capture':>11} {'received':>9} {'dropped':>8} {'read p99':>9} {'read max':>9} {'shown max':>10} "
+          f"{'board blocked':>14} {'>10 ms':>7}")
+    for mode in ("in-process", "background"):
+        r = run(mode, args.rate, lines, args.burst, args.stall, args.every)
+        print(f"{mode:>11} {r['received']:>9} {r['dropped']:>8} {r['read_p99_ms']:>7.1f}ms {r['read_max_ms']:>7.1f}ms "
+              f"{r['shown_max_ms']:>8.1f}ms {r['board_blocked_ms']:>12.1f}ms {r['blocked_writes']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Spectrum tab cost per refresh: load + regrid + Welch PSD (+ blitted redraw), against the 33 ms frame budget."""
+import argparse
+import statistics
+import time
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from ..history import SeriesRing
+from ..liveplot import SpectrumPlot
+from ..spectrum import Spectrum
+
+FRAME_BUDGET_MS = 33
+
+
+STEP = 250  # New samples per refresh: 250 ms of a 1 kHz stream
+
+
+def make_history(points, kind, rate=1000.0):
+    rng = np.random.default_rng(0)
+    times = 1.7e9 + np.arange(points) / rate
+    if kind == "jittered":
+        times = times + rng.uniform(0, 0.2 / rate, points)
+    elif kind == "batched":
+        # 16 lines per serial read share the read's timestamp
+        times = np.repeat(times[::16], 16)[:points] + 16 / rate
+    values = 2.5 + 0.02 * np.sin(2 * np.pi * 50 * (times - times[0])) + rng.normal(0, 0.001, points)
+    ring = SeriesRing(points)
+    ring.extend(times, values)
+    return ring
+
+
+def naive_psd(times, values, size, segments):
+    # Same result with fresh arrays on every call, for comparison
+    t, v = np.array(times[-size:]), np.array(values[-size:])
+    grid = np.linspace(t[0], t[-1], size)
+    data = np.interp(grid, t, v)
+    seg_len = 2 * size // (segments + 1)
+    window = np.hanning(seg_len)
+    fs = (size - 1) / (t[-1] - t[0])
+    psd = np.zeros(seg_len // 2 + 1)
+    for k in range(segments):
+        seg = data[k * seg_len // 2:k * seg_len // 2 + seg_len]
+        psd += np.abs(np.fft.rfft((seg - seg.mean()) * window)) ** 2
+    return psd * 2 / (fs * np.sum(window ** 2) * segments)
+
+
+def timed(func, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="4096,16384,65536")
+    parser.add_argument("--segments", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    figure = Figure(figsize=(10, 6), dpi=100)
+    ax = figure.add_subplot(111)
+    ax.set_yscale("log")
+    canvas = FigureCanvasAgg(figure)
+    plot = SpectrumPlot(ax, canvas, "#2196F3")
+    width = int(ax.bbox.width)
+    print(f"{'points':>7} {'timestamps':>10} {'naive ms':>9} {'psd ms':>7} {'max':>6} {'+draw ms':>9} "
+          f"{'full draws':>10} {'budget':>7}")
+    for size in map(int, args.sizes.split(',')):
+        for kind in ("uniform", "jittered", "batched"):
+            # Enough extra samples that every refresh sees a new window, like a live stream
+            ring = make_history(size + STEP * (2 * args.repeat + 2), kind)
+            frame = [0]
+            spectrum = Spectrum(size, args.segments)
+            naive, _ = timed(lambda: naive_psd(ring.times, ring.values, size, args.segments), args.repeat)
+
+            def refresh():
+                stop = size + STEP * frame[0]
+                frame[0] += 1
+                spectrum.load(ring.times[:stop], ring.values[:stop])
+                spectrum.compute()
+
+            psd, psd_max = timed(refresh, args.repeat)
+
+            def refresh_and_draw():
+                refresh()
+                plot.update(spectrum.freqs[1:], spectrum.psd[1:], width)
+
+            refresh_and_draw()  # First frame sets the limits with a full draw
+            draws = plot.full_draws
+            total, _ = timed(refresh_and_draw, args.repeat)
+            draws = plot.full_draws - draws
+            verdict = "ok" if total <= FRAME_BUDGET_MS else "over"
+            print(f"{size:>7} {kind:>10} {naive:>9.2f} {psd:>7.2f} {psd_max:>6.2f} {total:>9.2f} "
+                  f"{draws:>10} {verdict:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Monitor cold start: import time, time to first window and first-open cost of each lazily built tab.
+
+Every run is a fresh interpreter. Without a display only the import is measured.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+HEAVY = ("matplotlib", "PIL", "numpy", "asyncio")
+
+CHILD = r'''
+import json, sys, time
+t0 = time.perf_counter()
+import COCOWATTSerialMonitor as gui
+t1 = time.perf_counter()
+out = {"import_s": t1 - t0, "loaded": [m for m in %r if m in sys.modules]}
+if sys.argv[1] == "window":
+    try:
+        root = gui.tk.Tk()
+    except gui.tk.TclError as e:
+        out["error"] = str(e)
+    else:
+        app = gui.SerialTerminalApp(root)
+        root.update()
+        out["window_s"] = time.perf_counter() - t1
+        out["shown_at"] = time.time()
+        out["tabs_s"] = {}
+        for tab in app.notebook.tabs()[1:]:
+            start = time.perf_counter()
+            app.notebook.select(tab)
+            root.update()
+            out["tabs_s"][app.notebook.tab(tab, "text")] = time.perf_counter() - start
+        app.on_closing()
+# What the old eager start-up also paid for
+t2 = time.perf_counter()
+import matplotlib
+matplotlib.use("TkAgg")
+import matplotlib.backends.backend_tkagg, matplotlib.figure, PIL.ImageTk
+out["deferred_s"] = time.perf_counter() - t2
+print(json.dumps(out))
+''' % (HEAVY,)
+
+
+def run_once(window=True):
+    """One fresh process; the result dict of ``CHILD`` plus ``first_window_s`` from spawn to a shown window."""
+    spawned = time.time()
+    result = subprocess.run([sys.executable, "-c", CHILD, "window" if window else "import"], cwd=TOOLS_DIR,
+                            capture_output=True, text=True, check=True)
+    out = json.loads(result.stdout.strip().splitlines()[-1])
+    if "shown_at" in out:
+        out["first_window_s"] = out["shown_at"] - spawned
+    return out
+
+
+def median(values):
+    values = sorted(values)
+    return values[len(values) // 2] if values else None
+
+
+def measure(runs=5, window=True):
+    """Medians over ``runs`` cold starts: ``{"import_ms", "window_ms" or None, "deferred_ms", "loaded", "tabs_ms"}``."""
+    results = [run_once(window) for _ in range(runs)]
+    first = [r["first_window_s"] for r in results if "first_window_s" in r]
+    tabs = {}
+    for r in results:
+        for name, seconds in r.get("tabs_s", {}).items():
+            tabs.setdefault(name, []).append(seconds * 1000)
+    return {
+        "import_ms": median([r["import_s"] * 1000 for r in results]),
+        "window_ms": median([s * 1000 for s in first]) if first else None,
+        "deferred_ms": median([r["deferred_s"] * 1000 for r in results]),
+        "loaded": results[-1]["loaded"],
+        "tabs_ms": {name: median(values) for name, values in tabs.items()},
+        "error": results[-1].get("error"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--no-window", action="store_true", help="only time the import")
+    args = parser.parse_args(argv)
+    result = measure(args.runs, not args.no_window)
+    print(f"import COCOWATTSerialMonitor   {result['import_ms']:8.1f} ms  "
+          f"(loads: {', '.join(result['loaded']) or 'none of ' + ', '.join(HEAVY)})")
+    print(f"matplotlib + PIL, now deferred {result['deferred_ms']:8.1f} ms")
+    if result["window_ms"] is not None:
+        print(f"process start to first window  {result['window_ms']:8.1f} ms")
+        for name, ms in result["tabs_ms"].items():
+            print(f"  first open of {name:<16} {ms:8.1f} ms")
+    elif not args.no_window:
+        print(f"no window measured: {result['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""Benchmark suite on simulated TC275 output, compared against a stored per-machine baseline.
+
+    python -m cocowatt.bench                # run, compare, exit 1 on a regression
+    python -m cocowatt.bench --save         # record this machine's baseline
+    python -m cocowatt.bench --only e2e,render --quick
+
+Stages (framer, parser, engine store, session logger, offscreen plot) are timed
+on pre-generated simulator output; ``e2e`` runs ``CaptureEngine`` against a
+``TC275Simulator`` on a pty and measures received lines/s, CPU%, resident memory
+growth and line latency from the simulator's write to the engine's listeners;
+``startup`` times the monitor's cold start in fresh interpreters.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import sys
+import tempfile
+import time
+from bisect import bisect_right
+
+import numpy as np
+
+from ..decimate import decimate
+from ..engine import CaptureEngine
+from ..framer import LineFramer
+from ..history import SeriesRing
+from ..parser import PatternParser
+from ..sessionlog import SessionLogger
+from ..sim import TC275Simulator, PtyPair
+from . import chunked, startup, timeit
+
+PATTERNS = ["ADC Bits:", "ADC mVolt:", "ADC Volt:"]
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+TOLERANCE = 0.25  # Relative change counted as a regression
+NOISY_TOLERANCE = 1.0  # Latency, CPU share and RSS growth of a short paced run are far noisier
+NOISY = ("e2e_cpu_percent", "e2e_rss_growth_mb", "e2e_latency_p50_ms", "e2e_latency_p99_ms")
+READ_SIZE = 4096  # Bytes per framer feed, about what one serial read returns at full speed
+BATCH = 64
+REPEAT = 5  # Best of this many runs per stage
+
+# name -> (unit, +1 when higher is better, -1 when lower is better)
+METRICS = {
+    "framer_lines_per_s": ("lines/s", +1),
+    "parser_lines_per_s": ("lines/s", +1),
+    "engine_lines_per_s": ("lines/s", +1),
+    "history_samples_per_s": ("samples/s", +1),
+    "logger_rows_per_s": ("rows/s", +1),
+    "render_fps": ("frames/s", +1),
+    "e2e_lines_per_s": ("lines/s", +1),
+    "e2e_lost_lines": ("lines", -1),
+    "e2e_cpu_percent": ("%", -1),
+    "e2e_rss_growth_mb": ("MB", -1),
+    "e2e_latency_p50_ms": ("ms", -1),
+    "e2e_latency_p99_ms": ("ms", -1),
+    "max_lines_per_s": ("lines/s", +1),
+    "corrupt_lines_per_s": ("lines/s", +1),
+    "startup_import_ms": ("ms", -1),
+    "startup_window_ms": ("ms", -1),
+}
+
+
+def sim_output(lines, **options):
+    """Bytes the simulator would put on the wire for ``lines`` lines, without the pacing."""
+    out = []
+    TC275Simulator(out.append, rate=0, lines=lines, **options).run()
+    return b"".join(out)
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3  # Peak, not current, off Linux
+
+
+def bench_framer(data, lines):
+    chunks = chunked(data, READ_SIZE)
+
+    def run():
+        framer = LineFramer()
+        for chunk in chunks:
+            framer.feed(chunk)
+
+    return {"framer_lines_per_s": lines / timeit(run, REPEAT)}
+
+
+def bench_parser(texts):
+    parser = PatternParser(PATTERNS)
+    batches = [texts[i:i + BATCH] for i in range(0, len(texts), BATCH)]
+    return {"parser_lines_per_s": len(texts) / timeit(lambda: [parser.parse_many(b) for b in batches], REPEAT)}
+
+
+def bench_engine(texts):
+    batches = [[{'t': i * 100_000, 'data': text} for i, text in enumerate(texts[k:k + BATCH], k)]
+               for k in range(0, len(texts), BATCH)]
+
+    def run():
+        engine = CaptureEngine(PATTERNS, max_display=len(texts))
+        for batch in batches:
+            engine.handle_batch(batch)
+
+    return {"engine_lines_per_s": len(texts) / timeit(run, REPEAT)}
+
+
+def bench_history(samples):
+    times = np.arange(samples, dtype=np.float64) * 1e-3
+    values = np.sin(times)
+
+    def run():
+        ring = SeriesRing(samples // 4)
+        for k in range(0, samples, BATCH):
+            ring.extend(times[k:k + BATCH], values[k:k + BATCH])
+
+    return {"history_samples_per_s": samples / timeit(run, REPEAT)}
+
+
+def bench_logger(texts):
+    entries = [{'t': i * 100_000, 'data': text} for i, text in enumerate(texts)]
+    batches = [entries[k:k + BATCH] for k in range(0, len(entries), BATCH)]
+    with tempfile.TemporaryDirectory() as tmp:
+        logger = SessionLogger(os.path.join(tmp, "session"), max_pending=len(entries))
+        start = time.perf_counter()
+        for batch in batches:
+            logger(batch, None)
+        logger.close(timeout=60)
+        elapsed = time.perf_counter() - start
+    return {"logger_rows_per_s": logger.rows_written / elapsed}
+
+
+def bench_render(frames, points=200_000, width=1000):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    from ..liveplot import LivePlot
+
+    figure = Figure(figsize=(10, 6), dpi=100)
+    ax = figure.add_subplot(111)
+    canvas = FigureCanvasAgg(figure)
+    plot = LivePlot(ax, canvas, ['#4CAF50', '#2196F3', '#FF9800'], max_fps=0)
+    times = np.arange(points + 10 * frames, dtype=np.float64) * 0.01
+    values = 2.5 + 2 * np.sin(times)
+    start = time.perf_counter()
+    for f in range(frames):
+        # What update_graph does per frame: decimate a full history, then blit
+        window = slice(10 * f, 10 * f + points)
+        plot.update({"ADC Volt:": decimate(times[window], values[window], width)}, autoscale=False)
+    return {"render_fps": frames / (time.perf_counter() - start)}
+
+
+def run_pty(rate, seconds, burst, corrupt=0.0, line_length=0):
+    """Engine reading a simulated board over a pty; returns the counters, CPU, memory and latencies."""
+    rss0 = rss_mb()
+    with PtyPair() as pty:
+        engine = CaptureEngine(PATTERNS, max_display=100_000)
+        batches = []  # (ADC lines received before this batch, lines in it, listener ns)
+        received = [0]
+
+        def on_batch(entries, parsed):
+            now = time.monotonic_ns()
+            n = sum(1 for e in entries if e['data'].startswith("ADC Bits:"))
+            batches.append((received[0], n, now))
+            received[0] += n
+
+        engine.add_listener(on_batch)
+        engine.open(pty.port)
+        time.sleep(0.2)
+        lines = None if rate == 0 else int(rate * seconds)
+        sim = TC275Simulator(pty.write, rate, lines, burst=burst, corrupt=corrupt, line_length=line_length)
+        cpu = time.process_time()
+        start = time.perf_counter()
+        sim.start()
+        if lines is None:
+            time.sleep(seconds)
+            sim.stop()
+        sim.join(seconds + 10)
+        sent = sim.lines
+        deadline = time.perf_counter() + 2.0
+        # Drain: wait until the engine has everything or stops making progress
+        while time.perf_counter() < deadline and engine.lines_received < sent + 1:
+            time.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - cpu - sim.cpu
+        rss = rss_mb()
+        engine.close()
+    latencies = []
+    if not corrupt:
+        counts = [n for n, _ in sim.sent]
+        for first, n, now in batches:
+            for k in range(first, first + n):
+                i = bisect_right(counts, k)
+                if i < len(counts):
+                    latencies.append((now - sim.sent[i][1]) / 1e6)
+    return {"sent": sent, "received": received[0], "elapsed": elapsed, "cpu": cpu,
+            "rss_growth": rss - rss0, "latencies": np.array(latencies)}
+
+
+def bench_e2e(rate, seconds, burst):
+    run = run_pty(rate, seconds, burst)
+    lat = run["latencies"]
+    return {
+        "e2e_lines_per_s": run["received"] / run["elapsed"],
+        "e2e_lost_lines": run["sent"] - run["received"],
+        "e2e_cpu_percent": 100 * run["cpu"] / run["elapsed"],
+        "e2e_rss_growth_mb": run["rss_growth"],
+        "e2e_latency_p50_ms": float(np.percentile(lat, 50)) if len(lat) else float('nan'),
+        "e2e_latency_p99_ms": float(np.percentile(lat, 99)) if len(lat) else float('nan'),
+    }
+
+
+def bench_max(seconds, burst):
+    run = run_pty(0, seconds, burst)
+    return {"max_lines_per_s": run["received"] / run["elapsed"]}
+
+
+def bench_corrupt(seconds, burst, corrupt):
+    run = run_pty(0, seconds, burst, corrupt=corrupt)
+    return {"corrupt_lines_per_s": run["received"] / run["elapsed"]}
+
+
+def bench_startup(runs):
+    result = startup.measure(runs)
+    out = {"startup_import_ms": result["import_ms"]}
+    if result["window_ms"] is not None:
+        out["startup_window_ms"] = result["window_ms"]  # Only with a display
+    return out
+
+
+SCENARIOS = ("framer", "parser", "engine", "history", "logger", "render", "e2e", "max", "corrupt", "startup")
+
+
+def run_suite(only, quick=False, rate=2000, burst=16, corrupt=0.02):
+    scale = 0.2 if quick else 1.0
+    lines = int(200_000 * scale)
+    data = sim_output(lines, burst=burst)
+    texts = [t for t in LineFramer().feed(data) if t.startswith("ADC")]
+    seconds = 5 * scale
+    stages = {
+        "framer": lambda: bench_framer(data, lines),
+        "parser": lambda: bench_parser(texts),
+        "engine": lambda: bench_engine(texts),
+        "history": lambda: bench_history(lines * 50),
+        "logger": lambda: bench_logger(texts),
+        "render": lambda: bench_render(int(50 * scale) or 1),
+        "e2e": lambda: bench_e2e(rate, max(seconds, 1.0), burst),
+        "max": lambda: bench_max(max(seconds / 2, 1.0), burst),
+        "corrupt": lambda: bench_corrupt(max(seconds / 2, 1.0), burst, corrupt),
+        "startup": lambda: bench_startup(3 if quick else 5),
+    }
+    results = {}
+    for name in only:
+        print(f"  {name}...", end="", flush=True, file=sys.stderr)
+        start = time.perf_counter()
+        results.update(stages[name]())
+        print(f" {time.perf_counter() - start:.1f} s", file=sys.stderr)
+    return results
+
+
+def load_baselines(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """Print the results against ``baseline``; returns the names of the metrics that regressed."""
+    regressed = []
+    print(f"{'metric':<22} {'value':>12} {'baseline':>12} {'change':>8}  unit")
+    for name, value in results.items():
+        unit, better = METRICS[name]
+        base = baseline.get(name)
+        change = status = ""
+        if base is not None and base == base and value == value:
+            limit = NOISY_TOLERANCE if name in NOISY else tolerance
+            if base:
+                delta = (value - base) / abs(base)
+                change = f"{delta:+.0%}"
+                worse = -delta * better > limit
+            else:
+                worse = (value - base) * better < 0  # e.g. lost lines where none were lost before
+            if worse:
+                status = "  REGRESSION"
+                regressed.append(name)
+        base_text = "" if base is None else f"{base:,.2f}"
+        print(f"{name:<22} {value:>12,.2f} {base_text:>12} {change:>8}  {unit}{status}")
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", help=f"comma-separated scenarios from: {', '.join(SCENARIOS)}")
+    parser.add_argument("--quick", action="store_true", help="a fifth of the data and run time")
+    parser.add_argument("--rate", type=float, default=2000, help="e2e simulator lines per second")
+    parser.add_argument("--burst", type=int, default=16, help="simulated lines per USB write")
+    parser.add_argument("--corrupt", type=float, default=0.02, help="damaged line fraction for 'corrupt'")
+    parser.add_argument("--baseline", default=BASELINE, help="JSON baselines, keyed by machine")
+    parser.add_argument("--machine", default=socket.gethostname(), help="baseline key (default: host name)")
+    parser.add_argument("--save", action="store_true", help="store the results as this machine's baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="relative change that fails")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+    only = args.only.split(",") if args.only else list(SCENARIOS)
+    unknown = set(only) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    print(f"cocowatt benchmark on {args.machine} (Python {platform.python_version()})", file=sys.stderr)
+    results = run_suite(only, args.quick, args.rate, args.burst, args.corrupt)
+    # Quick runs time less data and fewer frames, so they keep a baseline of their own
+    key = args.machine + (":quick" if args.quick else "")
+    baselines = load_baselines(args.baseline)
+    regressed = compare(results, baselines.get(key, {}), args.tolerance)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=1)
+    if args.save:
+        baselines[key] = {**baselines.get(key, {}), **results}
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=1, sort_keys=True)
+        print(f"Baseline for {key} saved to {args.baseline}")
+        return 0
+    if regressed:
+        print(f"{len(regressed)} regression(s): {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
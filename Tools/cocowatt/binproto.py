@@ -0,0 +1,136 @@
+"""Compact binary telemetry frames sent by send_UART_frame() in ASCLIN_UART.c.
+
+Frame layout, little-endian::
+
+    offset  size  field
+    0       2     sync word A5 5A
+    2       2     sequence number (wraps at 65536)
+    4       4     STM0 tick, lower 32 bits
+    8       1     channel count N (1..MAX_CHANNELS)
+    9       2*N   raw 12-bit ADC results
+    9+2N    2     CRC-16/CCITT-FALSE over bytes 2 .. 8+2N
+
+One channel is 13 bytes on the wire, against ~50 for the ASCII
+"ADC Bits: %u ADC mVolt: %u mV ADC Volt: %.3f V" line.
+"""
+import binascii
+import struct
+from collections import namedtuple
+
+SYNC = b'\xa5\x5a'
+HEADER = struct.Struct('<HIB')
+HEADER_SIZE = len(SYNC) + HEADER.size
+MAX_CHANNELS = 8
+ADC_RESOLUTION = 4096
+VREF_MV = 5000
+
+Frame = namedtuple('Frame', 'seq tick values')
+
+
+def crc16(data):
+    return binascii.crc_hqx(data, 0xFFFF)
+
+
+def frame_size(channels):
+    return HEADER_SIZE + 2 * channels + 2
+
+
+def encode_frame(seq, tick, values):
+    body = HEADER.pack(seq & 0xFFFF, tick & 0xFFFFFFFF, len(values)) + struct.pack(f'<{len(values)}H', *values)
+    return SYNC + body + struct.pack('<H', crc16(body))
+
+
+def raw_to_volt(raw):
+    # Same integer millivolt conversion as adcToMilliVolt() in Cpu0_Main.c
+    raw = min(raw, ADC_RESOLUTION - 1)
+    return (raw * VREF_MV // (ADC_RESOLUTION - 1)) / 1000.0
+
+
+def channel_values(values):
+    """Frame values under the names the text protocol uses, ready for the parser history."""
+    out = {}
+    for i, raw in enumerate(values):
+        suffix = str(i + 1) if i else ""
+        out[f"ADC Bits{suffix}:"] = float(raw)
+        out[f"ADC Volt{suffix}:"] = raw_to_volt(raw)
+    return out
+
+
+class FrameDecoder:
+    """Incremental decoder that resynchronises on the sync word after noise or CRC errors."""
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.frames = 0
+        self.crc_errors = 0
+        self.lost_frames = 0
+        self.skipped_bytes = 0
+        self.last_seq = None
+
+    def __len__(self):
+        return len(self.buf)
+
+    def feed(self, data):
+        buf = self.buf
+        buf += data
+        frames = []
+        pos = 0
+        while True:
+            sync = buf.find(SYNC, pos)
+            if sync < 0:
+                # Keep a trailing A5 in case the 5A is in the next read
+                keep = 1 if pos < len(buf) and buf[-1] == SYNC[0] else 0
+                self.skipped_bytes += len(buf) - pos - keep
+                pos = len(buf) - keep
+                break
+            self.skipped_bytes += sync - pos
+            pos = sync
+            if len(buf) - pos < HEADER_SIZE:
+                break
+            seq, tick, count = HEADER.unpack_from(buf, pos + 2)
+            if not 1 <= count <= MAX_CHANNELS:
+                pos += 1
+                self.skipped_bytes += 1
+                continue
+            size = frame_size(count)
+            if len(buf) - pos < size:
+                break
+            body_end = pos + size - 2
+            if crc16(buf[pos + 2:body_end]) != struct.unpack_from('<H', buf, body_end)[0]:
+                self.crc_errors += 1
+                pos += 1
+                self.skipped_bytes += 1
+                continue
+            values = struct.unpack_from(f'<{count}H', buf, pos + HEADER_SIZE)
+            if self.last_seq is not None:
+                self.lost_frames += (seq - self.last_seq - 1) & 0xFFFF
+            self.last_seq = seq
+            self.frames += 1
+            frames.append(Frame(seq, tick, values))
+            pos += size
+        if pos:
+            del buf[:pos]
+        return frames
+
+    def clear(self):
+        self.buf.clear()
+        self.last_seq = None
+
+
+def generate_frames(count, channels=1, start_seq=0, tick_step=10_000_000, drop=(), corrupt=()):
+    """Synthetic firmware output: ``count`` frames as one bytes object.
+
+    Sequence numbers in ``drop`` are skipped and those in ``corrupt`` get a flipped
+    payload bit, to exercise loss and CRC detection.
+    """
+    out = bytearray()
+    for i in range(count):
+        seq = (start_seq + i) & 0xFFFF
+        if seq in drop:
+            continue
+        values = [(2048 + i * 37 + 400 * ch) % ADC_RESOLUTION for ch in range(channels)]
+        frame = bytearray(encode_frame(seq, i * tick_step, values))
+        if seq in corrupt:
+            frame[HEADER_SIZE] ^= 0x01
+        out += frame
+    return bytes(out)
@@ -0,0 +1,303 @@
+"""Native ``.cwcap`` capture files: raw lines plus parsed columns in compressed, time-indexed blocks.
+
+Layout::
+
+    magic "CWCAP1\\0\\0", u32 header length, JSON header {"version", "patterns"}
+    block*  : BLOCK header (magic "CWBK", rows, t0, t1, sections), u32 size per section,
+              then zlib sections: float64 times, UTF-8 lines joined by "\\n",
+              one float64 column per pattern (NaN where a line has no value)
+    index   : JSON list of blocks {offset, rows, t0, t1}
+    footer  : u64 index offset, magic "CWCAPIDX"
+
+Readers memory-map the file and only decompress blocks that overlap the requested
+time range. A file without a footer (capture killed mid-run) is recovered by walking
+the block headers.
+"""
+import csv
+import json
+import mmap
+import struct
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from .parser import PatternParser
+from .csvimport import iter_csv_chunks
+from .clock import to_epoch
+
+MAGIC = b"CWCAP1\x00\x00"
+FOOTER_MAGIC = b"CWCAPIDX"
+BLOCK = struct.Struct('<4sIddH')
+BLOCK_MAGIC = b"CWBK"
+FOOTER = struct.Struct('<Q8s')
+BLOCK_ROWS = 65536
+EXTENSION = ".cwcap"
+
+
+class CaptureWriter:
+    """Appends rows to a ``.cwcap`` file, one compressed block every ``block_rows`` rows.
+
+    Also usable as an engine listener; rows then keep the read-time stamp of each
+    entry, as epoch seconds like the parser history.
+    """
+
+    def __init__(self, path, patterns, block_rows=BLOCK_ROWS, level=6):
+        self.path = path
+        self.patterns = list(patterns)
+        self.block_rows = block_rows
+        self.level = level
+        self.file = open(path, 'wb')
+        header = json.dumps({"version": 1, "patterns": self.patterns}).encode('utf-8')
+        self.file.write(MAGIC + struct.pack('<I', len(header)) + header)
+        self.blocks = []
+        self.rows = 0
+        self._reset()
+
+    def _reset(self):
+        self.times = []
+        self.lines = []
+        self.columns = {p: [] for p in self.patterns}
+
+    def append(self, timestamp, line, values):
+        self.times.append(timestamp)
+        self.lines.append(line.replace('\n', ' '))
+        for pattern, column in self.columns.items():
+            column.append(values.get(pattern, np.nan))
+        if len(self.times) >= self.block_rows:
+            self.flush_block()
+
+    def __call__(self, entries, parsed):
+        for entry, values in zip(entries, parsed):
+            self.append(to_epoch(entry['t']), entry['data'], values or {})
+
+    def extend(self, times, lines, columns):
+        """Bulk append: ``columns`` maps pattern to a float array aligned with ``lines``."""
+        times = np.asarray(times, dtype=np.float64)
+        start = 0
+        while start < len(lines):
+            stop = min(len(lines), start + self.block_rows - len(self.times))
+            self.times.extend(times[start:stop].tolist())
+            self.lines.extend(line.replace('\n', ' ') for line in lines[start:stop])
+            for pattern, column in self.columns.items():
+                if pattern in columns:
+                    column.extend(np.asarray(columns[pattern][start:stop], dtype=np.float64).tolist())
+                else:
+                    column.extend([np.nan] * (stop - start))
+            if len(self.times) >= self.block_rows:
+                self.flush_block()
+            start = stop
+
+    def flush_block(self):
+        if not self.times:
+            return
+        times = np.asarray(self.times, dtype=np.float64)
+        sections = [times.tobytes(), '\n'.join(self.lines).encode('utf-8')]
+        sections += [np.asarray(self.columns[p], dtype=np.float64).tobytes() for p in self.patterns]
+        sections = [zlib.compress(s, self.level) for s in sections]
+        offset = self.file.tell()
+        t0, t1 = float(times.min()), float(times.max())
+        self.file.write(BLOCK.pack(BLOCK_MAGIC, len(times), t0, t1, len(sections)))
+        self.file.write(struct.pack(f'<{len(sections)}I', *map(len, sections)))
+        for section in sections:
+            self.file.write(section)
+        self.file.flush()
+        self.blocks.append({"offset": offset, "rows": len(times), "t0": t0, "t1": t1})
+        self.rows += len(times)
+        self._reset()
+
+    @property
+    def closed(self):
+        return self.file.closed
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.flush_block()
+        index_offset = self.file.tell()
+        self.file.write(json.dumps(self.blocks).encode('utf-8'))
+        self.file.write(FOOTER.pack(index_offset, FOOTER_MAGIC))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CaptureReader:
+    """Memory-mapped random access to a ``.cwcap`` file by time range."""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.mm)
+        if self.mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a capture file")
+        header_len, = struct.unpack_from('<I', self.mm, len(MAGIC))
+        self.data_start = len(MAGIC) + 4 + header_len
+        header = json.loads(bytes(self.mm[len(MAGIC) + 4:self.data_start]))
+        self.patterns = header["patterns"]
+        self.blocks = self._load_index()
+        self.recovered = self.blocks is None
+        if self.blocks is None:
+            self.blocks = self._scan()
+        self.t0 = np.array([b["t0"] for b in self.blocks], dtype=np.float64)
+        self.t1 = np.array([b["t1"] for b in self.blocks], dtype=np.float64)
+        self.rows = sum(b["rows"] for b in self.blocks)
+
+    def _load_index(self):
+        if len(self.mm) < self.data_start + FOOTER.size:
+            return None
+        offset, magic = FOOTER.unpack_from(self.mm, len(self.mm) - FOOTER.size)
+        if magic != FOOTER_MAGIC:
+            return None
+        return json.loads(bytes(self.mm[offset:len(self.mm) - FOOTER.size]))
+
+    def _scan(self):
+        blocks = []
+        pos = self.data_start
+        while pos + BLOCK.size <= len(self.mm):
+            magic, rows, t0, t1, count = BLOCK.unpack_from(self.mm, pos)
+            if magic != BLOCK_MAGIC or pos + BLOCK.size + 4 * count > len(self.mm):
+                break  # Not a block, or its header was cut short by the crash
+            sizes = struct.unpack_from(f'<{count}I', self.mm, pos + BLOCK.size)
+            end = pos + BLOCK.size + 4 * count + sum(sizes)
+            if end > len(self.mm):
+                break  # Block cut short by the crash
+            blocks.append({"offset": pos, "rows": rows, "t0": t0, "t1": t1})
+            pos = end
+        return blocks
+
+    @property
+    def t_min(self):
+        return float(self.t0.min()) if len(self.t0) else None
+
+    @property
+    def t_max(self):
+        return float(self.t1.max()) if len(self.t1) else None
+
+    def _sections(self, block, wanted):
+        pos = block["offset"]
+        if pos + BLOCK.size > len(self.mm):
+            raise ValueError(f"{self.path}: block at {pos} is past the end of the file")
+        _, rows, _, _, count = BLOCK.unpack_from(self.mm, pos)
+        if pos + BLOCK.size + 4 * count > len(self.mm):
+            raise ValueError(f"{self.path}: block at {pos} is truncated")
+        sizes = struct.unpack_from(f'<{count}I', self.mm, pos + BLOCK.size)
+        pos += BLOCK.size + 4 * count
+        out = {}
+        for i, size in enumerate(sizes):
+            if i in wanted:
+                out[i] = zlib.decompress(self.view[pos:pos + size])
+            pos += size
+        return out
+
+    def block_range(self, lo=None, hi=None):
+        """Indices of the blocks that overlap [lo, hi]."""
+        mask = np.ones(len(self.blocks), dtype=bool)
+        if lo is not None:
+            mask &= self.t1 >= lo
+        if hi is not None:
+            mask &= self.t0 <= hi
+        return np.flatnonzero(mask)
+
+    def read(self, lo=None, hi=None, patterns=None, lines=False):
+        """Rows with timestamps in [lo, hi].
+
+        Returns ``(times, {pattern: values}, lines)``; values are NaN where a row has no
+        value for the pattern, and ``lines`` is None unless requested.
+        """
+        patterns = self.patterns if patterns is None else [p for p in patterns if p in self.patterns]
+        times, columns, texts = [], {p: [] for p in patterns}, []
+        for i in self.block_range(lo, hi):
+            t, block_columns, block_lines = self.read_block(i, lo, hi, patterns, lines)
+            times.append(t)
+            for p in patterns:
+                columns[p].append(block_columns[p])
+            if lines:
+                texts.extend(block_lines)
+        empty = np.empty(0, dtype=np.float64)
+        times = np.concatenate(times) if times else empty
+        columns = {p: np.concatenate(c) if c else empty for p, c in columns.items()}
+        return times, columns, texts if lines else None
+
+    def read_block(self, i, lo=None, hi=None, patterns=(), lines=False):
+        """Like ``read`` for the single block ``i``."""
+        wanted = {0} | {2 + self.patterns.index(p) for p in patterns}
+        if lines:
+            wanted.add(1)
+        sections = self._sections(self.blocks[i], wanted)
+        t = np.frombuffer(sections[0], dtype=np.float64)
+        mask = np.ones(len(t), dtype=bool)
+        if lo is not None:
+            mask &= t >= lo
+        if hi is not None:
+            mask &= t <= hi
+        columns = {p: np.frombuffer(sections[2 + self.patterns.index(p)], dtype=np.float64)[mask] for p in patterns}
+        texts = None
+        if lines:
+            texts = [line for line, keep in zip(sections[1].decode('utf-8').split('\n'), mask) if keep]
+        return t[mask], columns, texts
+
+    def series(self, pattern, lo=None, hi=None):
+        """``(times, values)`` of one pattern in [lo, hi], rows without a value dropped."""
+        times, columns, _ = self.read(lo, hi, [pattern])
+        values = columns.get(pattern, np.empty(0))
+        keep = ~np.isnan(values)
+        return times[keep], values[keep]
+
+    def tail(self, rows):
+        """Time range covering roughly the last ``rows`` rows, for opening at the end of a run."""
+        count = 0
+        for i in range(len(self.blocks) - 1, -1, -1):
+            count += self.blocks[i]["rows"]
+            if count >= rows:
+                return self.blocks[i]["t0"], self.t_max
+        return self.t_min, self.t_max
+
+    def close(self):
+        self.view.release()
+        self.mm.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def csv_to_capture(csv_path, capture_path, patterns, date=None, block_rows=BLOCK_ROWS):
+    """Convert a ``Timestamp,Data[,Direction]`` log; the clock-only timestamps are placed on ``date``.
+
+    ``date`` defaults to the day the CSV was last modified; rolling past midnight
+    moves to the next day. Sent rows are skipped, as in the CSV import.
+    """
+    parser = PatternParser(patterns)
+    with CaptureWriter(capture_path, parser.patterns, block_rows) as writer:
+        for times, lines, parsed in iter_csv_chunks(csv_path, parser, block_rows, date):
+            columns = {}
+            for pattern, (rows, values) in parsed.items():
+                column = np.full(len(lines), np.nan)
+                column[rows] = values
+                columns[pattern] = column
+            writer.extend(times, lines, columns)
+    return writer.rows
+
+
+def capture_to_csv(capture_path, csv_path, lo=None, hi=None):
+    """Write the rows in [lo, hi] back out in the ``Timestamp,Data`` layout."""
+    with CaptureReader(capture_path) as reader, open(csv_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Timestamp', 'Data'])
+        rows = 0
+        for i in reader.block_range(lo, hi):
+            times, _, lines = reader.read_block(i, lo, hi, lines=True)
+            stamps = [datetime.fromtimestamp(t).strftime("%H:%M:%S.%f")[:-3] for t in times]
+            writer.writerows(zip(stamps, lines))
+            rows += len(lines)
+        return rows
@@ -0,0 +1,113 @@
+"""Capture timestamps: integer ``time.monotonic_ns()`` taken at read time, turned into wall clock only for display.
+
+Entries carry ``'t'``, monotonic nanoseconds. ``to_epoch`` gives float seconds for
+plots and ``format_ns`` the ``HH:MM:SS.fff`` text used by the terminal and CSV logs.
+``TickClock`` maps the firmware's STM tick onto the same host time base.
+"""
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+now_ns = time.monotonic_ns
+
+# Wall clock minus monotonic clock, sampled once; resync() after the host clock is adjusted
+_offset_ns = time.time_ns() - time.monotonic_ns()
+# (ms, text) of the last format_ns call; one tuple, so threads never see a mismatched pair
+_last = (None, None)
+
+
+def resync():
+    global _offset_ns
+    _offset_ns = time.time_ns() - time.monotonic_ns()
+
+
+def to_epoch(t_ns):
+    """Monotonic ns (int or int64 array) to epoch seconds."""
+    return (t_ns + _offset_ns) / 1e9
+
+
+def from_epoch(seconds):
+    """Epoch seconds (e.g. from an imported log) to monotonic ns on this host."""
+    return int(round(seconds * 1e9)) - _offset_ns
+
+
+def format_ns(t_ns):
+    """``"HH:MM:SS.fff"`` local time; consecutive calls within one millisecond reuse the text."""
+    global _last
+    ms = (t_ns + _offset_ns) // 1_000_000
+    last_ms, text = _last
+    if ms != last_ms:
+        text = datetime.fromtimestamp(ms / 1000).strftime("%H:%M:%S.%f")[:-3]
+        _last = (ms, text)
+    return text
+
+
+class TickClock:
+    """Maps the 32-bit STM0 tick of ``send_UART_frame`` frames onto host monotonic time.
+
+    Host stamps only ever arrive late (USB latency, scheduling), so the mapping is a
+    line through the lower envelope of ``host - tick`` over the last ``window``
+    samples: the minimum of each of ``buckets`` slices is kept and a straight line
+    is fitted through those minima. Its slope is the crystal drift against the host
+    clock. Device times then keep the firmware's own sample spacing.
+    """
+
+    def __init__(self, tick_hz=100_000_000, window=2048, buckets=16, refit=64):
+        self.tick_hz = tick_hz
+        self.samples = deque(maxlen=window)
+        self.buckets = buckets
+        self.refit = refit
+        self.wraps = 0
+        self.last_tick = None
+        self.offset_ns = None
+        self.drift = 0.0
+        self.jitter_ns = 0.0
+        self.count = 0
+        self.t0 = None
+
+    def unwrap(self, tick):
+        if self.last_tick is not None and tick < self.last_tick and self.last_tick - tick > 0x80000000:
+            self.wraps += 1
+        self.last_tick = tick
+        return (self.wraps << 32) + tick
+
+    def observe(self, tick, host_ns):
+        """Feed one (tick, host stamp) pair; returns the device time of ``tick`` in host ns."""
+        ticks = self.unwrap(tick)
+        device_ns = ticks * 1_000_000_000 // self.tick_hz
+        if self.t0 is None:
+            self.t0 = device_ns
+        self.samples.append((device_ns - self.t0, host_ns - device_ns))
+        self.count += 1
+        if self.offset_ns is None or self.count % self.refit == 0:
+            self._fit()
+        return self.device_time(device_ns)
+
+    def _fit(self):
+        data = np.array(self.samples, dtype=np.float64)
+        x, y = data[:, 0], data[:, 1]
+        if len(x) < 2 * self.buckets:
+            self.offset_ns = float(y.min())
+            self.drift = 0.0
+            return
+        parts = np.array_split(np.arange(len(x)), self.buckets)
+        picks = np.array([p[np.argmin(y[p])] for p in parts])
+        slope, intercept = np.polyfit(x[picks], y[picks], 1)
+        self.drift = float(slope)
+        self.offset_ns = float(intercept)
+        self.jitter_ns = float(np.std(y - (intercept + slope * x)))
+
+    def device_time(self, device_ns):
+        rel = device_ns - self.t0
+        return int(device_ns + self.offset_ns + self.drift * rel)
+
+    @property
+    def drift_ppm(self):
+        """Device crystal against the host clock; positive when the device runs fast."""
+        return -float(self.drift) / (1 + float(self.drift)) * 1e6
+
+    def stats(self):
+        return {"samples": self.count, "drift_ppm": self.drift_ppm, "host_jitter_us": self.jitter_ns / 1000,
+                "wraps": self.wraps}
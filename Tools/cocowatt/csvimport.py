@@ -0,0 +1,193 @@
+"""Streaming import of ``Timestamp,Data[,Direction]`` logs in vectorized chunks, on a background thread."""
+import csv
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from .parser import PatternParser
+
+CHUNK_ROWS = 100_000
+MAX_CLOCK_WIDTH = 32  # Longer cells take the scalar path rather than widening the array for every row
+
+
+def _clock_seconds(stamp):
+    # Same formats the line-by-line importer accepted; single-digit fields included
+    try:
+        dt = datetime.strptime(stamp.strip(), "%H:%M:%S.%f" if '.' in stamp else "%H:%M:%S")
+    except ValueError:
+        return np.nan
+    return dt.hour * 3600 + dt.minute * 60 + dt.second + dt.microsecond / 1e6
+
+
+def parse_clock(stamps):
+    """Vectorized ``"HH:MM:SS[.f...]"`` to seconds since midnight; NaN where a stamp is malformed.
+
+    Stamps that do not fit the fixed layout (a single-digit hour aside) are retried
+    one by one with ``strptime``.
+    """
+    n = len(stamps)
+    if not n:
+        return np.empty(0, dtype=np.float64)
+    lengths = np.fromiter(map(len, stamps), dtype=np.int64, count=n)
+    # One spare column so a single-digit hour can be padded in place
+    width = max(10, int(lengths[lengths <= MAX_CLOCK_WIDTH].max(initial=0)) + 1)
+    # Fixed-width UCS-4 codes, one row per stamp; shorter stamps are zero padded
+    codes = np.array(stamps, dtype=f'U{width}').view(np.uint32).reshape(n, width).astype(np.int64)
+    short_hour = codes[:, 1] == 58
+    codes[short_hour, 1:] = codes[short_hour, :-1]
+    codes[short_hour, 0] = 48
+    digits = codes - 48
+    is_digit = (digits >= 0) & (digits <= 9)
+    ok = (lengths < width) & is_digit[:, [0, 1, 3, 4, 6, 7]].all(axis=1) & (codes[:, 2] == 58) & (codes[:, 5] == 58)
+    frac = codes[:, 9:]
+    frac_digit = is_digit[:, 9:]
+    pad = frac == 0
+    no_fraction = (codes[:, 8] == 0) & pad.all(axis=1)
+    # A '.', at least one digit, then only digits until the padding starts
+    fraction = ((codes[:, 8] == 46) & frac_digit[:, 0] & (frac_digit | pad).all(axis=1)
+                & ~(pad[:, :-1] & frac_digit[:, 1:]).any(axis=1))
+    ok &= no_fraction | fraction
+    seconds = ((digits[:, 0] * 10 + digits[:, 1]) * 3600 + (digits[:, 3] * 10 + digits[:, 4]) * 60
+               + digits[:, 6] * 10 + digits[:, 7]).astype(np.float64)
+    seconds += (np.where(frac_digit, digits[:, 9:], 0) * 10.0 ** -np.arange(1, width - 8)).sum(axis=1)
+    for i in np.flatnonzero(~ok).tolist():
+        seconds[i] = _clock_seconds(stamps[i])
+    return seconds
+
+
+def format_clock(times):
+    """Epoch seconds to local ``"HH:MM:SS.fff"`` strings, without a datetime per row."""
+    if not len(times):
+        return []
+    times = np.asarray(times, dtype=np.float64)
+    first = datetime.fromtimestamp(times[0])
+    midnight = first.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    # Round to microseconds like datetime, then truncate to milliseconds like the live timestamps
+    ms = np.round((times - midnight) * 1e6).astype(np.int64) // 1000 % 86_400_000
+    h, rest = np.divmod(ms, 3_600_000)
+    m, rest = np.divmod(rest, 60_000)
+    s, ms = np.divmod(rest, 1000)
+    return [f"{a:02d}:{b:02d}:{c:02d}.{d:03d}" for a, b, c, d in zip(h.tolist(), m.tolist(), s.tolist(), ms.tolist())]
+
+
+class ClockUnwrapper:
+    """Turns clock-only seconds into epoch times on ``date``, stepping a day on each midnight rollover."""
+
+    def __init__(self, date):
+        self.base = datetime.combine(date, datetime.min.time()).timestamp()
+        self.last = None
+
+    def __call__(self, seconds):
+        # A jump back of more than 12 h is the clock passing midnight
+        prev = np.concatenate(([seconds[0] if self.last is None else self.last], seconds[:-1]))
+        days = np.cumsum(seconds < prev - 43200) * 86400.0
+        times = self.base + days + seconds
+        if len(seconds):
+            self.base += days[-1]
+            self.last = seconds[-1]
+        return times
+
+
+def iter_csv_chunks(path, parser, chunk_rows=CHUNK_ROWS, date=None, progress=None):
+    """Yield ``(times, lines, parsed)`` per chunk of received rows.
+
+    ``times`` are epoch seconds on ``date`` (default: the file's modification day),
+    ``parsed`` is ``parser.parse_many(lines)`` (None without a parser). Rows with a malformed timestamp are
+    dropped. ``progress(bytes_read, rows_skipped)`` is called after each chunk.
+    """
+    if date is None:
+        date = datetime.fromtimestamp(os.path.getmtime(path)).date()
+    unwrap = ClockUnwrapper(date)
+    consumed = [0]
+
+    def counted(f):
+        for line in f:
+            consumed[0] += len(line)
+            yield line
+
+    skipped = 0
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(counted(f))
+        header = next(reader, None)
+        if header is None:
+            return
+        ts_col = header.index('Timestamp') if 'Timestamp' in header else 0
+        data_col = header.index('Data') if 'Data' in header else 1
+        dir_col = header.index('Direction') if 'Direction' in header else None
+        width = max(ts_col, data_col) + 1
+        while True:
+            stamps, lines = [], []
+            for row in reader:
+                if len(row) < width or (dir_col is not None and len(row) > dir_col and row[dir_col] != 'Received'):
+                    skipped += 1
+                    continue
+                stamps.append(row[ts_col])
+                lines.append(row[data_col])
+                if len(lines) == chunk_rows:
+                    break
+            if not lines:
+                break
+            seconds = parse_clock(stamps)
+            valid = ~np.isnan(seconds)
+            if not valid.all():
+                skipped += int((~valid).sum())
+                lines = [line for line, keep in zip(lines, valid) if keep]
+                seconds = seconds[valid]
+            if lines:
+                yield unwrap(seconds), lines, parser.parse_many(lines) if parser is not None else None
+            if progress is not None:
+                progress(consumed[0], skipped)
+
+
+class CsvImporter(threading.Thread):
+    """Runs ``iter_csv_chunks`` on a daemon thread and hands every chunk to ``on_chunk``.
+
+    ``on_chunk(times, lines, parsed)`` is called on the import thread, so it must do
+    its own locking. Poll ``progress``/``done`` from the UI and call ``cancel`` to stop
+    after the current chunk.
+    """
+
+    def __init__(self, path, patterns, on_chunk, chunk_rows=CHUNK_ROWS, date=None):
+        super().__init__(daemon=True)
+        self.path = path
+        self.parser = PatternParser(patterns)
+        self.on_chunk = on_chunk
+        self.chunk_rows = chunk_rows
+        self.date = date
+        self.total_bytes = max(os.path.getsize(path), 1)
+        self.bytes_read = 0
+        self.rows = 0
+        self.skipped = 0
+        self.error = None
+        self.done = False
+        self._cancel = threading.Event()
+
+    def _progress(self, bytes_read, skipped):
+        self.bytes_read = bytes_read
+        self.skipped = skipped
+
+    @property
+    def progress(self):
+        return min(self.bytes_read / self.total_bytes, 1.0)
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def run(self):
+        try:
+            for times, lines, parsed in iter_csv_chunks(self.path, self.parser, self.chunk_rows, self.date,
+                                                        self._progress):
+                if self._cancel.is_set():
+                    break
+                self.on_chunk(times, lines, parsed)
+                self.rows += len(lines)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
@@ -0,0 +1,142 @@
+"""Tk dashboard for ``MultiCapture``: one table row per device and one shared plot per parser pattern."""
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+import serial.tools.list_ports
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+
+from .decimate import decimate
+from .multiport import MultiCapture
+
+REFRESH_MS = 500  # Table and plot refresh; independent of the line rate and device count
+COLORS = ['#4CAF50', '#2196F3', '#FF9800', '#9C27B0', '#FF5722', '#00BCD4', '#8BC34A', '#E91E63',
+          '#795548', '#607D8B', '#CDDC39', '#3F51B5', '#F44336', '#009688', '#FFC107', '#673AB7']
+
+
+class MultiPortDashboard(tk.Toplevel):
+    """Window that owns a ``MultiCapture``; closing it closes every port."""
+
+    def __init__(self, parent, patterns, baudrate="115200", max_history=2000):
+        super().__init__(parent)
+        self.title("COCOWATT Multi-port Dashboard")
+        self.geometry("1000x700")
+        self.capture = MultiCapture(patterns=patterns, max_history=max_history)
+        self.patterns = self.capture.patterns
+        self._last_counts = {}
+        self._last_time = time.monotonic()
+        self._job = None
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+
+        bar = ttk.Frame(self)
+        bar.pack(fill="x", padx=10, pady=10)
+        ttk.Label(bar, text="Port:").pack(side=tk.LEFT)
+        self.port_var = tk.StringVar()
+        self.port_combo = ttk.Combobox(bar, textvariable=self.port_var, width=18)
+        self.port_combo.pack(side=tk.LEFT, padx=5)
+        ttk.Button(bar, text="🔄", width=3, command=self.refresh_ports).pack(side=tk.LEFT)
+        ttk.Label(bar, text="Baud:").pack(side=tk.LEFT, padx=(10, 0))
+        self.baud_var = tk.StringVar(value=str(baudrate))
+        ttk.Entry(bar, textvariable=self.baud_var, width=8).pack(side=tk.LEFT, padx=5)
+        ttk.Button(bar, text="Add", command=self.add_device).pack(side=tk.LEFT, padx=5)
+        ttk.Button(bar, text="Remove", command=self.remove_device).pack(side=tk.LEFT)
+        self.summary = ttk.Label(bar, text="")
+        self.summary.pack(side=tk.RIGHT)
+
+        columns = ["port", "lines", "rate", "status"] + self.patterns
+        self.table = ttk.Treeview(self, columns=columns, show="tree headings", height=8)
+        self.table.heading("#0", text="Device")
+        self.table.column("#0", width=120)
+        for column, title in zip(columns, ["Port", "Lines", "Lines/s", "Status"] + self.patterns):
+            self.table.heading(column, text=title)
+            self.table.column(column, width=90, anchor="e")
+        self.table.pack(fill="x", padx=10)
+
+        self.figure = Figure(figsize=(10, 4), dpi=100)
+        self.axes = {}
+        for i, pattern in enumerate(self.patterns):
+            ax = self.figure.add_subplot(len(self.patterns), 1, i + 1)
+            ax.set_ylabel(pattern)
+            ax.grid(True, alpha=0.3)
+            self.axes[pattern] = ax
+        self.lines = {}
+        self.canvas = FigureCanvasTkAgg(self.figure, master=self)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+        self.refresh_ports()
+        self._job = self.after(REFRESH_MS, self.refresh)
+
+    def refresh_ports(self):
+        self.port_combo['values'] = [p.device for p in serial.tools.list_ports.comports()]
+
+    def add_device(self):
+        port = self.port_var.get().strip()
+        if not port:
+            return
+        try:
+            device = self.capture.add(port, self.baud_var.get())
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open {port}:\n{e}", parent=self)
+            return
+        self.table.insert("", tk.END, iid=device.name, text=device.name)
+
+    def remove_device(self):
+        for name in self.table.selection():
+            self.capture.remove(name)
+            self.table.delete(name)
+            for pattern in self.patterns:
+                line = self.lines.pop((name, pattern), None)
+                if line is not None:
+                    line.remove()
+
+    def refresh(self):
+        now = time.monotonic()
+        elapsed = max(now - self._last_time, 1e-9)
+        self._last_time = now
+        snapshot = self.capture.snapshot()
+        total_rate = 0.0
+        for name, info in snapshot.items():
+            rate = (info["lines"] - self._last_counts.get(name, info["lines"])) / elapsed
+            self._last_counts[name] = info["lines"]
+            total_rate += rate
+            status = "error" if info["error"] else "open"
+            values = [info["values"].get(p, "—") for p in self.patterns]
+            if self.table.exists(name):
+                self.table.item(name, values=[info["port"], info["lines"], f"{rate:.0f}", status] + values)
+        self.summary.config(text=f"{len(snapshot)} devices  {total_rate:,.0f} lines/s  "
+                                 f"queue {self.capture.queue_depth}  dropped {self.capture.dropped_lines}")
+        self.update_plot()
+        self._job = self.after(REFRESH_MS, self.refresh)
+
+    def update_plot(self):
+        width = max(int(self.figure.bbox.width), 100)
+        with self.capture.lock:
+            devices = list(self.capture.devices.values())
+            starts = [ring.t_min for d in devices for ring in d.history.values() if ring]
+            t0 = min(starts) if starts else 0.0
+            series = {}
+            for device in devices:
+                for pattern in self.patterns:
+                    ring = device.history.get(pattern)
+                    if ring:
+                        times, values = decimate(ring.times, ring.values, width)
+                        series[device.name, pattern] = (times - t0, values.copy())
+        names = [d.name for d in devices]
+        for (name, pattern), (times, values) in series.items():
+            line = self.lines.get((name, pattern))
+            if line is None:
+                color = COLORS[names.index(name) % len(COLORS)]
+                line, = self.axes[pattern].plot([], [], linewidth=1.5, color=color, label=name)
+                self.lines[name, pattern] = line
+                self.axes[pattern].legend(loc='upper right', fontsize=8, ncol=4)
+            line.set_data(times, values)
+        for ax in self.axes.values():
+            ax.relim()
+            ax.autoscale_view()
+        self.canvas.draw_idle()
+
+    def on_closing(self):
+        if self._job is not None:
+            self.after_cancel(self._job)
+        self.capture.close()
+        self.destroy()
@@ -0,0 +1,76 @@
+"""Reduce a time series to about one point per screen pixel without hiding spikes."""
+import numpy as np
+
+
+def visible_slice(times, lo=None, hi=None):
+    """Index range of ``times`` (sorted) inside [lo, hi], widened by one sample on each side."""
+    n = len(times)
+    start = 0 if lo is None else max(int(np.searchsorted(times, lo, 'left')) - 1, 0)
+    stop = n if hi is None else min(int(np.searchsorted(times, hi, 'right')) + 1, n)
+    return start, stop
+
+
+def minmax(times, values, buckets):
+    """Keep the minimum and maximum of each of ``buckets`` equal-count buckets, in time order.
+
+    Every extreme survives, so a one-sample glitch on a million-point trace is still
+    drawn. Returns at most ``2 * buckets + 2`` points (the first and last sample are
+    always kept).
+    """
+    n = len(values)
+    if buckets < 1 or n <= 2 * buckets + 2:
+        return times, values
+    per = n // buckets
+    usable = per * buckets
+    grid = values[:usable].reshape(buckets, per)
+    imin = grid.argmin(axis=1)
+    imax = grid.argmax(axis=1)
+    base = np.arange(buckets) * per
+    idx = np.empty(2 * buckets, dtype=np.intp)
+    idx[0::2] = np.minimum(imin, imax) + base
+    idx[1::2] = np.maximum(imin, imax) + base
+    parts = [[0], idx]
+    if usable < n:
+        tail = values[usable:]
+        parts.append(np.sort([usable + int(tail.argmin()), usable + int(tail.argmax())]))
+    parts.append([n - 1])
+    idx = np.unique(np.concatenate(parts))
+    return times[idx], values[idx]
+
+
+def lttb(times, values, threshold):
+    """Largest-Triangle-Three-Buckets down-sampling to ``threshold`` points."""
+    n = len(values)
+    if threshold < 3 or n <= threshold:
+        return times, values
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    idx = np.empty(threshold, dtype=np.intp)
+    idx[0] = 0
+    idx[-1] = n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third triangle vertex
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_t = times[nlo:nhi].mean() if nhi > nlo else times[-1]
+        avg_v = values[nlo:nhi].mean() if nhi > nlo else values[-1]
+        ta, va = times[a], values[a]
+        t = times[lo:hi]
+        v = values[lo:hi]
+        area = np.abs((ta - avg_t) * (v - va) - (ta - t) * (avg_v - va))
+        a = lo + int(area.argmax())
+        idx[i + 1] = a
+    return times[idx], values[idx]
+
+
+METHODS = {"minmax": minmax, "lttb": lttb}
+
+
+def decimate(times, values, width, lo=None, hi=None, method="minmax"):
+    """Slice to the visible window [lo, hi] and reduce it to about ``width`` pixels."""
+    start, stop = visible_slice(times, lo, hi)
+    times = times[start:stop]
+    values = values[start:stop]
+    if method == "lttb":
+        return lttb(times, values, 2 * int(width))
+    return minmax(times, values, int(width))
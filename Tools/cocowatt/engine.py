@@ -0,0 +1,580 @@
+"""Headless capture engine: serial reader, line splitting, parsing and history."""
+import sys
+import threading
+import select
+import time
+import queue
+import csv
+import math
+import traceback
+
+import serial
+
+from .framer import LineFramer
+from .history import SeriesRing, EntryRing
+from .stats import ChannelStats
+from .search import LineIndex, search
+from .metrics import Metrics, Profiler
+from .parser import PatternParser
+from .binproto import FrameDecoder, channel_values
+from .clock import now_ns, to_epoch, format_ns, resync, TickClock
+
+DEFAULT_PATTERNS = ["ADC Volt:", "ADC Volt2:"]
+# "select" blocks on the port until bytes arrive; "poll" is the original in_waiting + 10 ms sleep loop;
+# "asyncio" attaches the port to the shared event loop in cocowatt.aio instead of a reader thread
+READER_MODES = ("select", "poll", "asyncio")
+# "text" is the ASCII firmware output; "binary" is the framed format of send_UART_frame()
+PROTOCOLS = ("text", "binary")
+PARTIAL_LINE_FLUSH = 0.1
+IDLE_WAKEUP = 0.5
+
+PARITY = {"None": serial.PARITY_NONE, "Even": serial.PARITY_EVEN, "Odd": serial.PARITY_ODD,
+          "Mark": serial.PARITY_MARK, "Space": serial.PARITY_SPACE}
+STOPBITS = {"1": serial.STOPBITS_ONE, "1.5": serial.STOPBITS_ONE_POINT_FIVE, "2": serial.STOPBITS_TWO}
+BYTESIZE = {"5": serial.FIVEBITS, "6": serial.SIXBITS, "7": serial.SEVENBITS, "8": serial.EIGHTBITS}
+
+
+def open_serial(port, baudrate=115200, bytesize="8", parity="None", stopbits="1"):
+    """Open ``port`` non-blocking with the GUI's string settings, buffers flushed."""
+    conn = serial.Serial(
+        port=port,
+        baudrate=int(baudrate),
+        timeout=0,
+        bytesize=BYTESIZE.get(str(bytesize), serial.EIGHTBITS),
+        parity=PARITY.get(parity, serial.PARITY_NONE),
+        stopbits=STOPBITS.get(str(stopbits), serial.STOPBITS_ONE),
+        rtscts=False,
+        dsrdtr=False
+    )
+    conn.reset_input_buffer()
+    conn.reset_output_buffer()
+    return conn
+
+
+def frame_entries(frames, t):
+    # Values go straight to the history; the text is only for the terminal and logs
+    entries = []
+    for frame in frames:
+        values = channel_values(frame.values)
+        text = " ".join(f"{name} {value:g}" for name, value in values.items())
+        entries.append({'t': t, 'data': f"#{frame.seq} {text}", 'values': values, 'tick': frame.tick})
+    return entries
+
+
+class CsvRecorder:
+    """Listener that appends every received line to a CSV file, timestamps formatted as ``HH:MM:SS.fff``."""
+
+    def __init__(self, filename, with_direction=False, with_device=False):
+        self.file = open(filename, 'w', newline='', encoding='utf-8-sig')
+        self.writer = csv.writer(self.file)
+        self.with_direction = with_direction
+        self.with_device = with_device
+        header = ['Timestamp', 'Data', 'Direction'] if with_direction else ['Timestamp', 'Data']
+        self.writer.writerow(header + ['Device'] if with_device else header)
+
+    def __call__(self, entries, parsed):
+        if self.file.closed:
+            return
+        if self.with_device:
+            direction = ['Received'] if self.with_direction else []
+            self.writer.writerows([format_ns(e['t']), e['data']] + direction + [e.get('device', '')] for e in entries)
+        elif self.with_direction:
+            self.writer.writerows([format_ns(e['t']), e['data'], 'Received'] for e in entries)
+        else:
+            self.writer.writerows([format_ns(e['t']), e['data']] for e in entries)
+
+    def write(self, t, data, direction):
+        if self.file.closed:
+            return
+        if self.with_direction:
+            self.writer.writerow([format_ns(t), data, direction])
+        else:
+            self.writer.writerow([format_ns(t), data])
+
+    @property
+    def closed(self):
+        return self.file.closed
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class CaptureEngine:
+    def __init__(self, patterns=None, max_history=2000, max_display=100_000, max_line_length=4096,
+                 reader_mode="select", max_queue=1000, protocol="text", stats_samples=1000, stats_seconds=10.0):
+        self.serial_conn = None
+        self.running = False
+        # Batches of entries, one per serial read; bounded so a stalled consumer cannot grow it forever
+        self.data_queue = queue.Queue(maxsize=max_queue)
+        self.dropped_lines = 0
+        self.lock = threading.Lock()
+        # Received lines for views and exports, read incrementally by sequence number
+        self.display_data = EntryRing(max_display)
+        self.max_display = max_display
+        # Trigram, value and time lookups over display_data, kept up to date as lines arrive
+        self.search_index = LineIndex(max_display)
+        self.framer = LineFramer(max_line_length)
+        self.decoder = None
+        self.set_protocol(protocol)
+        self.last_activity = time.time()
+        self.patterns = []
+        self.parser = PatternParser([])
+        self.parser_values = {}
+        self.parser_history = {}
+        # Streaming count/min/max/mean/std/rate per pattern, updated with each sample
+        self.parser_stats = {}
+        self.stats_window = (stats_samples, stats_seconds)
+        self.max_history = max_history
+        self.listeners = []
+        # A failing listener keeps being called; its first traceback goes to stderr
+        self.listener_errors = 0
+        self._failed_listeners = []
+        self.lines_received = 0
+        self.bytes_received = 0
+        self.reader_mode = reader_mode
+        self.wakeups = 0
+        self.reader_thread = None
+        # Set by close(); each open() gets its own, so an old reader can never pick up a new connection
+        self._reader_halt = threading.Event()
+        self.async_transport = None
+        self.processor_thread = None
+        self.replay = None
+        # Follows the shared-memory ring of a separate capture process (see shmring)
+        self.shared = None
+        # Maps the STM tick of binary frames onto host time
+        self.tick_clock = TickClock()
+        self.metrics = Metrics()
+        self.profiler = Profiler()
+        self._parse_s = 0.0
+        self.register_metrics(self.metrics)
+        self.set_patterns(patterns or DEFAULT_PATTERNS)
+
+    def register_metrics(self, metrics):
+        metrics.counter("bytes_read_total", "Bytes read from the port (or replay)", lambda: self.bytes_received)
+        metrics.rate("bytes_read_per_second", "Read throughput", lambda: self.bytes_received)
+        metrics.counter("reader_wakeups_total", "Reader loop iterations, with or without data", lambda: self.wakeups)
+        self._m_reads = metrics.counter("reads_total", "Non-empty reads handed to feed")
+        self._m_framed = metrics.counter("lines_framed_total", "Lines (or binary frames) split from the byte stream")
+        metrics.counter("lines_processed_total", "Lines parsed and stored", lambda: self.lines_received)
+        metrics.rate("lines_per_second", "Processing throughput", lambda: self.lines_received)
+        metrics.counter("lines_dropped_total", "Lines dropped because data_queue was full", lambda: self.dropped_lines)
+        metrics.counter("listener_errors_total", "Listener calls that raised", lambda: self.listener_errors)
+        metrics.gauge("queue_depth", "Batches waiting in data_queue", lambda: self.data_queue.qsize())
+        metrics.gauge("retained_lines", "Lines held in display_data", lambda: len(self.display_data))
+        metrics.gauge("search_index_bytes", "Memory of the search index", lambda: self.search_index.nbytes)
+        metrics.gauge("shared_lag_lines", "Lines the capture process is ahead of this engine",
+                      lambda: self.shared.lag if self.shared else 0)
+        metrics.counter("shared_skipped_total", "Lines the shared ring reused before this engine read them",
+                        lambda: self.shared.skipped if self.shared else 0)
+        self._m_queue_latency = metrics.histogram("queue_latency_seconds", "Read stamp to start of processing, per batch")
+        self._m_parse = metrics.histogram("parse_seconds", "Pattern parsing, per batch")
+        self._m_process = metrics.histogram(
+            "process_seconds", "handle_batch under the engine lock (parse, history, statistics, index), per batch")
+        self._m_listeners = metrics.histogram("listener_seconds", "All listeners (loggers, recorders), per batch")
+
+    # Configuration
+    def set_patterns(self, patterns, reset=False):
+        """Parse with ``patterns`` from now on.
+
+        With ``reset`` the history, latest value and statistics of patterns that were
+        removed are dropped and added (or edited) patterns start empty; patterns that
+        did not change keep theirs.
+        """
+        patterns = list(dict.fromkeys(p for p in patterns if p)) or list(DEFAULT_PATTERNS)
+        parser = PatternParser(patterns)
+        with self.lock:
+            self.patterns = patterns
+            self.parser = parser
+            if reset:
+                history, values, stats = self.parser_history, self.parser_values, self.parser_stats
+                self.parser_history = {p: history[p] if p in history else SeriesRing(self.max_history)
+                                       for p in patterns}
+                self.parser_values = {p: values.get(p) for p in patterns}
+                self.parser_stats = {p: stats[p] for p in patterns if p in stats}
+            else:
+                for p in patterns:
+                    self.parser_values.setdefault(p, None)
+        if self.shared is not None:
+            # Lines arrive parsed by the capture process
+            self.shared.send({"patterns": patterns})
+
+    def set_protocol(self, protocol):
+        self.protocol = protocol
+        self.decoder = FrameDecoder() if protocol == "binary" else None
+
+    def set_display_capacity(self, capacity):
+        with self.lock:
+            self.max_display = int(capacity)
+            self.display_data.resize(self.max_display)
+            self.search_index = LineIndex(self.max_display)
+            seq = self.display_data.first_seq
+            for entry in self.display_data:
+                self.search_index.add(seq, entry['data'], entry.get('values') or self.parser.parse(entry['data']))
+                seq += 1
+
+    def set_stats_window(self, samples, seconds):
+        """Window sizes for the windowed statistics; restarts all statistics."""
+        with self.lock:
+            self.stats_window = (int(samples), float(seconds))
+            self.parser_stats = {}
+
+    def set_history_capacity(self, capacity):
+        with self.lock:
+            self.max_history = int(capacity)
+            for pattern, old in self.parser_history.items():
+                # Keep the newest samples, so growing the history does not blank the graph
+                ring = self.parser_history[pattern] = SeriesRing(self.max_history)
+                ring.extend(old.times, old.values)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    # Connection
+    def open(self, port, baudrate=115200, bytesize="8", parity="None", stopbits="1"):
+        self.close()
+        self.serial_conn = open_serial(port, baudrate, bytesize, parity, stopbits)
+        resync()
+        self.tick_clock = TickClock()
+        self.running = True
+        self.last_activity = time.time()
+        if self.reader_mode == "asyncio":
+            self.read_serial_async()
+        else:
+            self._reader_halt = threading.Event()
+            self.reader_thread = threading.Thread(target=self.read_serial,
+                                                  args=(self.serial_conn, self._reader_halt), daemon=True)
+            self.reader_thread.start()
+        self.start()
+
+    def open_replay(self, path, speed=1.0, loop=False):
+        """Play a CSV log or ``.cwcap`` file through ``feed`` instead of reading a port.
+
+        ``speed`` divides the recorded spacing; 0 plays as fast as the pipeline keeps
+        up, waiting for queue space rather than dropping batches. Replayed lines are
+        ASCII, so the text protocol is selected.
+        """
+        from .replay import Replay
+        self.close()
+        self.set_protocol("text")
+        self.framer.clear()
+        self.running = True
+        self.last_activity = time.time()
+        self.replay = Replay(path, self.feed, speed, loop, throttle=self._wait_for_queue)
+        self.replay.start()
+        self.start()
+        return self.replay
+
+    def open_shared(self, name, backlog=0):
+        """Follow the ring of a ``python -m cocowatt capture --shm NAME`` process instead of reading a port.
+
+        Starts ``backlog`` lines before the newest one. Lines arrive framed and parsed;
+        ``write`` and ``set_patterns`` are passed on to the capture process. ``close``
+        only detaches, the capture process keeps running.
+        """
+        from .shmring import ShmRing, RingFollower
+        ring = ShmRing.attach(name)
+        self.close()
+        self.running = True
+        self.last_activity = time.time()
+        self.shared = RingFollower(ring, self.put_batch, backlog, throttle=self._wait_for_queue)
+        self.shared.start()
+        self.start()
+        self.shared.send({"patterns": self.patterns})
+        return self.shared
+
+    def _wait_for_queue(self):
+        if self.data_queue.maxsize <= 0:
+            return
+        high = max(1, self.data_queue.maxsize * 3 // 4)
+        while self.running and self.data_queue.qsize() >= high:
+            time.sleep(0.001)
+
+    def close(self, stop_capture=False):
+        """Stop reading; with ``stop_capture`` a followed capture process is asked to exit as well."""
+        self.running = False
+        self._reader_halt.set()
+        if self.replay is not None:
+            self.replay.stop()
+            self.replay = None
+        if self.shared is not None:
+            if stop_capture and not self.shared.done:
+                self.shared.ring.request_stop()
+            self.shared.stop()
+            self.shared = None
+        if self.async_transport is not None:
+            from .aio import shared_loop
+            shared_loop().call(self.async_transport.close)
+            self.async_transport = None
+        if self.serial_conn and self.serial_conn.is_open:
+            self.serial_conn.close()
+        self.serial_conn = None
+        reader, self.reader_thread = self.reader_thread, None
+        if reader is not None and reader is not threading.current_thread():
+            # Halted, it stops within IDLE_WAKEUP and posts no errors about the port closed under it
+            reader.join(IDLE_WAKEUP + 1.0)
+
+    @property
+    def is_open(self):
+        if self.replay is not None:
+            return bool(self.running and not self.replay.done)
+        if self.shared is not None:
+            return bool(self.running and not self.shared.done)
+        return bool(self.running and self.serial_conn and self.serial_conn.is_open)
+
+    def write(self, text):
+        if self.shared is not None:
+            if not self.shared.send({"send": text}):
+                raise IOError("capture process is not taking commands")
+            return
+        data_to_send = text + '\r\n'
+        self.serial_conn.write(data_to_send.encode('iso-8859-1'))
+        self.serial_conn.flush()
+
+    # Pipeline
+    def start(self):
+        if self.processor_thread is None:
+            self.processor_thread = threading.Thread(target=self.process_queue, daemon=True)
+            self.processor_thread.start()
+
+    def feed(self, data, t=None):
+        """Split one read into entries, all stamped with ``t`` (``monotonic_ns`` of the read)."""
+        if t is None:
+            t = now_ns()
+        self.bytes_received += len(data)
+        self._m_reads.inc()
+        if self.decoder is not None:
+            frames = self.decoder.feed(data)
+            if frames:
+                self._m_framed.inc(len(frames))
+                self.put_batch(frame_entries(frames, t))
+            return
+        lines = self.framer.feed(data)
+        if lines:
+            self._m_framed.inc(len(lines))
+            self.put_batch([{'t': t, 'data': line} for line in lines])
+
+    def flush_partial(self):
+        line = self.framer.flush()
+        if line:
+            self.put_line(line)
+
+    def put_line(self, line, t=None):
+        self.put_batch([{'t': now_ns() if t is None else t, 'data': line}])
+
+    def put_batch(self, entries):
+        try:
+            self.data_queue.put_nowait(entries)
+        except queue.Full:
+            # Never block the reader: the OS serial buffer would overflow instead
+            self.dropped_lines += len(entries)
+
+    @property
+    def queue_depth(self):
+        return self.data_queue.qsize()
+
+    def read_serial(self, conn, halt):
+        if self.reader_mode == "poll":
+            self.read_serial_polling(conn, halt)
+        else:
+            self.read_serial_blocking(conn, halt)
+
+    def read_serial_blocking(self, conn, halt):
+        try:
+            fd = conn.fileno()
+        except Exception:
+            fd = None  # No selectable handle (Windows): fall back to pyserial read timeouts
+        last_data_time = time.monotonic()
+        while not halt.is_set():
+            self.profiler.checkpoint()
+            if len(self.framer):
+                timeout = max(0.0, last_data_time + PARTIAL_LINE_FLUSH - time.monotonic())
+            else:
+                timeout = IDLE_WAKEUP
+            try:
+                if fd is not None:
+                    ready, _, _ = select.select([fd], [], [], timeout)
+                    # On a ready fd with nothing waiting, read(1) makes pyserial report the hang-up
+                    data = conn.read(conn.in_waiting or 1) if ready else b''
+                else:
+                    conn.timeout = timeout
+                    data = conn.read(max(1, conn.in_waiting))
+                    if data and conn.in_waiting:
+                        data += conn.read(conn.in_waiting)
+            except Exception as e:
+                if not halt.is_set():
+                    self.put_line(f"[ERROR] {str(e)}")
+                    halt.wait(PARTIAL_LINE_FLUSH)
+                continue
+            self.wakeups += 1
+            if data:
+                self.feed(data, now_ns())
+                last_data_time = time.monotonic()
+                self.last_activity = time.time()
+            elif len(self.framer) and time.monotonic() - last_data_time >= PARTIAL_LINE_FLUSH:
+                self.flush_partial()
+
+    def read_serial_async(self):
+        """Attach the port to the shared asyncio loop; returns once the transport is connected."""
+        from .aio import shared_loop, connect, ReaderProtocol
+
+        def on_data(data):
+            self.wakeups += 1
+            self.feed(data)
+            self.last_activity = time.time()
+
+        def on_lost(exc):
+            if self.running and exc is not None:
+                self.put_line(f"[ERROR] {str(exc)}")
+
+        protocol = ReaderProtocol(on_data, self.flush_partial, on_lost)
+        self.async_transport = shared_loop().submit(connect(self.serial_conn, protocol)).result(5.0)
+
+    def read_serial_polling(self, conn, halt):
+        last_data_time = time.time()
+        while not halt.is_set():
+            self.profiler.checkpoint()
+            self.wakeups += 1
+            if conn.is_open and conn.in_waiting > 0:
+                try:
+                    self.feed(conn.read(conn.in_waiting))
+                    last_data_time = time.time()
+                    self.last_activity = last_data_time
+                except Exception as e:
+                    if not halt.is_set():
+                        self.put_line(f"[ERROR] {str(e)}")
+            else:
+                if len(self.framer) and (time.time() - last_data_time) > PARTIAL_LINE_FLUSH:
+                    self.flush_partial()
+                halt.wait(0.01)
+
+    def process_queue(self):
+        while True:
+            self.profiler.checkpoint()
+            try:
+                entries = self.data_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self.handle_batch(entries)
+
+    def handle_batch(self, entries):
+        start = time.perf_counter()
+        self._m_queue_latency.observe((now_ns() - entries[0]['t']) / 1e9)
+        with self.lock:
+            self._parse_s = 0.0
+            parsed = [self.handle_entry(entry) for entry in entries]
+            self._m_parse.observe(self._parse_s)
+        done = time.perf_counter()
+        self._m_process.observe(done - start)
+        for listener in list(self.listeners):
+            try:
+                listener(entries, parsed)
+            except Exception:
+                self.listener_errors += 1
+                if listener not in self._failed_listeners:
+                    self._failed_listeners.append(listener)
+                    print(f"listener {listener!r} failed:", file=sys.stderr)
+                    traceback.print_exc()
+        self._m_listeners.observe(time.perf_counter() - done)
+        return parsed
+
+    def handle_entry(self, entry):
+        seq = self.display_data.append(entry)
+        self.lines_received += 1
+        parsed = entry.get('values')
+        if parsed is None:
+            start = time.perf_counter()
+            parsed = self.parser.parse(entry['data'])
+            self._parse_s += time.perf_counter() - start
+        self.search_index.add(seq, entry['data'], parsed)
+        tick = entry.get('tick')
+        if tick is not None:
+            # Firmware sample time: keeps the device's spacing instead of USB/scheduler jitter
+            current_time = to_epoch(self.tick_clock.observe(tick, entry['t']))
+        else:
+            current_time = to_epoch(entry['t'])
+        for pattern in self.patterns:
+            self.parser_values[pattern] = parsed.get(pattern, None)
+        for pattern, value in parsed.items():
+            self.parser_values[pattern] = value
+            if not math.isnan(value):
+                if pattern not in self.parser_history:
+                    self.parser_history[pattern] = SeriesRing(self.max_history)
+                self.parser_history[pattern].append(current_time, value)
+                stats = self.parser_stats.get(pattern)
+                if stats is None:
+                    stats = self.parser_stats[pattern] = ChannelStats(*self.stats_window)
+                stats.add(current_time, value)
+        return parsed
+
+    def extend_series(self, pattern, times, values):
+        """Bulk-load samples (imports, capture files) into a pattern's history and statistics."""
+        if not len(values):
+            return
+        with self.lock:
+            if pattern not in self.parser_history:
+                self.parser_history[pattern] = SeriesRing(self.max_history)
+            self.parser_history[pattern].extend(times, values)
+            stats = self.parser_stats.get(pattern)
+            if stats is None:
+                stats = self.parser_stats[pattern] = ChannelStats(*self.stats_window)
+            stats.extend(times, values)
+            self.parser_values[pattern] = float(values[-1])
+
+    def stats_snapshot(self):
+        """``{pattern: {window: {count, min, max, mean, std, rms, rate}}}`` for every pattern seen."""
+        with self.lock:
+            return {pattern: stats.as_dict() for pattern, stats in self.parser_stats.items()}
+
+    def entries_since(self, seq, limit=None):
+        """``(next, entries)`` from the display ring; see ``EntryRing.since``."""
+        with self.lock:
+            return self.display_data.since(seq, limit)
+
+    def iter_entries(self, chunk=10_000):
+        """Retained entries up to now, read a chunk at a time so capture is never held up for long."""
+        with self.lock:
+            seq, stop = self.display_data.first_seq, self.display_data.next_seq
+        while seq < stop:
+            seq, entries = self.entries_since(seq, min(chunk, stop - seq))
+            if not entries:
+                return
+            yield from entries
+
+    def load_display(self, entries):
+        """Replace the retained lines (imports, capture files) without touching history or statistics.
+
+        Returns the sequence number after the last one loaded.
+        """
+        with self.lock:
+            self.display_data.clear()
+            self.search_index.clear()
+            for entry in entries[-self.max_display:]:
+                seq = self.display_data.append(entry)
+                self.search_index.add(seq, entry['data'], self.parser.parse(entry['data']))
+            return self.display_data.next_seq
+
+    def search(self, text=None, pattern=None, lo=None, hi=None, t_from=None, t_to=None, limit=None):
+        """``(seqs, complete)`` of retained lines matching every condition; see ``cocowatt.search.search``."""
+        return search(self, text, pattern, lo, hi, t_from, t_to, limit)
+
+    def clear_display(self):
+        with self.lock:
+            self.display_data.clear()
+            self.search_index.clear()
+            self.framer.clear()
+
+    def clear(self):
+        with self.lock:
+            self.display_data.clear()
+            self.search_index.clear()
+            self.framer.clear()
+            if self.decoder is not None:
+                self.decoder.clear()
+            self.parser_values = {p: None for p in self.parser_values}
+            self.parser_history = {p: SeriesRing(self.max_history) for p in self.parser_history}
+            self.parser_stats = {}
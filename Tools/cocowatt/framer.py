@@ -0,0 +1,85 @@
+"""Incremental byte-level line framer for the serial reader."""
+
+
+class LineFramer:
+    """Splits a byte stream on CR, LF or CRLF without rescanning the unfinished tail.
+
+    Only bytes that arrived since the last call are searched for terminators and
+    only complete lines are decoded. A line longer than ``max_line_length`` is
+    split into pieces of that length, whether it arrives in one read or many, so
+    the output never depends on how the port chunks the stream and a noisy link
+    cannot grow the buffer without bound. ``split_lines`` counts the splits.
+    """
+
+    def __init__(self, max_line_length=4096, encoding='iso-8859-1'):
+        self.max_line_length = max_line_length
+        self.encoding = encoding
+        self.buf = bytearray()
+        self.split_lines = 0
+
+    def __len__(self):
+        return len(self.buf)
+
+    def feed(self, data):
+        last = data.rfind(b'\n')
+        cr = data.rfind(b'\r')
+        if cr > last:
+            last = cr
+        buf = self.buf
+        if last < 0:
+            buf += data
+            return self._cut_overlong([]) if len(buf) > self.max_line_length else []
+        end = last + 1
+        # Decode the completed span once; it never includes the unfinished tail
+        if buf:
+            buf += data[:end]
+            text = buf.decode(self.encoding, 'replace')
+            buf.clear()
+        else:
+            text = (data if end == len(data) else data[:end]).decode(self.encoding, 'replace')
+        if end < len(data):
+            buf += data[end:]
+        # CRLF leaves an empty part, dropped below with blank lines
+        parts = text.replace('\r', '\n').split('\n')
+        if len(text) > self.max_line_length:
+            parts = self._split_overlong(parts)
+        lines = []
+        for line in parts:
+            line = line.strip()
+            if line:
+                lines.append(line)
+        if len(buf) > self.max_line_length:
+            self._cut_overlong(lines)
+        return lines
+
+    def _split_overlong(self, parts):
+        limit = self.max_line_length
+        out = []
+        for part in parts:
+            if len(part) > limit:
+                # The same pieces _cut_overlong would have cut had the line arrived in smaller reads
+                pieces = [part[i:i + limit] for i in range(0, len(part), limit)]
+                self.split_lines += len(pieces) - 1
+                out.extend(pieces)
+            else:
+                out.append(part)
+        return out
+
+    def _cut_overlong(self, lines):
+        limit = self.max_line_length
+        while len(self.buf) > limit:
+            line = self.buf[:limit].decode(self.encoding, 'replace').strip()
+            del self.buf[:limit]
+            self.split_lines += 1
+            if line:
+                lines.append(line)
+        return lines
+
+    def flush(self):
+        """Return the pending partial line (if any) and empty the buffer."""
+        line = self.buf.decode(self.encoding, 'replace').strip()
+        self.buf.clear()
+        return line
+
+    def clear(self):
+        self.buf.clear()
@@ -0,0 +1,212 @@
+"""Preallocated columnar float64 storage for parsed time series."""
+import numpy as np
+
+
+class SeriesRing:
+    """Fixed-capacity (time, value) history stored as two contiguous float64 columns.
+
+    Samples are appended at the end of a buffer that is ``capacity`` plus a slack
+    region long. When the slack is used up the newest ``capacity`` samples are moved
+    back to the front in one memmove, so appends are amortised O(1), the live window
+    is always one contiguous slice, and memory stays near 16 bytes per sample.
+
+    Timestamps must be appended in non-decreasing order; this is what makes
+    ``t_min``/``t_max`` O(1). Views returned by ``times``/``values`` are only valid
+    until the next append.
+    """
+
+    __slots__ = ('capacity', '_t', '_v', '_start', '_end')
+
+    def __init__(self, capacity=2000):
+        self.capacity = int(capacity)
+        size = self.capacity + max(1024, self.capacity // 4)
+        self._t = np.empty(size, dtype=np.float64)
+        self._v = np.empty(size, dtype=np.float64)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __bool__(self):
+        return self._end > self._start
+
+    def __iter__(self):
+        return zip(self.times.tolist(), self.values.tolist())
+
+    @property
+    def times(self):
+        return self._t[self._start:self._end]
+
+    @property
+    def values(self):
+        return self._v[self._start:self._end]
+
+    @property
+    def t_min(self):
+        return self._t[self._start] if self else None
+
+    @property
+    def t_max(self):
+        return self._t[self._end - 1] if self else None
+
+    @property
+    def nbytes(self):
+        return self._t.nbytes + self._v.nbytes
+
+    def _compact(self, incoming):
+        keep = min(len(self), self.capacity - incoming)
+        if keep > 0:
+            self._t[:keep] = self._t[self._end - keep:self._end]
+            self._v[:keep] = self._v[self._end - keep:self._end]
+        self._start = 0
+        self._end = max(keep, 0)
+
+    def append(self, t, v):
+        if self._end == len(self._t):
+            self._compact(1)
+        self._t[self._end] = t
+        self._v[self._end] = v
+        self._end += 1
+        if self._end - self._start > self.capacity:
+            self._start += 1
+
+    def extend(self, times, values):
+        times = np.asarray(times, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+        if len(times) >= self.capacity:
+            times = times[-self.capacity:]
+            values = values[-self.capacity:]
+            self._start = self._end = 0
+        n = len(times)
+        if self._end + n > len(self._t):
+            self._compact(n)
+        self._t[self._end:self._end + n] = times
+        self._v[self._end:self._end + n] = values
+        self._end += n
+        self._start = max(self._start, self._end - self.capacity)
+
+    def clear(self):
+        self._start = self._end = 0
+
+    def snapshot(self):
+        """Copies of the current columns, safe to hand to another thread."""
+        return self.times.copy(), self.values.copy()
+
+
+class EntryRing:
+    """Fixed-capacity ring of received lines, addressed by a sequence number that never goes back.
+
+    Each record is an int64 ``monotonic_ns`` stamp in a preallocated array plus the
+    line text (and, for binary frames or multi-port captures, the few extra keys)
+    in slot lists, so append and eviction are O(1) with no per-line copying.
+    Record ``seq`` lives in slot ``seq % capacity``; readers remember the next
+    sequence number they want and call ``since``, which also tells them how many
+    records were evicted before they got to them.
+    """
+
+    __slots__ = ('capacity', '_t', '_data', '_extra', 'first_seq', 'next_seq')
+
+    def __init__(self, capacity=100_000):
+        self.capacity = max(1, int(capacity))
+        self._t = np.zeros(self.capacity, dtype=np.int64)
+        self._data = [None] * self.capacity
+        self._extra = [None] * self.capacity
+        self.first_seq = 0
+        self.next_seq = 0
+
+    def __len__(self):
+        return self.next_seq - self.first_seq
+
+    def __bool__(self):
+        return self.next_seq > self.first_seq
+
+    def __iter__(self):
+        seq = self.first_seq
+        while seq < self.next_seq:
+            seq, entries = self.since(seq, 10_000)
+            yield from entries
+
+    @property
+    def nbytes(self):
+        return self._t.nbytes + 16 * self.capacity
+
+    def append(self, entry):
+        seq = self.next_seq
+        slot = seq % self.capacity
+        self._t[slot] = entry['t']
+        self._data[slot] = entry['data']
+        if len(entry) > 2:
+            self._extra[slot] = {k: v for k, v in entry.items() if k not in ('t', 'data', 'seq')} or None
+        else:
+            self._extra[slot] = None
+        self.next_seq = seq + 1
+        if self.next_seq - self.first_seq > self.capacity:
+            self.first_seq += 1
+        return seq
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def _ranges(self, lo, hi):
+        a, b = lo % self.capacity, (hi - 1) % self.capacity + 1
+        return [(a, b)] if a < b else [(a, self.capacity), (0, b)]
+
+    def since(self, seq, limit=None):
+        """``(next, entries)`` for records from ``seq`` on; records already evicted are skipped.
+
+        Pass ``next`` back in on the following call. ``first_seq - seq`` (when
+        positive) is the number of records this reader missed.
+        """
+        lo = max(seq, self.first_seq)
+        hi = self.next_seq if limit is None else min(self.next_seq, lo + limit)
+        if lo >= hi:
+            return max(seq, lo), []
+        entries = []
+        for a, b in self._ranges(lo, hi):
+            for t, data, extra in zip(self._t[a:b].tolist(), self._data[a:b], self._extra[a:b]):
+                entry = {'seq': lo, 't': t, 'data': data}
+                if extra:
+                    entry.update(extra)
+                entries.append(entry)
+                lo += 1
+        return hi, entries
+
+    def texts(self, seqs):
+        """Line text of each retained sequence number in ``seqs`` (an int array)."""
+        data = self._data
+        return [data[slot] for slot in (np.asarray(seqs, dtype=np.int64) % self.capacity).tolist()]
+
+    def seqs_between(self, t_from=None, t_to=None):
+        """Sequence numbers of retained records stamped in ``[t_from, t_to]`` (monotonic ns, either open)."""
+        if not self:
+            return np.empty(0, dtype=np.int64)
+        stamps = np.concatenate([self._t[a:b] for a, b in self._ranges(self.first_seq, self.next_seq)])
+        mask = np.ones(len(stamps), dtype=bool)
+        if t_from is not None:
+            mask &= stamps >= t_from
+        if t_to is not None:
+            mask &= stamps <= t_to
+        return np.flatnonzero(mask) + self.first_seq
+
+    def __getitem__(self, seq):
+        if not self.first_seq <= seq < self.next_seq:
+            raise IndexError(seq)
+        return self.since(seq, 1)[1][0]
+
+    def resize(self, capacity):
+        """Change the retention, keeping the newest records and their sequence numbers."""
+        keep = []
+        if self:
+            _, keep = self.since(max(self.first_seq, self.next_seq - int(capacity)))
+        start = self.next_seq - len(keep)
+        self.__init__(capacity)
+        self.first_seq = self.next_seq = start
+        self.extend(keep)
+
+    def clear(self):
+        """Drop every record; sequence numbers keep counting so readers stay in step."""
+        self._data = [None] * self.capacity
+        self._extra = [None] * self.capacity
+        self.first_seq = self.next_seq
@@ -0,0 +1,23 @@
+"""Window icon scaled once and cached as a PNG, which Tk loads without PIL."""
+import os
+
+CACHE_DIR = os.path.join(os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache"),
+                         "cocowatt")
+
+
+def cached_icon(path, size=32, cache_dir=CACHE_DIR):
+    """Path of ``path`` scaled to ``size`` px square; PIL is only imported when the copy is missing or stale."""
+    source_mtime = os.path.getmtime(path)
+    cached = os.path.join(cache_dir, f"{os.path.splitext(os.path.basename(path))[0]}_{size}.png")
+    try:
+        if os.path.getmtime(cached) >= source_mtime:
+            return cached
+    except OSError:
+        pass
+    from PIL import Image
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = cached + ".tmp"
+    with Image.open(path) as image:
+        image.resize((size, size), Image.LANCZOS).save(tmp, "PNG")
+    os.replace(tmp, cached)
+    return cached
@@ -0,0 +1,181 @@
+"""Incremental matplotlib plotting: persistent Line2D artists, lazy rescaling and blitting."""
+import math
+import time
+
+import numpy as np
+
+from .decimate import minmax
+
+MARKER_LIMIT = 500  # Markers are only drawn while a series is short enough for them to be readable
+
+
+class LivePlot:
+    """Keeps one ``Line2D`` per parser pattern on ``ax`` and redraws only those artists.
+
+    ``update`` takes ``{pattern: (times, values)}``. The full figure is redrawn only
+    when the set of patterns changes or the data leaves the current axis limits;
+    every other frame restores the cached background and blits the lines.
+    """
+
+    def __init__(self, ax, canvas, colors, max_fps=20):
+        self.ax = ax
+        self.canvas = canvas
+        self.colors = colors
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.lines = {}
+        self.background = None
+        self.needs_full_draw = True
+        self.last_frame = 0.0
+        self.frames = 0
+        self.skipped = 0
+        self.full_draws = 0
+        self.legend_style = {}
+        self.empty_text = ax.text(0.5, 0.5, "No data to plot", transform=ax.transAxes, ha="center", fontsize=12)
+        self.empty_text.set_visible(False)
+        self._draw_cid = canvas.mpl_connect('draw_event', self._on_draw)
+
+    def reset(self):
+        """Forget the artists, e.g. after something called ``ax.clear()``."""
+        for line in self.lines.values():
+            if line.axes is not None:
+                line.remove()
+        self.lines = {}
+        if self.empty_text.axes is None:
+            self.empty_text = self.ax.text(0.5, 0.5, "No data to plot", transform=self.ax.transAxes,
+                                           ha="center", fontsize=12)
+            self.empty_text.set_visible(False)
+        self.background = None
+        self.needs_full_draw = True
+
+    def restyle(self, fg, legend_style=None):
+        self.empty_text.set_color(fg)
+        if legend_style is not None:
+            self.legend_style = legend_style
+        self.needs_full_draw = True
+
+    def disconnect(self):
+        self.canvas.mpl_disconnect(self._draw_cid)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        for line in self.lines.values():
+            self.ax.draw_artist(line)
+
+    def _sync_lines(self, patterns):
+        if list(self.lines) == list(patterns):
+            return False
+        for pattern in [p for p in self.lines if p not in patterns]:
+            self.lines.pop(pattern).remove()
+        for i, pattern in enumerate(patterns):
+            line = self.lines.get(pattern)
+            if line is None:
+                line, = self.ax.plot([], [], marker='o', markersize=4, linestyle='-', linewidth=2, label=pattern,
+                                     animated=True)
+                self.lines[pattern] = line
+            line.set_color(self.colors[i % len(self.colors)])
+        self.lines = {p: self.lines[p] for p in patterns}
+        if self.lines:
+            self.ax.legend(loc='upper right', fontsize=10, **self.legend_style)
+        elif self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+        return True
+
+    def _rescale(self, series, autoscale):
+        if not autoscale:
+            return False
+        # Times arrive sorted, so only the values need a scan
+        bounds = [(t[0], t[-1], np.min(v), np.max(v)) for t, v in series.values() if len(t)]
+        if not bounds:
+            return False
+        xmin = min(b[0] for b in bounds)
+        xmax = max(b[1] for b in bounds)
+        ymin = min(b[2] for b in bounds)
+        ymax = max(b[3] for b in bounds)
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        if x0 <= xmin and xmax <= x1 and y0 <= ymin and ymax <= y1:
+            return False
+        # Leave headroom so a growing series does not force a full redraw every frame
+        xspan = max(xmax - xmin, 1e-9)
+        yspan = max(ymax - ymin, abs(ymax) * 0.1, 1e-9)
+        self.ax.set_xlim(xmin, xmax + 0.25 * xspan)
+        self.ax.set_ylim(ymin - 0.1 * yspan, ymax + 0.1 * yspan)
+        return True
+
+    def update(self, series, autoscale=True, force=False):
+        """Draw one frame. Returns False when the frame-rate limiter skipped it."""
+        now = time.perf_counter()
+        if not force and now - self.last_frame < self.min_interval:
+            self.skipped += 1
+            return False
+        self.last_frame = now
+        self.frames += 1
+        changed = self._sync_lines([p for p, (t, v) in series.items() if len(t)])
+        self.empty_text.set_visible(not self.lines)
+        for pattern, line in self.lines.items():
+            times, values = series[pattern]
+            line.set_data(times, values)
+            line.set_marker('o' if len(times) <= MARKER_LIMIT else '')
+        rescaled = self._rescale(series, autoscale)
+        if changed or rescaled or self.needs_full_draw or self.background is None:
+            self.needs_full_draw = False
+            self.full_draws += 1
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            for line in self.lines.values():
+                self.ax.draw_artist(line)
+            self.canvas.blit(self.ax.bbox)
+        return True
+
+
+class SpectrumPlot:
+    """A single PSD line on a log-scaled ``ax``, blitted like ``LivePlot``.
+
+    The y limits snap to whole decades, with one spare decade under the noise floor,
+    and only move when the spectrum leaves them or drops two decades below the top,
+    so a steady noise floor redraws just the line.
+    """
+
+    def __init__(self, ax, canvas, color):
+        self.ax = ax
+        self.canvas = canvas
+        self.line, = ax.plot([], [], linewidth=1, color=color, animated=True)
+        self.background = None
+        self.needs_full_draw = True
+        self.frames = 0
+        self.full_draws = 0
+        self._draw_cid = canvas.mpl_connect('draw_event', self._on_draw)
+
+    def _on_draw(self, event):
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
+
+    def disconnect(self):
+        self.canvas.mpl_disconnect(self._draw_cid)
+
+    def update(self, freqs, psd, width=None):
+        if width:
+            freqs, psd = minmax(freqs, psd, int(width))
+        psd = np.maximum(psd, np.finfo(np.float64).tiny)
+        self.line.set_data(freqs, psd)
+        self.frames += 1
+        # Single noise bins dip decades below the floor; the 1st percentile is steady from frame to frame
+        lo, hi = float(np.percentile(psd, 1)), float(psd.max())
+        y0, y1 = self.ax.get_ylim()
+        rescale = lo < y0 or hi > y1 or hi < y1 / 100
+        if rescale:
+            self.ax.set_ylim(10 ** (math.floor(math.log10(lo)) - 1), 10 ** math.ceil(math.log10(hi)))
+        # The sample rate estimate, and with it Nyquist, wobbles a little from window to window
+        x1 = self.ax.get_xlim()[1]
+        if freqs[-1] > x1 or freqs[-1] < 0.9 * x1:
+            self.ax.set_xlim(0, freqs[-1] * 1.02)
+            rescale = True
+        if rescale or self.needs_full_draw or self.background is None:
+            self.needs_full_draw = False
+            self.full_draws += 1
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self.ax.draw_artist(self.line)
+            self.canvas.blit(self.ax.bbox)
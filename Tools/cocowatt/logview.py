@@ -0,0 +1,264 @@
+"""Virtualized terminal view: a compact line store plus a Tk widget that renders only what is visible."""
+import tkinter as tk
+from tkinter import ttk, font as tkfont
+from array import array
+from bisect import bisect_right
+from collections import deque
+
+CHUNK_LINES = 65536
+
+
+class LineStore:
+    """Append-only line storage in UTF-8 chunks with O(1) append, lookup and eviction.
+
+    Lines are addressed by a global number that keeps increasing; when ``max_lines``
+    is exceeded the oldest chunk is dropped and ``first`` moves forward. ``origin`` is
+    the number of the first line since the last ``clear``.
+    """
+
+    def __init__(self, max_lines=1_000_000):
+        self.max_lines = max_lines
+        self.chunks = deque()  # [bytearray, array of end offsets]
+        self.first = 0
+        self.origin = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def end(self):
+        return self.first + self.count
+
+    def append(self, line):
+        if not self.chunks or len(self.chunks[-1][1]) == CHUNK_LINES:
+            self.chunks.append([bytearray(), array('L')])
+        data, ends = self.chunks[-1]
+        data += line.encode('utf-8')
+        ends.append(len(data))
+        self.count += 1
+        if self.max_lines and self.count > self.max_lines + CHUNK_LINES:
+            dropped = len(self.chunks.popleft()[1])
+            self.first += dropped
+            self.count -= dropped
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
+    def __getitem__(self, number):
+        index = number - self.first
+        if not 0 <= index < self.count:
+            raise IndexError(number)
+        data, ends = self.chunks[index // CHUNK_LINES]
+        i = index % CHUNK_LINES
+        start = ends[i - 1] if i else 0
+        return data[start:ends[i]].decode('utf-8')
+
+    def lines(self, start, stop):
+        start = max(start, self.first)
+        stop = min(stop, self.end)
+        return [self[n] for n in range(start, stop)]
+
+    def clear(self):
+        self.first = self.origin = self.end
+        self.chunks.clear()
+        self.count = 0
+
+
+class VirtualLogView(tk.Frame):
+    """Read-only log view that keeps lines in a ``LineStore`` and renders only the visible rows.
+
+    Rendering cost depends on the window height, not on how many lines were received,
+    so appends, scrolling and ``see_line`` stay constant-time on multi-million line logs.
+    Lines of the form ``"<timestamp> <text>"`` get the timestamp and text tags.
+    ``store`` may be any object with ``LineStore``'s reading interface.
+
+    When batches are appended with the engine sequence number of their first line,
+    ``line_for_seq`` maps a sequence number back to a line, across cleared or
+    skipped stretches.
+    """
+
+    def __init__(self, parent, max_lines=1_000_000, margin=5, timestamp_tag="rx_timestamp", data_tag="rx_data",
+                 store=None, **text_options):
+        super().__init__(parent)
+        self.store = LineStore(max_lines) if store is None else store
+        self.margin = margin
+        self.timestamp_tag = timestamp_tag
+        self.data_tag = data_tag
+        self.top = 0
+        self.follow = True
+        self.marked = None
+        # Sequence number / line number pairs where the numbering of appended lines jumped
+        self._seq_starts = []
+        self._seq_lines = []
+        self._render_job = None
+        self._linespace = None
+        # Line numbers [start, end) currently in the Text widget; None forces a full redraw
+        self._shown = None
+        text_options.setdefault("wrap", tk.NONE)
+        self.text = tk.Text(self, **text_options)
+        self.vbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.hbar = ttk.Scrollbar(self, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.text.config(xscrollcommand=self.hbar.set, state="disabled")
+        self.vbar.pack(side=tk.RIGHT, fill="y")
+        self.hbar.pack(side=tk.BOTTOM, fill="x")
+        self.text.pack(side=tk.LEFT, fill="both", expand=True)
+        self.text.bind("<Configure>", lambda e: self.render())
+        self.text.bind("<MouseWheel>", self._on_wheel)
+        self.text.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda e: self.scroll(3))
+        for key, delta in (("<Up>", -1), ("<Down>", 1)):
+            self.text.bind(key, lambda e, d=delta: self.scroll(d))
+        self.text.bind("<Prior>", lambda e: self.scroll(-self.rows))
+        self.text.bind("<Next>", lambda e: self.scroll(self.rows))
+        self.text.bind("<Control-Home>", lambda e: self.see_line(self.store.first))
+        self.text.bind("<Control-End>", lambda e: self.see_end())
+        self.text.tag_config("marked", background="#FFE082")
+
+    # Text widget passthrough, so theme and font code can treat this like a Text
+    def config(self, **options):
+        options.pop("state", None)
+        if "font" in options:
+            self._linespace = None
+            self._shown = None
+        if options:
+            self.text.config(**options)
+
+    configure = config
+
+    def tag_config(self, tag, **options):
+        self.text.tag_config(tag, **options)
+
+    @property
+    def rows(self):
+        if self._linespace is None:
+            self._linespace = tkfont.Font(font=self.text.cget("font")).metrics("linespace") or 1
+        return max(1, self.text.winfo_height() // self._linespace)
+
+    # Content
+    def append(self, lines, first_seq=None):
+        if first_seq is not None and self.line_for_seq(first_seq, retained=False) != self.store.end:
+            self._seq_starts.append(first_seq)
+            self._seq_lines.append(self.store.end)
+        self.store.extend(lines)
+        # Forget numbering jumps that lie wholly before the oldest retained line
+        drop = 0
+        while drop + 1 < len(self._seq_lines) and self._seq_lines[drop + 1] <= self.store.first:
+            drop += 1
+        if drop:
+            del self._seq_starts[:drop], self._seq_lines[:drop]
+        if self.follow:
+            self.top = max(self.store.first, self.store.end - self.rows)
+        self._schedule_render()
+
+    def clear(self):
+        self.store.clear()
+        self._seq_starts.clear()
+        self._seq_lines.clear()
+        self.top = self.store.first
+        self.follow = True
+        self.marked = None
+        self._shown = None
+        self.render()
+
+    def set_store(self, store):
+        self.store = store
+        self.top = store.first
+        self.marked = None
+        self._shown = None
+        self.render()
+
+    def line_for_seq(self, seq, retained=True):
+        """Line number of the line appended for sequence number ``seq``, or None if it is not (or no longer) here."""
+        k = bisect_right(self._seq_starts, seq) - 1
+        if k < 0:
+            return None
+        number = self._seq_lines[k] + seq - self._seq_starts[k]
+        next_line = self._seq_lines[k + 1] if k + 1 < len(self._seq_lines) else None
+        if retained and (not self.store.first <= number < self.store.end or
+                         next_line is not None and number >= next_line):
+            return None
+        return number
+
+    def line_at(self, y):
+        """Line number under pixel row ``y`` of the text widget."""
+        return self.top + int(self.text.index(f"@0,{y}").split(".")[0]) - 1
+
+    def __len__(self):
+        return len(self.store)
+
+    # Navigation
+    def see_line(self, number):
+        self.top = min(max(number, self.store.first), max(self.store.first, self.store.end - self.rows))
+        self.follow = self.top + self.rows >= self.store.end
+        self.render()
+
+    def mark_line(self, number):
+        """Highlight line ``number`` and scroll it to the middle of the view."""
+        self.marked = number
+        self._shown = None
+        self.see_line(number - self.rows // 2)
+
+    def see_end(self):
+        self.follow = True
+        self.see_line(self.store.end)
+
+    def scroll(self, delta):
+        self.see_line(self.top + delta)
+        return "break"
+
+    def _on_wheel(self, event):
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        total = max(len(self.store), 1)
+        if action == "moveto":
+            self.see_line(self.store.first + int(float(amount) * total))
+        elif action == "scroll":
+            step = self.rows if unit == "pages" else 1
+            self.scroll(int(amount) * step)
+
+    # Rendering
+    def _schedule_render(self):
+        if self._render_job is None:
+            self._render_job = self.after_idle(self.render)
+
+    def render(self):
+        """Bring the widget to ``top``; lines still in view stay in place, so a selection survives new data."""
+        self._render_job = None
+        rows = self.rows
+        self.top = max(self.top, self.store.first)
+        top = self.top
+        end = min(top + rows + self.margin, self.store.end)
+        shown = self._shown
+        self.text.config(state="normal")
+        if shown is not None and shown[0] <= top <= shown[1]:
+            if top > shown[0]:
+                self.text.delete("1.0", f"{top - shown[0] + 1}.0")
+            if end < shown[1]:
+                self.text.delete(f"{end - top + 1}.0", "end-1c")
+            elif end > shown[1]:
+                self._insert(self.store.lines(max(shown[1], top), end))
+        else:
+            self.text.delete("1.0", tk.END)
+            self._insert(self.store.lines(top, end))
+            if self.marked is not None and top <= self.marked < end:
+                row = self.marked - top + 1
+                self.text.tag_add("marked", f"{row}.0", f"{row}.end")
+        self.text.config(state="disabled")
+        self._shown = (top, max(top, end))
+        total = max(len(self.store), 1)
+        first = (top - self.store.first) / total
+        self.vbar.set(first, min(1.0, first + rows / total))
+
+    def _insert(self, lines):
+        chunks = []
+        for line in lines:
+            split = line.find(" ")
+            if split > 0:
+                chunks.extend((line[:split + 1], self.timestamp_tag, line[split + 1:] + "\n", self.data_tag))
+            else:
+                chunks.extend((line + "\n", self.data_tag))
+        if chunks:
+            self.text.insert(tk.END, *chunks)
@@ -0,0 +1,329 @@
+"""Pipeline instrumentation: counters, gauges, rates and latency histograms, plus an on-demand profiler.
+
+    engine.metrics.histogram("parse_seconds").observe(dt)
+    engine.metrics.write("metrics.prom")     # Prometheus text format
+    engine.metrics.write("metrics.json")
+
+Updates are plain attribute and list increments without a lock: a rare lost
+update when two threads hit the same metric at once is the price of keeping
+them cheap enough for the per-batch hot path.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from bisect import bisect_left
+
+PROCESS_WIDE = sys.version_info >= (3, 12)  # cProfile on sys.monitoring: one profile per process, all threads
+
+# Histogram bucket upper bounds in seconds: 1 us to ~8 s, doubling
+BUCKETS = tuple(1e-6 * 2 ** k for k in range(24))
+RATE_INTERVAL = 1.0  # Seconds a rate is averaged over before it is updated
+
+
+class Counter:
+    """Monotonic count; ``func`` reads it from an existing attribute instead of ``inc``."""
+
+    kind = "counter"
+
+    def __init__(self, name, help="", func=None):
+        self.name = name
+        self.help = help
+        self.func = func
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+    def sample(self):
+        return self.func() if self.func is not None else self.value
+
+
+class Gauge(Counter):
+    """Value that goes up and down: ``set`` it, or give a ``func`` that reads it."""
+
+    kind = "gauge"
+
+    def set(self, value):
+        self.value = value
+
+
+class Rate(Gauge):
+    """Per-second rate of ``source()``, a growing total, averaged over at least ``interval`` seconds."""
+
+    def __init__(self, name, help, source, interval=RATE_INTERVAL):
+        super().__init__(name, help)
+        self.source = source
+        self.interval = interval
+        self._t = time.perf_counter()
+        self._v = source()
+
+    def sample(self):
+        now = time.perf_counter()
+        if now - self._t >= self.interval:
+            v = self.source()
+            self.value = (v - self._v) / (now - self._t)
+            self._t, self._v = now, v
+        return self.value
+
+
+class Histogram:
+    """Latency distribution in power-of-two buckets; ``observe`` is one bisect and a few adds."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help=""):
+        self.name = name
+        self.help = help
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def time(self):
+        """``with histogram.time(): ...`` observes the block's duration."""
+        return _Timer(self)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile, capped at the maximum seen (0 when empty)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS, self.counts):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def sample(self):
+        return {"count": self.count, "sum": self.sum, "mean": self.sum / self.count if self.count else 0.0,
+                "p50": self.quantile(0.5), "p90": self.quantile(0.9), "p99": self.quantile(0.99), "max": self.max}
+
+
+class _Timer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Metrics:
+    """Named metrics of one process, dumped as a dict, JSON or Prometheus text."""
+
+    def __init__(self, prefix="cocowatt"):
+        self.prefix = prefix
+        self.items = {}
+        self.started = time.time()
+
+    def add(self, metric):
+        self.items[metric.name] = metric
+        return metric
+
+    def _get(self, cls, name, *args, **kwargs):
+        metric = self.items.get(name)
+        if metric is None:
+            metric = self.add(cls(name, *args, **kwargs))
+        return metric
+
+    def counter(self, name, help="", func=None):
+        return self._get(Counter, name, help, func)
+
+    def gauge(self, name, help="", func=None):
+        return self._get(Gauge, name, help, func)
+
+    def rate(self, name, help, source):
+        return self._get(Rate, name, help, source)
+
+    def histogram(self, name, help=""):
+        return self._get(Histogram, name, help)
+
+    def remove(self, *names):
+        for name in names:
+            self.items.pop(name, None)
+
+    def reset_histograms(self):
+        for metric in self.items.values():
+            if metric.kind == "histogram":
+                metric.reset()
+
+    def snapshot(self):
+        """``{name: value}``; histograms give a dict of count, sum, mean, p50/p90/p99 and max."""
+        out = {"uptime_seconds": time.time() - self.started}
+        for name, metric in list(self.items.items()):
+            try:
+                out[name] = metric.sample()
+            except Exception:
+                out[name] = None  # The object the metric reads from has gone away
+        return out
+
+    def to_json(self, indent=1):
+        return json.dumps({"time": time.time(), "metrics": self.snapshot()}, indent=indent)
+
+    def to_prometheus(self):
+        lines = []
+        for name, metric in list(self.items.items()):
+            full = f"{self.prefix}_{name}"
+            if metric.help:
+                lines.append(f"# HELP {full} {metric.help}")
+            lines.append(f"# TYPE {full} {metric.kind}")
+            if metric.kind == "histogram":
+                seen = 0
+                for bound, n in zip(BUCKETS, metric.counts):
+                    seen += n
+                    lines.append(f'{full}_bucket{{le="{bound:.6g}"}} {seen}')
+                lines.append(f'{full}_bucket{{le="+Inf"}} {metric.count}')
+                lines.append(f"{full}_sum {metric.sum!r}")
+                lines.append(f"{full}_count {metric.count}")
+                continue
+            try:
+                value = metric.sample()
+            except Exception:
+                continue
+            lines.append(f"{full} {float(value)!r}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Dump to ``path``, JSON for ``.json`` and Prometheus text otherwise, replacing the file atomically."""
+        text = self.to_json() if path.endswith(".json") else self.to_prometheus()
+        tmp = path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+
+class Profiler:
+    """cProfile of the instrumented threads plus tracemalloc, started and stopped at run time.
+
+    Up to Python 3.11 cProfile only sees the thread that enables it, so each
+    long-running loop (reader, processor, Tk frame) calls ``checkpoint()`` once per
+    iteration; that starts or stops a profile for that thread to follow
+    ``start``/``stop``. A thread that does not reach a checkpoint within the
+    ``stop`` timeout is left out of the report. From 3.12 on, cProfile sits on
+    ``sys.monitoring``, allows one profile per process and sees every thread, so
+    ``start`` enables a single one and ``checkpoint`` does nothing.
+
+    ``checkpoint`` never raises: a profile that cannot be enabled (another
+    profiling tool is active) is recorded in ``error`` and left out of the report.
+    """
+
+    def __init__(self):
+        self.active = False
+        self.started = None
+        self.error = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._profiles = []  # [thread name, Profile, still enabled, run]
+        self._run = 0
+
+    def start(self, frames=1):
+        """Start profiling; raises RuntimeError if cProfile cannot be enabled."""
+        if self.active:
+            return
+        with self._lock:
+            self._profiles = []
+            self._run += 1
+        self.error = None
+        if PROCESS_WIDE:
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError as e:
+                raise RuntimeError(f"cannot profile: {e}") from e
+            self._profiles = [["all threads", profile, True, self._run]]
+        tracemalloc.start(frames)
+        self.started = time.perf_counter()
+        self.active = True
+        self.checkpoint()
+
+    def checkpoint(self):
+        if PROCESS_WIDE:
+            return
+        try:
+            self._checkpoint()
+        except Exception as e:
+            # Never take a capture loop down with the profiler
+            self.error = e
+            self._local.record = None
+
+    def _checkpoint(self):
+        record = getattr(self._local, 'record', None)
+        if record is not None and (not self.active or record[3] != self._run):
+            record[1].disable()
+            record[2] = False
+            record = self._local.record = None
+        if self.active and record is None:
+            record = [threading.current_thread().name, cProfile.Profile(), True, self._run]
+            record[1].enable()
+            self._local.record = record
+            with self._lock:
+                self._profiles.append(record)
+
+    def stop(self, timeout=1.0, top=30):
+        """Stop profiling and return ``(report text, pstats.Stats or None)``."""
+        if not self.active:
+            return "", None
+        self.active = False
+        if PROCESS_WIDE:
+            for record in self._profiles:
+                record[1].disable()
+                record[2] = False
+        self.checkpoint()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        elapsed = time.perf_counter() - self.started
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline and any(r[2] for r in self._profiles):
+            time.sleep(0.01)
+        with self._lock:
+            done = [r for r in self._profiles if not r[2]]
+            missed = [r[0] for r in self._profiles if r[2]]
+        out = io.StringIO()
+        out.write(f"Profiled {elapsed:.1f} s, threads: {', '.join(r[0] for r in done) or 'none'}\n")
+        if missed:
+            out.write(f"Not reached a checkpoint in time: {', '.join(missed)}\n")
+        if self.error is not None:
+            out.write(f"Some threads could not be profiled: {self.error}\n")
+        stats = None
+        if done:
+            stats = pstats.Stats(done[0][1], stream=out)
+            for record in done[1:]:
+                stats.add(record[1])
+            out.write(f"\n=== cProfile, top {top} by cumulative time ===\n")
+            stats.sort_stats("cumulative").print_stats(top)
+        out.write(f"\n=== tracemalloc: {current / 1e6:.1f} MB traced now, {peak / 1e6:.1f} MB peak ===\n")
+        for stat in snapshot.statistics("lineno")[:top]:
+            out.write(f"{stat}\n")
+        return out.getvalue(), stats
+
+    def stop_to(self, prefix, timeout=1.0):
+        """``stop`` and write ``<prefix>.txt`` (report) and ``<prefix>.prof`` (for snakeviz, pstats); returns the report."""
+        report, stats = self.stop(timeout)
+        with open(prefix + ".txt", 'w', encoding='utf-8') as f:
+            f.write(report)
+        if stats is not None:
+            stats.dump_stats(prefix + ".prof")
+        return report
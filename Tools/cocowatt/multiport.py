@@ -0,0 +1,312 @@
+"""Capture from many serial ports in one process: one selector thread and one processor for all devices."""
+import io
+import math
+import os
+import queue
+import selectors
+import socket
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from .engine import DEFAULT_PATTERNS, PARTIAL_LINE_FLUSH, IDLE_WAKEUP, open_serial, frame_entries
+from .framer import LineFramer
+from .history import SeriesRing
+from .parser import PatternParser
+from .binproto import FrameDecoder
+from .clock import now_ns, to_epoch
+
+
+class Device:
+    """Per-port state: connection, framer or frame decoder, parsed history and counters."""
+
+    def __init__(self, name, conn, max_history=2000, max_display=500, max_line_length=4096, protocol="text"):
+        self.name = name
+        self.conn = conn
+        self.port = conn.port
+        self.framer = LineFramer(max_line_length)
+        self.decoder = FrameDecoder() if protocol == "binary" else None
+        self.max_history = max_history
+        self.history = {}
+        self.values = {}
+        self.recent = deque(maxlen=max_display)
+        self.lines_received = 0
+        self.bytes_received = 0
+        self.last_data = time.monotonic()
+        self.error = None
+        # Registered with the selector, or None for a port read by its own blocking thread
+        self.fd = None
+        self.thread = None
+
+    def feed(self, data):
+        """Entries for the complete lines (or frames) in ``data``, tagged with the device name."""
+        t = now_ns()
+        self.bytes_received += len(data)
+        self.last_data = t / 1e9
+        if self.decoder is not None:
+            entries = frame_entries(self.decoder.feed(data), t)
+        else:
+            lines = self.framer.feed(data)
+            if not lines:
+                return []
+            entries = [{'t': t, 'data': line} for line in lines]
+        for entry in entries:
+            entry['device'] = self.name
+        return entries
+
+    def flush_partial(self):
+        line = self.framer.flush()
+        return [{'t': now_ns(), 'data': line, 'device': self.name}] if line else []
+
+    @property
+    def partial_due(self):
+        """Seconds until a pending partial line should be flushed, or None."""
+        if not len(self.framer):
+            return None
+        return self.last_data + PARTIAL_LINE_FLUSH - time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.error is None and self.conn.is_open
+
+    def close(self):
+        if self.conn.is_open:
+            self.conn.close()
+
+
+class MultiCapture:
+    """Many ``Device`` readers sharing one selector thread, one bounded queue and one processor.
+
+    CPU cost follows the total line rate: an idle port costs nothing, and there is a
+    single wakeup per burst of readable ports instead of a reader plus processor
+    thread per port. Listeners get ``(entries, parsed)`` like ``CaptureEngine``
+    listeners; every entry carries a ``'device'`` key. Ports without a selectable
+    handle (Windows) fall back to one blocking reader thread each.
+    """
+
+    def __init__(self, patterns=None, max_history=2000, max_display=500, max_line_length=4096, max_queue=1000,
+                 protocol="text"):
+        self.devices = {}
+        self.lock = threading.Lock()
+        self.data_queue = queue.Queue(maxsize=max_queue)
+        self.listeners = []
+        # A failing listener keeps being called; its first traceback goes to stderr
+        self.listener_errors = 0
+        self._failed_listeners = []
+        self.max_history = max_history
+        self.max_display = max_display
+        self.max_line_length = max_line_length
+        self.protocol = protocol
+        self.dropped_lines = 0
+        self.lines_received = 0
+        self.wakeups = 0
+        self.running = True
+        self.selector = selectors.DefaultSelector()
+        # Socket pair so add/remove can interrupt a blocking select; on Windows select only takes sockets
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self.selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self.set_patterns(patterns or DEFAULT_PATTERNS)
+        self.selector_thread = threading.Thread(target=self._run_selector, name="multiport-select", daemon=True)
+        self.selector_thread.start()
+        self.processor_thread = threading.Thread(target=self._run_processor, name="multiport-process", daemon=True)
+        self.processor_thread.start()
+
+    # Configuration
+    def set_patterns(self, patterns):
+        patterns = list(dict.fromkeys(p for p in patterns if p)) or list(DEFAULT_PATTERNS)
+        parser = PatternParser(patterns)
+        with self.lock:
+            self.patterns = patterns
+            self.parser = parser
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    # Devices
+    def add(self, port, baudrate=115200, bytesize="8", parity="None", stopbits="1", name=None):
+        name = name or os.path.basename(port)
+        if name in self.devices:
+            raise ValueError(f"device {name} is already open")
+        conn = open_serial(port, baudrate, bytesize, parity, stopbits)
+        device = Device(name, conn, self.max_history, self.max_display, self.max_line_length, self.protocol)
+        with self.lock:
+            self.devices[name] = device
+        try:
+            fd = conn.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            fd = None  # No selectable handle (Windows)
+        if fd is not None:
+            self.selector.register(fd, selectors.EVENT_READ, device)
+            device.fd = fd
+            self._wake()
+        else:
+            device.thread = threading.Thread(target=self._run_blocking, args=(device,), daemon=True)
+            device.thread.start()
+        return device
+
+    def remove(self, name):
+        with self.lock:
+            device = self.devices.pop(name, None)
+        if device is None:
+            return
+        self._unregister(device)
+        device.close()
+
+    def _unregister(self, device):
+        fd, device.fd = device.fd, None
+        if fd is None:
+            return
+        try:
+            self.selector.unregister(fd)
+        except (KeyError, ValueError):
+            return  # Never registered, or the selector is already closed
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b'\0')
+        except BlockingIOError:
+            pass  # Already full of wakeups the selector has not read yet
+
+    def write(self, name, text):
+        conn = self.devices[name].conn
+        conn.write((text + '\r\n').encode('iso-8859-1'))
+        conn.flush()
+
+    def close(self):
+        self.running = False
+        for name in list(self.devices):
+            self.remove(name)
+        self._wake()
+        self.selector_thread.join(1.0)
+        self.selector.close()
+        self._wake_r.close()
+        self._wake_w.close()
+
+    @property
+    def queue_depth(self):
+        return self.data_queue.qsize()
+
+    # Reading
+    def put_batch(self, entries):
+        try:
+            self.data_queue.put_nowait(entries)
+        except queue.Full:
+            self.dropped_lines += len(entries)
+
+    def _device_error(self, device, error):
+        device.error = str(error)
+        self._unregister(device)
+        self.put_batch([{'t': now_ns(), 'data': f"[ERROR] {error}", 'device': device.name}])
+
+    def _run_selector(self):
+        while self.running:
+            timeout = IDLE_WAKEUP
+            for device in list(self.devices.values()):
+                due = device.partial_due
+                if due is not None:
+                    timeout = min(timeout, max(0.0, due))
+            events = self.selector.select(timeout)
+            self.wakeups += 1
+            for key, _ in events:
+                device = key.data
+                if device is None:
+                    try:
+                        self._wake_r.recv(4096)
+                    except BlockingIOError:
+                        pass
+                    continue
+                conn = device.conn
+                try:
+                    # On a ready fd with nothing waiting, read(1) makes pyserial report the hang-up
+                    data = conn.read(conn.in_waiting or 1)
+                except Exception as e:
+                    if self.running and device.name in self.devices:
+                        self._device_error(device, e)
+                    continue
+                if data:
+                    entries = device.feed(data)
+                    if entries:
+                        self.put_batch(entries)
+            for device in list(self.devices.values()):
+                due = device.partial_due
+                if due is not None and due <= 0:
+                    self.put_batch(device.flush_partial())
+
+    def _run_blocking(self, device):
+        conn = device.conn
+        while self.running and device.name in self.devices and device.error is None:
+            due = device.partial_due
+            conn.timeout = IDLE_WAKEUP if due is None else max(0.0, due)
+            try:
+                data = conn.read(max(1, conn.in_waiting))
+                if data and conn.in_waiting:
+                    data += conn.read(conn.in_waiting)
+            except Exception as e:
+                if self.running:
+                    self._device_error(device, e)
+                return
+            self.wakeups += 1
+            if data:
+                entries = device.feed(data)
+                if entries:
+                    self.put_batch(entries)
+            elif device.partial_due is not None and device.partial_due <= 0:
+                self.put_batch(device.flush_partial())
+
+    # Processing
+    def _run_processor(self):
+        while self.running or not self.data_queue.empty():
+            try:
+                entries = self.data_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            self.handle_batch(entries)
+
+    def handle_batch(self, entries):
+        with self.lock:
+            parser = self.parser
+            parsed = []
+            for entry in entries:
+                device = self.devices.get(entry['device'])
+                values = entry.get('values')
+                if values is None:
+                    values = parser.parse(entry['data'])
+                parsed.append(values)
+                if device is None:
+                    continue
+                device.lines_received += 1
+                device.recent.append(entry)
+                for pattern, value in values.items():
+                    device.values[pattern] = value
+                    if not math.isnan(value):
+                        ring = device.history.get(pattern)
+                        if ring is None:
+                            ring = device.history[pattern] = SeriesRing(device.max_history)
+                        ring.append(to_epoch(entry['t']), value)
+            self.lines_received += len(entries)
+        for listener in list(self.listeners):
+            try:
+                listener(entries, parsed)
+            except Exception:
+                self.listener_errors += 1
+                if listener not in self._failed_listeners:
+                    self._failed_listeners.append(listener)
+                    print(f"listener {listener!r} failed:", file=sys.stderr)
+                    traceback.print_exc()
+        return parsed
+
+    def snapshot(self):
+        """Per-device counters and latest values, for dashboards and the CLI summary."""
+        with self.lock:
+            return {name: {"port": d.port, "lines": d.lines_received, "bytes": d.bytes_received,
+                           "values": dict(d.values), "error": d.error}
+                    for name, d in self.devices.items()}
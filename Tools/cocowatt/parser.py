@@ -0,0 +1,78 @@
+"""Compiled multi-pattern value extraction for parser patterns such as "ADC Volt:"."""
+import re
+from functools import lru_cache
+
+import numpy as np
+
+# Signed decimal with optional exponent; must not run straight into more digits or a dot and
+# digit, so "2.749.1" is rejected instead of being half-parsed while "2.5." still ends a sentence
+NUMBER = r'[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?(?!\.?\d)'
+
+
+class PatternParser:
+    """All configured prefixes compiled into one alternation, extracted in a single scan.
+
+    A value must follow its prefix directly, separated only by spaces, tabs, ``:`` or
+    ``=``. When a prefix occurs several times in a line the first valid value wins.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(dict.fromkeys(p for p in patterns if p))
+        self._index = {p: i for i, p in enumerate(self.patterns)}
+        # Longest first, so "ADC Volt2:" is not shadowed by a shorter "ADC Volt"
+        prefixes = sorted(self.patterns, key=len, reverse=True)
+        if prefixes:
+            alternation = '|'.join(re.escape(p) for p in prefixes)
+            self.regex = re.compile(rf'({alternation})[ \t:=]*({NUMBER})')
+        else:
+            self.regex = None
+
+    def parse(self, line):
+        """``{pattern: float}`` for every pattern with a valid value in ``line``."""
+        results = {}
+        if self.regex is None:
+            return results
+        for match in self.regex.finditer(line):
+            pattern = match.group(1)
+            if pattern not in results:
+                results[pattern] = float(match.group(2))
+        return results
+
+    def parse_many(self, lines):
+        """Parse a batch of lines in one regex pass over the joined text.
+
+        Returns ``{pattern: (line_indices, values)}`` as NumPy arrays, one entry per
+        line that carries the pattern.
+        """
+        out = {p: (np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)) for p in self.patterns}
+        if self.regex is None or not lines:
+            return out
+        text = '\n'.join(lines)
+        # Offset of the first character of every line, to map match positions back to lines
+        starts = np.zeros(len(lines), dtype=np.int64)
+        np.cumsum([len(line) + 1 for line in lines[:-1]], out=starts[1:])
+        positions, codes, numbers = [], [], []
+        index = self._index
+        for match in self.regex.finditer(text):
+            positions.append(match.start())
+            codes.append(index[match.group(1)])
+            numbers.append(match.group(2))
+        if not positions:
+            return out
+        line_of = np.searchsorted(starts, np.asarray(positions, dtype=np.int64), side='right') - 1
+        codes = np.asarray(codes, dtype=np.intp)
+        values = np.asarray(numbers, dtype=np.float64)
+        for i, pattern in enumerate(self.patterns):
+            mask = codes == i
+            rows, first = np.unique(line_of[mask], return_index=True)
+            out[pattern] = (rows, values[mask][first])
+        return out
+
+
+@lru_cache(maxsize=32)
+def compiled(patterns):
+    return PatternParser(patterns)
+
+
+def parse_line_for_patterns(line, patterns):
+    return compiled(tuple(patterns)).parse(line)
@@ -0,0 +1,126 @@
+"""Replay a recorded session (CSV log or ``.cwcap``) into the live ingestion path.
+
+    engine.open_replay("session_log_001.csv", speed=10)
+
+Lines are turned back into the bytes the board sent and handed to
+``CaptureEngine.feed`` exactly like serial reads, so the framer, parser, history,
+listeners and the GUI frame loop all see real traffic without hardware.
+"""
+import threading
+import time
+
+import numpy as np
+
+from .capfile import CaptureReader, EXTENSION
+from .clock import now_ns
+from .csvimport import iter_csv_chunks
+
+TERMINATOR = "\n\r"  # What the firmware's printf lines end with
+MAX_SPEED_LINES = 256  # Lines per feed when replaying as fast as possible
+MAX_SLEEP = 0.05  # Longest sleep between checks for stop()
+
+
+def iter_recording(path, chunk_rows=65536):
+    """``(times, lines)`` chunks of a CSV log or ``.cwcap`` file, times in epoch seconds."""
+    if path.endswith(EXTENSION):
+        with CaptureReader(path) as reader:
+            for i in range(len(reader.blocks)):
+                times, _, lines = reader.read_block(i, lines=True)
+                yield times, lines
+        return
+    for times, lines, _ in iter_csv_chunks(path, None, chunk_rows):
+        yield times, lines
+
+
+class Replay(threading.Thread):
+    """Streams a recording into ``sink(data, t_ns)`` on a daemon thread.
+
+    With ``speed`` > 0 the original spacing is kept, divided by ``speed``; every line
+    already due when the thread wakes goes out in one chunk, as a serial read would
+    deliver it. ``speed`` of 0 (or None) replays as fast as possible; ``throttle``, if
+    given, is called between chunks and may block to apply backpressure instead of
+    letting a bounded queue drop lines.
+    """
+
+    def __init__(self, path, sink, speed=1.0, loop=False, throttle=None, on_done=None, encoding='iso-8859-1'):
+        super().__init__(name="replay", daemon=True)
+        self.path = path
+        self.sink = sink
+        self.speed = speed or 0.0
+        self.loop = loop
+        self.throttle = throttle
+        self.on_done = on_done
+        self.encoding = encoding
+        self.lines = 0
+        self.bytes = 0
+        self.passes = 0
+        self.started = None
+        self.finished = None
+        self.error = None
+        self._halt = threading.Event()
+
+    def stop(self):
+        self._halt.set()
+
+    @property
+    def done(self):
+        return self.finished is not None
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    def _emit(self, lines):
+        data = (TERMINATOR.join(lines) + TERMINATOR).encode(self.encoding, 'replace')
+        self.sink(data, now_ns())
+        self.lines += len(lines)
+        self.bytes += len(data)
+
+    def _play(self, start):
+        t0 = None
+        for times, lines in iter_recording(self.path):
+            if self._halt.is_set():
+                return
+            if not self.speed:
+                for i in range(0, len(lines), MAX_SPEED_LINES):
+                    if self._halt.is_set():
+                        return
+                    if self.throttle is not None:
+                        self.throttle()
+                    self._emit(lines[i:i + MAX_SPEED_LINES])
+                continue
+            if t0 is None:
+                t0 = times[0]
+            due = (np.asarray(times) - t0) / self.speed
+            i, n = 0, len(lines)
+            while i < n:
+                if self._halt.is_set():
+                    return
+                now = time.perf_counter() - start
+                j = int(np.searchsorted(due, now, side='right'))
+                if j <= i:
+                    time.sleep(min(due[i] - now, MAX_SLEEP))
+                    continue
+                self._emit(lines[i:j])
+                i = j
+
+    def run(self):
+        self.started = time.perf_counter()
+        try:
+            while not self._halt.is_set():
+                self._play(time.perf_counter())
+                self.passes += 1
+                if not self.loop:
+                    break
+        except Exception as e:
+            self.error = e
+        self.finished = time.perf_counter()
+        if self.on_done is not None:
+            self.on_done(self)
+
+    def stats(self):
+        elapsed = max(self.elapsed, 1e-9)
+        return {"lines": self.lines, "bytes": self.bytes, "seconds": self.elapsed, "passes": self.passes,
+                "lines_per_s": self.lines / elapsed, "mb_per_s": self.bytes / elapsed / 1e6}
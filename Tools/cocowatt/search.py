@@ -0,0 +1,239 @@
+"""Incremental search index over the received-line ring: substrings, parsed value ranges and time ranges.
+
+    seqs, complete = engine.search("[ERROR]")
+    seqs, complete = engine.search(pattern="ADC Volt:", lo=3.2, t_from=from_epoch(start))
+
+Text is indexed by lowercase trigram per block of ``BLOCK`` consecutive lines, so a
+posting list holds one entry per block a trigram occurs in rather than one per
+line. Repetitive firmware output shares most trigrams between lines, which keeps
+the index to a few bytes per line; a query intersects the posting lists of its
+trigrams and only the lines of the surviving blocks are checked for the actual
+substring. Parsed values are kept per pattern as a ``SeriesRing`` of
+``(seq, value)`` and time ranges come straight from the ring's stamps, both
+filtered with vectorized comparisons.
+"""
+from array import array
+
+import numpy as np
+
+from .clock import format_ns
+from .history import SeriesRing
+
+BLOCK_BITS = 7
+BLOCK = 1 << BLOCK_BITS  # Lines per index block
+TRIGRAM_CACHE = 65536  # Distinct lines whose trigram sets are remembered (ADC output repeats a lot)
+VERIFY_CHUNK = 65536  # Candidate lines fetched per engine lock hold while checking substrings
+
+
+def trigrams(text):
+    low = text.lower()
+    return frozenset(low[i:i + 3] for i in range(len(low) - 2))
+
+
+class LineIndex:
+    """Search index for an ``EntryRing``, fed with ``add(seq, text, parsed)`` as lines are appended.
+
+    ``add`` only queues the line; the block is indexed in one go when the next
+    one starts (or a query calls ``flush``). Records the ring evicts are dropped
+    from the results by sequence number and from the posting lists in a sweep
+    every ``capacity`` lines, so memory follows the ring's retention.
+    """
+
+    def __init__(self, capacity=100_000):
+        self.capacity = max(1, int(capacity))
+        self.postings = {}  # trigram -> array('i') of block numbers, ascending
+        self.values = {}  # pattern -> SeriesRing of (seq, value)
+        self.block = None
+        self.swept = 0
+        self._texts = []  # Lines of the current block not indexed yet
+        self._parsed = []  # (seq, {pattern: value}) of the same lines
+        self._posted = set()  # Trigrams already posted for the current block by an early flush
+        self._cache = {}
+
+    @property
+    def nbytes(self):
+        return (sum(a.itemsize * len(a) for a in self.postings.values())
+                + sum(ring.nbytes for ring in self.values.values()))
+
+    def add(self, seq, text, parsed=None):
+        if seq >> BLOCK_BITS != self.block:
+            self.flush()
+            self.block = seq >> BLOCK_BITS
+            self._posted = set()
+            if seq - self.swept >= self.capacity:
+                self._sweep(seq - self.capacity)
+                self.swept = seq
+        self._texts.append(text)
+        if parsed:
+            self._parsed.append((seq, parsed))
+
+    def flush(self):
+        """Index the queued lines of the current block."""
+        if not self._texts:
+            return
+        cache = self._cache
+        if len(cache) >= TRIGRAM_CACHE:
+            cache.clear()
+        sets = []
+        for text in set(self._texts):
+            grams = cache.get(text)
+            if grams is None:
+                grams = cache[text] = trigrams(text)
+            sets.append(grams)
+        postings, block = self.postings, self.block
+        grams = frozenset().union(*sets) - self._posted
+        self._posted |= grams
+        for gram in grams - postings.keys():
+            postings[gram] = array('i')
+        for blocks in map(postings.__getitem__, grams):
+            blocks.append(block)
+        self._texts = []
+        columns = {}
+        for seq, parsed in self._parsed:
+            for pattern, value in parsed.items():
+                column = columns.get(pattern)
+                if column is None:
+                    column = columns[pattern] = ([], [])
+                column[0].append(seq)
+                column[1].append(value)
+        for pattern, (seqs, values) in columns.items():
+            ring = self.values.get(pattern)
+            if ring is None:
+                ring = self.values[pattern] = SeriesRing(self.capacity)
+            ring.extend(seqs, values)
+        self._parsed = []
+
+    def _sweep(self, first_seq):
+        first_block = first_seq >> BLOCK_BITS
+        for gram in list(self.postings):
+            blocks = self.postings[gram]
+            if blocks[-1] < first_block:
+                del self.postings[gram]
+            elif blocks[0] < first_block:
+                del blocks[:int(np.searchsorted(np.array(blocks, dtype=np.int64), first_block))]
+
+    def clear(self):
+        self.postings = {}
+        self.values = {}
+        self.block = None
+        self._texts = []
+        self._parsed = []
+        self._posted = set()
+        self._cache = {}
+
+    def text_candidates(self, text, first_seq, next_seq):
+        """Lines that may contain ``text`` (case-insensitive), or None when it is too short to narrow down."""
+        grams = trigrams(text)
+        if not grams:
+            return None
+        self.flush()
+        blocks = None
+        # Rarest trigram first, so the intersection shrinks as early as possible
+        for gram in sorted(grams, key=lambda g: len(self.postings.get(g, ()))):
+            found = np.array(self.postings.get(gram, ()), dtype=np.int64)
+            blocks = found if blocks is None else np.intersect1d(blocks, found, assume_unique=True)
+            if not len(blocks):
+                break
+        seqs = (blocks[:, None] * BLOCK + np.arange(BLOCK)).ravel()
+        return seqs[(seqs >= first_seq) & (seqs < next_seq)]
+
+    def value_matches(self, pattern, first_seq, lo=None, hi=None):
+        """Lines whose parsed ``pattern`` value lies in ``[lo, hi]`` (either bound open)."""
+        self.flush()
+        ring = self.values.get(pattern)
+        if ring is None:
+            return np.empty(0, dtype=np.int64)
+        seqs, values = ring.times, ring.values
+        mask = seqs >= first_seq
+        if lo is not None:
+            mask &= values >= lo
+        if hi is not None:
+            mask &= values <= hi
+        return seqs[mask].astype(np.int64)
+
+
+def search(engine, text=None, pattern=None, lo=None, hi=None, t_from=None, t_to=None, limit=None):
+    """``(seqs, complete)``: retained lines matching every condition given, oldest first.
+
+    ``text`` is a case-insensitive substring, ``pattern`` with ``lo``/``hi`` a
+    parsed value range, ``t_from``/``t_to`` monotonic ns. With ``limit`` only the
+    newest ``limit`` matches are collected and ``complete`` says whether that was
+    all of them.
+    """
+    with engine.lock:
+        ring, index = engine.display_data, engine.search_index
+        first, end = ring.first_seq, ring.next_seq
+        candidates = None
+        if text:
+            candidates = index.text_candidates(text, first, end)
+        for seqs in ((index.value_matches(pattern, first, lo, hi) if pattern else None),
+                     (ring.seqs_between(t_from, t_to) if t_from is not None or t_to is not None else None)):
+            if seqs is not None:
+                candidates = seqs if candidates is None else np.intersect1d(candidates, seqs, assume_unique=True)
+    if candidates is None:
+        candidates = np.arange(first, end, dtype=np.int64)
+    if not text:
+        # No substring to check: value and time matches are exact
+        if limit is not None and len(candidates) > limit:
+            return candidates[-limit:], False
+        return candidates, True
+    needle = text.lower()
+    found = []
+    count = 0
+    stop = len(candidates)
+    # Newest first, so a limit keeps the most recent matches
+    while stop > 0 and (limit is None or count < limit):
+        chunk = candidates[max(0, stop - VERIFY_CHUNK):stop]
+        stop -= len(chunk)
+        with engine.lock:
+            ring = engine.display_data
+            chunk = chunk[chunk >= ring.first_seq]
+            lines = ring.texts(chunk)
+        hits = np.fromiter((needle in line.lower() for line in lines), dtype=bool, count=len(lines))
+        hits = chunk[hits]
+        found.append(hits)
+        count += len(hits)
+    seqs = np.concatenate(found[::-1]) if found else np.empty(0, dtype=np.int64)
+    complete = stop <= 0 and (limit is None or count <= limit)
+    if limit is not None and len(seqs) > limit:
+        seqs = seqs[-limit:]
+    return seqs, complete
+
+
+class MatchList:
+    """Read-only stand-in for a ``LineStore`` over search results, for ``VirtualLogView``.
+
+    Only the rows on screen are fetched from the ring and formatted; results
+    evicted since the search show as such.
+    """
+
+    def __init__(self, engine, seqs=None):
+        self.engine = engine
+        self.seqs = np.empty(0, dtype=np.int64) if seqs is None else seqs
+        self.first = self.origin = 0
+
+    def __len__(self):
+        return len(self.seqs)
+
+    @property
+    def end(self):
+        return len(self.seqs)
+
+    def lines(self, start, stop):
+        start, stop = max(start, 0), min(stop, len(self.seqs))
+        out = []
+        with self.engine.lock:
+            ring = self.engine.display_data
+            for seq in self.seqs[start:stop].tolist():
+                if seq < ring.first_seq:
+                    out.append(f"#{seq} (no longer retained)")
+                else:
+                    entry = ring[seq]
+                    out.append(f"{format_ns(entry['t'])} #{seq} {entry['data']}")
+        return out
+
+    def extend(self, lines):
+        pass
+
+    def clear(self):
+        self.seqs = self.seqs[:0]
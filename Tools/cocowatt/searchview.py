@@ -0,0 +1,122 @@
+"""Tk search window over the received lines: query fields, a filtered result view and jump-to-match."""
+import time
+import tkinter as tk
+from datetime import datetime, date, time as dtime
+from tkinter import ttk, messagebox
+
+from .clock import from_epoch
+from .logview import VirtualLogView
+from .search import MatchList
+
+RESULT_LIMIT = 1_000_000  # Newest matches kept; a broader query says it was cut
+
+
+def parse_clock(text):
+    """``HH:MM[:SS[.fff]]`` today, as monotonic ns; None for an empty field."""
+    text = text.strip()
+    if not text:
+        return None
+    return from_epoch(datetime.combine(date.today(), dtime.fromisoformat(text)).timestamp())
+
+
+def parse_number(text):
+    text = text.strip()
+    return float(text) if text else None
+
+
+class SearchWindow(tk.Toplevel):
+    """Queries ``engine.search`` and lists the matches; ``on_jump(seq)`` is called to show one in the terminal."""
+
+    def __init__(self, parent, engine, on_jump, font=("Consolas", 10)):
+        super().__init__(parent)
+        self.title("COCOWATT Search")
+        self.geometry("900x500")
+        self.engine = engine
+        self.on_jump = on_jump
+        self.current = None
+
+        bar = ttk.Frame(self)
+        bar.pack(fill="x", padx=10, pady=(10, 5))
+        ttk.Label(bar, text="Text:").pack(side=tk.LEFT)
+        self.text_var = tk.StringVar()
+        text_entry = ttk.Entry(bar, textvariable=self.text_var, width=24)
+        text_entry.pack(side=tk.LEFT, padx=5)
+        ttk.Label(bar, text="Value:").pack(side=tk.LEFT, padx=(10, 0))
+        self.pattern_var = tk.StringVar()
+        self.pattern_combo = ttk.Combobox(bar, textvariable=self.pattern_var, width=14)
+        self.pattern_combo.pack(side=tk.LEFT, padx=5)
+        self.lo_var = tk.StringVar()
+        self.hi_var = tk.StringVar()
+        ttk.Entry(bar, textvariable=self.lo_var, width=8).pack(side=tk.LEFT)
+        ttk.Label(bar, text="to").pack(side=tk.LEFT, padx=3)
+        ttk.Entry(bar, textvariable=self.hi_var, width=8).pack(side=tk.LEFT)
+
+        bar2 = ttk.Frame(self)
+        bar2.pack(fill="x", padx=10, pady=(0, 5))
+        ttk.Label(bar2, text="Time:").pack(side=tk.LEFT)
+        self.from_var = tk.StringVar()
+        self.to_var = tk.StringVar()
+        ttk.Entry(bar2, textvariable=self.from_var, width=12).pack(side=tk.LEFT, padx=5)
+        ttk.Label(bar2, text="to").pack(side=tk.LEFT)
+        ttk.Entry(bar2, textvariable=self.to_var, width=12).pack(side=tk.LEFT, padx=5)
+        ttk.Label(bar2, text="(HH:MM:SS.fff)").pack(side=tk.LEFT)
+        ttk.Button(bar2, text="🔍 Search", command=self.run_search).pack(side=tk.LEFT, padx=(15, 5))
+        ttk.Button(bar2, text="◀", width=3, command=lambda: self.step(-1)).pack(side=tk.LEFT)
+        ttk.Button(bar2, text="▶", width=3, command=lambda: self.step(1)).pack(side=tk.LEFT, padx=(2, 0))
+        self.status = ttk.Label(bar2, text="")
+        self.status.pack(side=tk.RIGHT)
+
+        self.results = VirtualLogView(self, store=MatchList(engine), font=font)
+        self.results.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.results.tag_config("rx_timestamp", foreground="#2196F3")
+        self.results.text.bind("<Double-Button-1>", self.on_double_click)
+        self.bind("<Return>", lambda e: self.run_search())
+        self.bind("<F3>", lambda e: self.step(1))
+        self.bind("<Shift-F3>", lambda e: self.step(-1))
+        self.refresh_patterns()
+        text_entry.focus_set()
+
+    def refresh_patterns(self):
+        with self.engine.lock:
+            patterns = list(dict.fromkeys(self.engine.patterns + list(self.engine.search_index.values)))
+        self.pattern_combo['values'] = [""] + patterns
+
+    def run_search(self):
+        try:
+            lo, hi = parse_number(self.lo_var.get()), parse_number(self.hi_var.get())
+            t_from, t_to = parse_clock(self.from_var.get()), parse_clock(self.to_var.get())
+        except ValueError as e:
+            messagebox.showerror("Search", f"Invalid value or time: {e}", parent=self)
+            return
+        pattern = self.pattern_var.get() or None
+        if pattern is None and (lo is not None or hi is not None):
+            messagebox.showerror("Search", "Choose the parser pattern the value range applies to", parent=self)
+            return
+        start = time.perf_counter()
+        seqs, complete = self.engine.search(self.text_var.get(), pattern, lo, hi, t_from, t_to, RESULT_LIMIT)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.results.set_store(MatchList(self.engine, seqs))
+        self.current = None
+        more = "" if complete else f" (newest {len(seqs):,} shown)"
+        self.status.config(text=f"{len(seqs):,} matches{more} in {elapsed:.0f} ms")
+        self.refresh_patterns()
+        if len(seqs):
+            self.show(len(seqs) - 1)
+
+    def show(self, index):
+        self.current = index
+        self.results.mark_line(index)
+        self.on_jump(int(self.results.store.seqs[index]))
+
+    def step(self, delta):
+        count = len(self.results.store)
+        if not count:
+            return
+        index = count - 1 if self.current is None else (self.current + delta) % count
+        self.show(index)
+
+    def on_double_click(self, event):
+        index = self.results.line_at(event.y)
+        if 0 <= index < len(self.results.store):
+            self.show(index)
+        return "break"
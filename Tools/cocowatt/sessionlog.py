@@ -0,0 +1,232 @@
+"""Session logging on a writer thread: bounded batching, file rotation and periodic fsync."""
+import codecs
+import csv
+import io
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from .clock import format_ns
+from .metrics import Histogram
+
+ROTATE_BYTES = 256 * 1024 * 1024
+ROTATE_SECONDS = 3600
+FSYNC_INTERVAL = 1.0
+MAX_PENDING = 200_000  # Rows buffered for the writer before new ones are dropped and counted
+WRITE_SLICE = 2000
+WRITE_CHUNK = 50_000  # Rows per writer cycle, so rotation, fsync and latency are checked during a backlog
+
+
+class SessionLogger:
+    """Engine listener that writes ``Timestamp,Data[,Direction]`` CSV parts off the capture path.
+
+    ``__call__`` and ``write`` only append rows, still holding integer ``monotonic_ns``
+    stamps, to an in-memory batch; a writer thread formats and writes them, rotates
+    to ``<prefix>_NNN.csv`` when a part reaches ``rotate_bytes`` (UTF-8 bytes) or
+    ``rotate_seconds``, and flushes plus fsyncs every ``fsync_interval`` seconds, so
+    a crash loses at most that much data. Each closed part gets a
+    ``<part>.index.json`` with its row count and timestamp range.
+
+    I/O errors never stop the writer: they are counted in ``errors`` (the latest in
+    ``last_error``), the rows of the failed write are counted as dropped, and a part
+    that could not be opened is retried every ``fsync_interval``.
+    """
+
+    def __init__(self, prefix, with_direction=False, rotate_bytes=ROTATE_BYTES, rotate_seconds=ROTATE_SECONDS,
+                 fsync_interval=FSYNC_INTERVAL, max_pending=MAX_PENDING):
+        self.prefix = prefix
+        self.with_direction = with_direction
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.fsync_interval = fsync_interval
+        self.max_pending = max_pending
+        self.cond = threading.Condition()
+        self.pending = []
+        # (rows pending after an enqueue, perf_counter of it), to age the oldest row of each written chunk
+        self.marks = []
+        self._closed = False
+        self.file = None
+        self.part = 0
+        self.files = []
+        self.dropped_rows = 0
+        self.rows_written = 0
+        self.bytes_written = 0
+        self.fsyncs = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.max_fsync = 0.0
+        self.errors = 0
+        self.last_error = None
+        self.latency = Histogram("log_write_latency_seconds", "Session log: first row queued to batch written")
+        self.fsync_time = Histogram("log_fsync_seconds", "Session log: flush + fsync")
+        self.started = time.time()
+        self._open_part()  # A bad prefix fails here, in the caller
+        self.thread = threading.Thread(target=self._run, name="session-log", daemon=True)
+        self.thread.start()
+
+    # Producer side: called from the engine processor thread and the Tk thread
+    def __call__(self, entries, parsed):
+        if self.with_direction:
+            rows = [(e['t'], e['data'], 'Received') for e in entries]
+        else:
+            rows = [(e['t'], e['data']) for e in entries]
+        self._enqueue(rows)
+
+    def write(self, t, data, direction):
+        self._enqueue([(t, data, direction) if self.with_direction else (t, data)])
+
+    def _enqueue(self, rows):
+        with self.cond:
+            if self._closed:
+                return
+            room = self.max_pending - len(self.pending)
+            if room < len(rows):
+                self.dropped_rows += len(rows) - max(room, 0)
+                rows = rows[:max(room, 0)]
+            if rows:
+                self.pending.extend(rows)
+                self.marks.append((len(self.pending), time.perf_counter()))
+                self.cond.notify()
+
+    # Writer thread
+    def _open_part(self):
+        filename = f"{self.prefix}_{self.part + 1:03d}.csv"
+        # Binary, so the part size is counted in bytes whatever the text
+        self.file = open(filename, 'wb')
+        self.part += 1
+        self.filename = filename
+        header = io.StringIO()
+        csv.writer(header).writerow(['Timestamp', 'Data', 'Direction'] if self.with_direction else ['Timestamp', 'Data'])
+        self.file.write(codecs.BOM_UTF8 + header.getvalue().encode('utf-8'))
+        self.part_opened = time.time()
+        self.part_rows = 0
+        self.part_first = None
+        self.part_last = None
+        self.files.append(self.filename)
+
+    def _close_part(self):
+        file, self.file = self.file, None
+        try:
+            self._sync(file)
+            size = file.tell()
+        finally:
+            file.close()
+        index = {"file": os.path.basename(self.filename), "part": self.part, "rows": self.part_rows,
+                 "bytes": size, "first_timestamp": self.part_first, "last_timestamp": self.part_last,
+                 "opened": datetime.fromtimestamp(self.part_opened).isoformat(timespec="seconds"),
+                 "closed": datetime.now().isoformat(timespec="seconds")}
+        with open(self.filename + ".index.json", 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+
+    def _sync(self, file=None):
+        file = file or self.file
+        start = time.perf_counter()
+        file.flush()
+        os.fsync(file.fileno())
+        self.fsyncs += 1
+        elapsed = time.perf_counter() - start
+        self.fsync_time.observe(elapsed)
+        self.max_fsync = max(self.max_fsync, elapsed)
+
+    def _write_rows(self, rows, since):
+        # Format in slices: csv.writerows holds the GIL, and a huge backlog would stall the capture thread
+        for i in range(0, len(rows), WRITE_SLICE):
+            buf = io.StringIO()
+            csv.writer(buf).writerows((format_ns(row[0]),) + row[1:] for row in rows[i:i + WRITE_SLICE])
+            data = buf.getvalue().encode('utf-8')
+            self.file.write(data)
+            self.bytes_written += len(data)
+        self.rows_written += len(rows)
+        self.part_rows += len(rows)
+        if self.part_first is None:
+            self.part_first = format_ns(rows[0][0])
+        self.part_last = format_ns(rows[-1][0])
+        self.last_latency = time.perf_counter() - since
+        self.latency.observe(self.last_latency)
+        self.max_latency = max(self.max_latency, self.last_latency)
+
+    def _take(self):
+        """Up to WRITE_CHUNK pending rows and the enqueue time of the oldest; call with ``cond`` held."""
+        rows = self.pending[:WRITE_CHUNK]
+        del self.pending[:WRITE_CHUNK]
+        since = self.marks[0][1] if rows else None
+        taken = len(rows)
+        self.marks = [(end - taken, t) for end, t in self.marks if end > taken]
+        return rows, since
+
+    def _run(self):
+        last_sync = time.perf_counter()
+        while True:
+            with self.cond:
+                if not self.pending and not self._closed:
+                    self.cond.wait(self.fsync_interval)
+                rows, since = self._take()
+                closing = self._closed and not self.pending
+            try:
+                if self.file is None:
+                    self._open_part()
+                    last_sync = time.perf_counter()
+                if rows:
+                    self._write_rows(rows, since)
+                    rows = None
+                now = time.perf_counter()
+                if closing:
+                    self._close_part()
+                    return
+                if now - last_sync >= self.fsync_interval:
+                    self._sync()
+                    last_sync = now
+                if self.file.tell() >= self.rotate_bytes or time.time() - self.part_opened >= self.rotate_seconds:
+                    self._close_part()
+                    self._open_part()
+                    last_sync = now
+            except (OSError, ValueError) as e:
+                # Disk full or removed media: report it, keep draining so producers never block, retry the part
+                self.errors += 1
+                self.last_error = str(e)
+                if rows:
+                    self.dropped_rows += len(rows)
+                if closing:
+                    if self.file is not None:
+                        try:
+                            self.file.close()
+                        except (OSError, ValueError):
+                            pass
+                    return
+                time.sleep(self.fsync_interval)
+
+    # Lifecycle and reporting
+    @property
+    def closed(self):
+        return self._closed
+
+    def close(self, timeout=10.0):
+        with self.cond:
+            if self._closed:
+                return
+            self._closed = True
+            self.cond.notify()
+        self.thread.join(timeout)
+
+    @property
+    def queue_depth(self):
+        return len(self.pending)
+
+    def register_metrics(self, metrics):
+        metrics.counter("log_rows_total", "Session log: rows written", lambda: self.rows_written)
+        metrics.counter("log_bytes_total", "Session log: bytes written", lambda: self.bytes_written)
+        metrics.counter("log_dropped_total", "Session log: rows dropped with the writer behind",
+                        lambda: self.dropped_rows)
+        metrics.gauge("log_pending_rows", "Session log: rows waiting for the writer", lambda: self.queue_depth)
+        metrics.add(self.latency)
+        metrics.add(self.fsync_time)
+
+    def stats(self):
+        elapsed = max(time.time() - self.started, 1e-9)
+        return {"rows": self.rows_written, "bytes": self.bytes_written, "files": len(self.files),
+                "rows_per_s": self.rows_written / elapsed, "mb_per_s": self.bytes_written / elapsed / 1e6,
+                "pending": self.queue_depth, "dropped": self.dropped_rows, "fsyncs": self.fsyncs,
+                "last_latency_ms": self.last_latency * 1000, "max_latency_ms": self.max_latency * 1000,
+                "max_fsync_ms": self.max_fsync * 1000, "errors": self.errors, "last_error": self.last_error}
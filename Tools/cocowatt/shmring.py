@@ -0,0 +1,451 @@
+"""Shared-memory line ring between a capture process and the monitor.
+
+    python -m cocowatt capture --port COM3 --shm cocowatt_COM3 --quiet   # capture process
+    engine.open_shared("cocowatt_COM3")                                   # in the GUI
+
+The capture process reads the port, frames and parses on its own GIL and
+appends every batch to a ``multiprocessing.shared_memory`` segment; the GUI maps
+the same segment and follows it by sequence number. A stalled GUI only falls
+behind in the ring; the capture process keeps reading the port, and when the
+GUI is closed and started again it attaches to the same segment and carries on.
+
+Layout: an int64 header, a JSON pattern table (append-only, so a column never
+changes meaning), a control mailbox the GUI uses to send lines and pattern
+lists to the capture process, then per-line columns ``(t, text offset, text
+length, tick)`` and ``values`` (float64, NaN where a pattern was absent) in slots
+``seq % capacity``, and a text arena holding the line bytes back to back.
+
+There is one writer. It reserves the range it is about to overwrite
+(``RESERVED_SEQ``, ``TEXT_RESERVED``) before writing and publishes ``WRITE_SEQ``
+after, so a reader slices the columns in place and afterwards discards whatever
+the writer may have reused in the meantime. The lock-free protocol relies on the
+stores reaching memory in program order, as they do on x86.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+MAGIC = 0x4357_5348_524E_4731  # "CWSHRNG1"
+HEADER_FIELDS = 32
+(F_MAGIC, F_CAPACITY, F_TEXT_BYTES, F_COLUMNS, F_PID, F_WRITE_SEQ, F_RESERVED_SEQ, F_TEXT_POS, F_TEXT_RESERVED,
+ F_HEARTBEAT, F_PATTERN_GEN, F_PATTERN_LEN, F_STOP, F_CLOSED, F_CTRL_SEQ, F_CTRL_ACK, F_CTRL_LEN,
+ F_BYTES, F_DROPPED) = range(19)
+HEADER_BYTES = HEADER_FIELDS * 8
+PATTERN_BYTES = 4096
+CONTROL_BYTES = 4096
+META = 4  # t, text offset, text length, tick (-1 without one)
+
+DEFAULT_LINES = 1 << 18
+DEFAULT_TEXT_MB = 32
+MAX_COLUMNS = 16  # Patterns beyond this many are parsed but not shared
+HEARTBEAT_TIMEOUT = 3.0  # Seconds without a heartbeat before a capture process counts as gone
+ENCODING = 'latin-1'  # One byte per character, so byte offsets are character offsets
+FOLLOW_BATCH = 4096  # Lines per read while catching up
+FOLLOW_POLL = 0.01
+
+
+def ring_name(port):
+    """Segment name for a port: ``COM3`` -> ``cocowatt_COM3``, ``/dev/ttyUSB0`` -> ``cocowatt_ttyUSB0``."""
+    return "cocowatt_" + re.sub(r'[^A-Za-z0-9]', '_', os.path.basename(port.rstrip("/\\")))[-20:]
+
+
+def _open_segment(name, create=False, size=0):
+    try:
+        return shared_memory.SharedMemory(name, create, size, track=create)  # Python 3.13+
+    except TypeError:
+        pass
+    shm = shared_memory.SharedMemory(name, create, size)
+    if not create and os.name == "posix":
+        # Before 3.13 every attached process would unlink the segment at exit; only the creator should
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class ShmRing:
+    """One segment; ``create`` it in the capture process, ``attach`` to it in readers."""
+
+    def __init__(self, shm, owner=False):
+        self.shm = shm
+        self.owner = owner
+        buf = shm.buf
+        self.header = np.ndarray(HEADER_FIELDS, np.int64, buf)
+        if self.header[F_MAGIC] != MAGIC:
+            raise ValueError(f"{shm.name} is not a cocowatt ring")
+        self.capacity = cap = int(self.header[F_CAPACITY])
+        self.text_bytes = int(self.header[F_TEXT_BYTES])
+        self.columns = int(self.header[F_COLUMNS])
+        offset = HEADER_BYTES
+        self._patterns_buf = np.ndarray(PATTERN_BYTES, np.uint8, buf, offset)
+        offset += PATTERN_BYTES
+        self._control_buf = np.ndarray(CONTROL_BYTES, np.uint8, buf, offset)
+        offset += CONTROL_BYTES
+        self.meta = np.ndarray((cap, META), np.int64, buf, offset)
+        offset += self.meta.nbytes
+        self.values = np.ndarray((cap, self.columns), np.float64, buf, offset)
+        offset += self.values.nbytes
+        self.text = np.ndarray(self.text_bytes, np.uint8, buf, offset)
+        self._patterns = []
+        self._pattern_gen = -1
+        self._column_of = {}
+
+    @staticmethod
+    def size_for(lines, text_bytes, columns):
+        return HEADER_BYTES + PATTERN_BYTES + CONTROL_BYTES + lines * 8 * (META + columns) + text_bytes
+
+    @classmethod
+    def create(cls, name, lines=DEFAULT_LINES, text_mb=DEFAULT_TEXT_MB, columns=MAX_COLUMNS, patterns=()):
+        text_bytes = (int(text_mb * 1024 * 1024) + 7) // 8 * 8
+        shm = _open_segment(name, True, cls.size_for(lines, text_bytes, columns))
+        header = np.ndarray(HEADER_FIELDS, np.int64, shm.buf)
+        header[:] = 0
+        header[F_CAPACITY] = lines
+        header[F_TEXT_BYTES] = text_bytes
+        header[F_COLUMNS] = columns
+        header[F_PID] = os.getpid()
+        header[F_HEARTBEAT] = time.time_ns()
+        header[F_MAGIC] = MAGIC
+        ring = cls(shm, owner=True)
+        for pattern in patterns:
+            ring.column(pattern)
+        return ring
+
+    @classmethod
+    def attach(cls, name):
+        return cls(_open_segment(name))
+
+    # Status
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def write_seq(self):
+        return int(self.header[F_WRITE_SEQ])
+
+    @property
+    def first_seq(self):
+        return max(0, int(self.header[F_RESERVED_SEQ]) - self.capacity)
+
+    @property
+    def pid(self):
+        return int(self.header[F_PID])
+
+    @property
+    def alive(self):
+        """The capture process is still writing (or at least still heartbeating)."""
+        if self.header[F_CLOSED]:
+            return False
+        return time.time_ns() - int(self.header[F_HEARTBEAT]) < HEARTBEAT_TIMEOUT * 1e9
+
+    @property
+    def patterns(self):
+        gen = int(self.header[F_PATTERN_GEN])
+        if gen != self._pattern_gen:
+            length = int(self.header[F_PATTERN_LEN])
+            try:
+                self._patterns = json.loads(self._patterns_buf[:length].tobytes()) if length else []
+            except ValueError:
+                return self._patterns  # Caught mid-update; the next read sees the new generation
+            self._pattern_gen = gen
+        return self._patterns
+
+    # Writer side (capture process)
+    def column(self, pattern):
+        """Column index of ``pattern``, appended to the table on first use; None once all are taken."""
+        index = self._column_of.get(pattern)
+        if index is None and len(self._column_of) < self.columns:
+            names = list(self._column_of) + [pattern]
+            data = json.dumps(names).encode('utf-8')
+            if len(data) > PATTERN_BYTES:
+                return None
+            self._patterns_buf[:len(data)] = np.frombuffer(data, np.uint8)
+            self.header[F_PATTERN_LEN] = len(data)
+            self.header[F_PATTERN_GEN] += 1
+            index = self._column_of[pattern] = len(names) - 1
+        return index
+
+    def append(self, entries, parsed):
+        """Engine listener: publish a batch of entries and their parsed values."""
+        if len(entries) > self.capacity:
+            entries, parsed = entries[-self.capacity:], parsed[-self.capacity:]
+        data = [e['data'].encode(ENCODING, 'replace') for e in entries]
+        lengths = np.fromiter(map(len, data), np.int64, len(data))
+        total = int(lengths.sum())
+        if total > self.text_bytes:
+            keep = int(np.searchsorted(np.cumsum(lengths[::-1]), self.text_bytes, side='right'))
+            if not keep:
+                return
+            entries, parsed, data, lengths = entries[-keep:], parsed[-keep:], data[-keep:], lengths[-keep:]
+            total = int(lengths.sum())
+        n = len(entries)
+        if not n:
+            return
+        header = self.header
+        seq = int(header[F_WRITE_SEQ])
+        pos = int(header[F_TEXT_POS])
+        columns = np.full((n, self.columns), np.nan)
+        for row, values in enumerate(parsed):
+            for pattern, value in values.items():
+                col = self._column_of.get(pattern)
+                if col is None:
+                    col = self.column(pattern)
+                    if col is None:
+                        continue
+                columns[row, col] = value
+        # Reserve, write, publish
+        header[F_RESERVED_SEQ] = seq + n
+        header[F_TEXT_RESERVED] = pos + total
+        blob = np.frombuffer(b"".join(data), np.uint8)
+        start = pos % self.text_bytes
+        first = min(total, self.text_bytes - start)
+        self.text[start:start + first] = blob[:first]
+        self.text[:total - first] = blob[first:]
+        slots = np.arange(seq, seq + n) % self.capacity
+        meta = np.empty((n, META), np.int64)
+        meta[:, 0] = [e['t'] for e in entries]
+        meta[:, 1] = pos + np.cumsum(lengths) - lengths
+        meta[:, 2] = lengths
+        meta[:, 3] = [e.get('tick', -1) for e in entries]
+        self.meta[slots] = meta
+        self.values[slots] = columns
+        header[F_TEXT_POS] = pos + total
+        header[F_WRITE_SEQ] = seq + n
+        header[F_HEARTBEAT] = time.time_ns()
+
+    __call__ = append
+
+    def heartbeat(self, engine=None):
+        self.header[F_HEARTBEAT] = time.time_ns()
+        if engine is not None:
+            self.header[F_BYTES] = engine.bytes_received
+            self.header[F_DROPPED] = engine.dropped_lines
+
+    def take_control(self):
+        """The pending mailbox message (a dict) or None; taking it frees the mailbox for the next one."""
+        header = self.header
+        if header[F_CTRL_SEQ] == header[F_CTRL_ACK]:
+            return None
+        message = json.loads(self._control_buf[:int(header[F_CTRL_LEN])].tobytes())
+        header[F_CTRL_ACK] = header[F_CTRL_SEQ]
+        return message
+
+    @property
+    def stop_requested(self):
+        return bool(self.header[F_STOP])
+
+    # Reader side (GUI)
+    def send(self, message, timeout=1.0):
+        """Post ``message`` (JSON-serializable) to the capture process; False if the mailbox stayed busy."""
+        data = json.dumps(message).encode('utf-8')
+        if len(data) > CONTROL_BYTES:
+            raise ValueError("control message too long")
+        header = self.header
+        deadline = time.perf_counter() + timeout
+        while header[F_CTRL_SEQ] != header[F_CTRL_ACK]:
+            if time.perf_counter() > deadline:
+                return False
+            time.sleep(0.005)
+        self._control_buf[:len(data)] = np.frombuffer(data, np.uint8)
+        header[F_CTRL_LEN] = len(data)
+        header[F_CTRL_SEQ] += 1
+        return True
+
+    def request_stop(self):
+        self.header[F_STOP] = 1
+
+    def _segments(self, start, end):
+        cap = self.capacity
+        a, b = start % cap, (end - 1) % cap + 1
+        return [(a, b)] if a < b else [(a, cap), (0, b)]
+
+    def read(self, seq, limit=None):
+        """``(entries, next_seq, skipped)`` for the lines published from ``seq`` on.
+
+        The columns are sliced in place; only the Python objects the engine keeps
+        (line text, stamps, parsed values) are created. ``skipped`` counts lines the
+        writer had already reused before they could be read.
+        """
+        header = self.header
+        end = int(header[F_WRITE_SEQ])
+        start = max(seq, int(header[F_RESERVED_SEQ]) - self.capacity)
+        if limit is not None:
+            end = min(end, start + limit)
+        if start >= end:
+            return [], max(seq, start), max(0, start - seq)
+        patterns = self.patterns
+        used = len(patterns)
+        entries = []
+        offsets = []
+        for a, b in self._segments(start, end):
+            meta = self.meta[a:b].copy()
+            offs = meta[:, 1]
+            hi = int(offs[-1] + meta[-1, 2])
+            # Text older than one arena back is gone; the check below drops its lines
+            lo = max(int(offs[0]), hi - self.text_bytes)
+            text = self._text(lo, hi)
+            lines = [text[o:o + n] for o, n in zip((offs - lo).tolist(), meta[:, 2].tolist())]
+            rows = self.values[a:b, :used].tolist()
+            for (t, _, _, tick), line, row in zip(meta.tolist(), lines, rows):
+                values = {p: v for p, v in zip(patterns, row) if v == v}
+                entry = {'t': t, 'data': line, 'values': values}
+                if tick >= 0:
+                    entry['tick'] = tick
+                entries.append(entry)
+            offsets.append(offs)
+        # Anything the writer reserved since we started reading may have been overwritten underneath
+        first_ok = int(header[F_RESERVED_SEQ]) - self.capacity
+        text_ok = int(header[F_TEXT_RESERVED]) - self.text_bytes
+        drop = max(0, first_ok - start, int(np.searchsorted(np.concatenate(offsets), text_ok)))
+        drop = min(drop, len(entries))
+        return entries[drop:], end, (start - seq) + drop
+
+    def _text(self, lo, hi):
+        size = self.text_bytes
+        a = lo % size
+        b = a + hi - lo
+        if b <= size:
+            return self.text[a:b].tobytes().decode(ENCODING)
+        return (self.text[a:].tobytes() + self.text[:b - size].tobytes()).decode(ENCODING)
+
+    def close(self, unlink=None):
+        """Unmap; the owner also marks the ring closed and removes the segment (``unlink`` overrides)."""
+        if unlink is None:
+            unlink = self.owner
+        if self.owner:
+            self.header[F_CLOSED] = 1
+        # Views into the buffer have to go before it can be released
+        self.header = self.meta = self.values = self.text = self._patterns_buf = self._control_buf = None
+        self.shm.close()
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class RingFollower(threading.Thread):
+    """Reads new lines from an attached ring into ``sink(entries)`` (``CaptureEngine.put_batch``).
+
+    Starts ``backlog`` lines before the newest one, so a reopened GUI shows recent
+    history. ``throttle`` may block between batches for backpressure, as for a replay;
+    lines the ring reuses before they are read are counted in ``skipped``.
+    """
+
+    def __init__(self, ring, sink, backlog=0, throttle=None, batch=FOLLOW_BATCH):
+        super().__init__(name="ring-follower", daemon=True)
+        self.ring = ring
+        self.sink = sink
+        self.throttle = throttle
+        self.batch = batch
+        self.seq = max(ring.first_seq, ring.write_seq - backlog)
+        self.lines = 0
+        self.skipped = 0
+        self.error = None
+        self._halt = threading.Event()
+        # Held while the ring is closed, so lag/stats/send never see it half torn down
+        self._lock = threading.Lock()
+        self.finished = False
+
+    def stop(self, timeout=1.0):
+        self._halt.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    @property
+    def done(self):
+        return self.finished
+
+    @property
+    def lag(self):
+        with self._lock:
+            return self.ring.write_seq - self.seq if not self.finished else 0
+
+    def run(self):
+        try:
+            while not self._halt.is_set():
+                if self.throttle is not None:
+                    self.throttle()
+                entries, self.seq, skipped = self.ring.read(self.seq, self.batch)
+                self.skipped += skipped
+                if entries:
+                    self.lines += len(entries)
+                    self.sink(entries)
+                elif not self.ring.alive:
+                    break
+                else:
+                    self._halt.wait(FOLLOW_POLL)
+        except Exception as e:
+            self.error = e
+        finally:
+            with self._lock:
+                self.finished = True
+                self.ring.close()
+
+    def send(self, message):
+        with self._lock:
+            return not self.finished and self.ring.send(message)
+
+    def stats(self):
+        with self._lock:
+            if self.finished:
+                lag = captured = dropped = 0
+            else:
+                header = self.ring.header
+                lag = self.ring.write_seq - self.seq
+                captured, dropped = int(header[F_BYTES]), int(header[F_DROPPED])
+        return {"lines": self.lines, "skipped": self.skipped, "lag": lag,
+                "capture_bytes": captured, "capture_dropped": dropped}
+
+
+def find_ring(name):
+    """The live ring called ``name``, or None; a ring left behind by a dead capture process is removed."""
+    try:
+        ring = ShmRing.attach(name)
+    except (FileNotFoundError, ValueError):
+        return None
+    if ring.alive:
+        return ring
+    ring.close(unlink=True)
+    return None
+
+
+def spawn_capture(name, port, args=(), timeout=10.0):
+    """Start ``python -m cocowatt capture --port PORT --shm NAME ...`` detached from this process.
+
+    The child outlives the caller (its own session / process group) and logs to
+    ``<tmp>/<name>.log``. Returns the attached ring once it is up; raises
+    RuntimeError with the end of the log if the process exits first.
+    """
+    log_path = os.path.join(tempfile.gettempdir(), f"{name}.log")
+    package_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-m", "cocowatt", "capture", "--port", port, "--shm", name, "--quiet", *args]
+    if os.name == "nt":
+        flags = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.DETACHED_PROCESS
+        options = {"creationflags": flags}
+    else:
+        options = {"start_new_session": True}
+    with open(log_path, 'w', encoding='utf-8') as log:
+        process = subprocess.Popen(command, cwd=package_dir, stdin=subprocess.DEVNULL, stdout=log,
+                                   stderr=subprocess.STDOUT, **options)
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        ring = find_ring(name)
+        if ring is not None:
+            return ring
+        if process.poll() is not None:
+            break
+        time.sleep(0.05)
+    else:
+        process.kill()
+    with open(log_path, encoding='utf-8', errors='replace') as log:
+        tail = log.read()[-2000:].strip()
+    raise RuntimeError(f"capture process did not start ({log_path}):\n{tail}")
@@ -0,0 +1,205 @@
+"""Local pseudo-terminal pairs standing in for a USB-UART board (POSIX only), and a TC275 ADC demo simulator.
+
+    python -m cocowatt.sim --rate 1000 --burst 16 --corrupt 0.01
+
+prints the pty to open in the monitor and plays ``core0_main`` until Ctrl+C.
+"""
+import argparse
+import math
+import os
+import random
+import threading
+import time
+import tty
+
+import numpy as np
+
+ADC_RESOLUTION = 4096
+VREF_MV = 5000
+HELLO = b"ADC_Single_Channel..\n\r"  # g_txData, sent once at start-up
+SIGNALS = ("sine", "ramp", "noise", "const")
+
+
+class PtyPair:
+    """A raw pty: write to ``master`` to play the board, open ``port`` like a serial device."""
+
+    def __init__(self):
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.master)
+        tty.setraw(self.slave)
+        self.port = os.ttyname(self.slave)
+
+    def write(self, data):
+        view = memoryview(data)
+        while view:
+            written = os.write(self.master, view)
+            view = view[written:]
+
+    def read(self, size=4096):
+        return os.read(self.master, size)
+
+    def close(self):
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def adc_to_millivolt(bits):
+    # adcToMilliVolt() in Cpu0_Main.c, integer arithmetic included
+    bits = min(bits, ADC_RESOLUTION - 1)
+    return bits * VREF_MV // (ADC_RESOLUTION - 1)
+
+
+def tc275_line(bits):
+    """One line exactly as the three ``send_UART`` calls of ``core0_main`` print it."""
+    mv = adc_to_millivolt(bits)
+    # mv / 1000.0f is a float division, promoted to double for %f
+    volt = float(np.float32(mv) / np.float32(1000.0))
+    return b"ADC Bits: %u ADC mVolt: %u mV ADC Volt: %.3f V\n\r" % (bits, mv, volt)
+
+
+LINES = [tc275_line(bits) for bits in range(ADC_RESOLUTION)]
+
+
+class TC275Simulator(threading.Thread):
+    """Plays the text telemetry of ``core0_main`` into ``sink(data)`` (a ``PtyPair.write``) on a thread.
+
+    ``rate`` lines/s (0 = as fast as the sink accepts) are written ``burst`` lines
+    per write, so a burst of 16 looks like a USB packet of 16 lines. With ``on``
+    and ``off`` seconds the board goes quiet periodically. ``line_length`` pads
+    each line with an ``x`` run before the terminator; ``corrupt`` is the fraction
+    of lines damaged on the wire (a flipped byte, a lost byte, a lost terminator
+    or a burst of noise).
+
+    ``sent`` records ``(lines so far, monotonic_ns)`` after each write, so a
+    receiver can work out when any line left the board.
+    """
+
+    def __init__(self, sink, rate=10.0, lines=None, burst=1, signal="sine", period=2.0, line_length=0,
+                 corrupt=0.0, on=None, off=0.0, hello=True, seed=0):
+        super().__init__(name="tc275-sim", daemon=True)
+        self.sink = sink
+        self.rate = rate
+        self.limit = lines
+        self.burst = max(1, int(burst))
+        self.signal = signal
+        self.period = period
+        self.line_length = line_length
+        self.corrupt = corrupt
+        self.on = on
+        self.off = off
+        self.hello = hello
+        self.random = random.Random(seed)
+        self.lines = 0
+        self.bytes = 0
+        self.corrupted = 0
+        self.sent = []
+        self.cpu = 0.0
+        self.error = None
+        self._halt = threading.Event()
+
+    def stop(self):
+        self._halt.set()
+
+    def bits(self, i):
+        t = i / self.rate if self.rate else i * 1e-4
+        if self.signal == "ramp":
+            return i % ADC_RESOLUTION
+        if self.signal == "noise":
+            return self.random.randrange(ADC_RESOLUTION)
+        if self.signal == "const":
+            return 2252
+        return int(2047.5 + 2000 * math.sin(2 * math.pi * t / self.period))
+
+    def line(self, i):
+        data = LINES[self.bits(i)]
+        if self.line_length > len(data):
+            data = data[:-2] + b" " + b"x" * (self.line_length - len(data) - 1) + b"\n\r"
+        if self.corrupt and self.random.random() < self.corrupt:
+            self.corrupted += 1
+            data = self.damage(data)
+        return data
+
+    def damage(self, data):
+        data = bytearray(data)
+        kind = self.random.randrange(4)
+        at = self.random.randrange(len(data) - 2)
+        if kind == 0:
+            data[at] ^= 1 << self.random.randrange(8)
+        elif kind == 1:
+            del data[at]
+        elif kind == 2:
+            del data[-2:]
+        else:
+            data[at:at] = bytes(self.random.randrange(256) for _ in range(self.random.randrange(1, 16)))
+        return bytes(data)
+
+    def run(self):
+        cpu0 = time.thread_time()
+        try:
+            if self.hello:
+                self._write(HELLO, 0)
+            start = time.perf_counter()
+            i = 0
+            while not self._halt.is_set() and (self.limit is None or i < self.limit):
+                if self.on is not None and self.off:
+                    # Duty cycle: quiet for `off` seconds after every `on` seconds of output
+                    phase = (time.perf_counter() - start) % (self.on + self.off)
+                    if phase >= self.on:
+                        time.sleep(min(self.on + self.off - phase, 0.05))
+                        continue
+                n = self.burst if self.limit is None else min(self.burst, self.limit - i)
+                if self.rate:
+                    delay = start + (i + n) / self.rate - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                self._write(b"".join(self.line(k) for k in range(i, i + n)), n)
+                i += n
+        except OSError as e:
+            self.error = e
+        self.cpu = time.thread_time() - cpu0
+
+    def _write(self, data, lines):
+        t = time.monotonic_ns()  # Before the write: a reader may see the data before it returns
+        self.sink(data)
+        self.lines += lines
+        self.bytes += len(data)
+        self.sent.append((self.lines, t))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulated TC275 ADC demo on a local pty")
+    parser.add_argument("--rate", type=float, default=10, help="lines per second (firmware: 10); 0 = flat out")
+    parser.add_argument("--burst", type=int, default=1, help="lines per write")
+    parser.add_argument("--signal", default="sine", choices=SIGNALS)
+    parser.add_argument("--period", type=float, default=2.0, help="seconds per sine period")
+    parser.add_argument("--line-length", type=int, default=0, help="pad lines to N bytes")
+    parser.add_argument("--corrupt", type=float, default=0.0, help="fraction of damaged lines")
+    parser.add_argument("--on", type=float, help="seconds of output before each --off pause")
+    parser.add_argument("--off", type=float, default=0.0, help="seconds of silence per duty cycle")
+    args = parser.parse_args(argv)
+    with PtyPair() as pty:
+        sim = TC275Simulator(pty.write, args.rate, burst=args.burst, signal=args.signal, period=args.period,
+                             line_length=args.line_length, corrupt=args.corrupt, on=args.on, off=args.off)
+        print(f"Simulated TC275 on {pty.port}  (Ctrl+C to stop)", flush=True)
+        sim.start()
+        try:
+            while sim.is_alive():
+                time.sleep(1.0)
+                print(f"\r{sim.lines} lines, {sim.corrupted} corrupted", end="", flush=True)
+        except KeyboardInterrupt:
+            pass
+        sim.stop()
+        print()
+
+
+if __name__ == "__main__":
+    main()
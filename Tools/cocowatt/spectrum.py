@@ -0,0 +1,116 @@
+"""Welch power spectral density of the newest samples of a parsed series, on preallocated buffers."""
+import numpy as np
+
+WINDOWS = {
+    "hann": np.hanning,
+    "hamming": np.hamming,
+    "blackman": np.blackman,
+    "rect": np.ones,
+}
+SIZES = (1024, 4096, 16384, 65536)
+BATCH_STAMPED = 0.1  # Fraction of repeated timestamps above which samples are spread evenly instead of interpolated
+
+
+class Spectrum:
+    """PSD estimator for the last ``size`` samples of one series.
+
+    Samples stamped on the host arrive with jitter, and often in batches sharing a
+    single read timestamp, so they are first put on a uniform grid at the mean
+    sample rate: batch-stamped data is assumed evenly spaced across its span,
+    anything else is linearly interpolated. The grid is cut into ``segments``
+    segments (50 % overlap when more than one). Each segment has its mean removed
+    and ``window`` applied, and the averaged one-sided PSD is returned in units²/Hz.
+
+    Every array (copies of the input, grid, segments, spectra, result) is allocated
+    once per configuration and reused on each ``compute``; the returned
+    ``(freqs, psd)`` are views that the next call overwrites.
+    """
+
+    def __init__(self, size=4096, segments=4, window="hann"):
+        self.configure(size, segments, window)
+
+    def configure(self, size, segments=4, window="hann"):
+        self.size = int(size)
+        self.segments = max(1, int(segments))
+        self.window_name = window
+        # 50 % overlap: k segments of length L cover (k + 1) * L / 2 samples
+        self.seg_len = self.size if self.segments == 1 else 2 * self.size // (self.segments + 1)
+        self.step = self.seg_len // 2 if self.segments > 1 else self.seg_len
+        self.window = WINDOWS[window](self.seg_len)
+        self.window_power = float(np.sum(self.window ** 2))
+        self.ramp = np.arange(self.size, dtype=np.float64)
+        self.bins = np.arange(self.seg_len // 2 + 1, dtype=np.float64)
+        self.times = np.empty(self.size, dtype=np.float64)
+        self.values = np.empty(self.size, dtype=np.float64)
+        self.grid = np.empty(self.size, dtype=np.float64)
+        self.uniform = np.empty(self.size, dtype=np.float64)
+        self.work = np.empty((self.segments, self.seg_len), dtype=np.float64)
+        self.spec = np.empty((self.segments, self.seg_len // 2 + 1), dtype=np.complex128)
+        self.power = np.empty((self.segments, self.seg_len // 2 + 1), dtype=np.float64)
+        self.power_im = np.empty_like(self.power)
+        self.psd = np.empty(self.seg_len // 2 + 1, dtype=np.float64)
+        self.freqs = np.empty(self.seg_len // 2 + 1, dtype=np.float64)
+        self.count = 0
+        self.fs = 0.0
+        self.resampled = False
+
+    def load(self, times, values):
+        """Copy the newest ``size`` samples in; cheap, so it can run under the engine lock."""
+        n = min(len(times), self.size)
+        self.count = n
+        if n:
+            self.times[:n] = times[-n:]
+            self.values[:n] = values[-n:]
+        return n
+
+    def ready(self):
+        return self.count >= self.size and self.times[self.count - 1] > self.times[0]
+
+    def _regrid(self):
+        t, v = self.times, self.values
+        span = t[-1] - t[0]
+        self.fs = (self.size - 1) / span
+        repeated = np.count_nonzero(np.diff(t) == 0) / (self.size - 1)
+        if repeated > BATCH_STAMPED:
+            # Read-time stamps: the ADC still sampled evenly, only the host saw the lines in bursts
+            self.resampled = False
+            return v
+        np.multiply(self.ramp, span / (self.size - 1), out=self.grid)
+        self.grid += t[0]
+        self.uniform[:] = np.interp(self.grid, t, v)
+        self.resampled = True
+        return self.uniform
+
+    def compute(self):
+        """``(freqs, psd)`` for the loaded samples, or None while fewer than ``size`` are available."""
+        if not self.ready():
+            return None
+        data = self._regrid()
+        frames = np.lib.stride_tricks.as_strided(data, shape=(self.segments, self.seg_len),
+                                                 strides=(self.step * data.strides[0], data.strides[0]),
+                                                 writeable=False)
+        np.subtract(frames, frames.mean(axis=1, keepdims=True), out=self.work)
+        self.work *= self.window
+        try:
+            np.fft.rfft(self.work, axis=1, out=self.spec)
+        except TypeError:  # NumPy < 2.0 has no out=
+            self.spec[:] = np.fft.rfft(self.work, axis=1)
+        np.multiply(self.spec.real, self.spec.real, out=self.power)
+        np.multiply(self.spec.imag, self.spec.imag, out=self.power_im)
+        self.power += self.power_im
+        np.mean(self.power, axis=0, out=self.psd)
+        # One-sided density: double everything but DC and (for even lengths) Nyquist
+        self.psd *= 2.0 / (self.fs * self.window_power)
+        self.psd[0] /= 2.0
+        if self.seg_len % 2 == 0:
+            self.psd[-1] /= 2.0
+        np.multiply(self.bins, self.fs / self.seg_len, out=self.freqs)
+        return self.freqs, self.psd
+
+    def peak(self, min_hz=0.0):
+        """``(frequency, amplitude RMS)`` of the strongest bin above ``min_hz``, ignoring DC."""
+        start = max(1, int(np.searchsorted(self.freqs, min_hz)))
+        i = start + int(np.argmax(self.psd[start:]))
+        # Bin power over the window's equivalent noise bandwidth gives the tone's mean square
+        enbw = self.fs * self.window_power / np.sum(self.window) ** 2
+        return float(self.freqs[i]), float(np.sqrt(self.psd[i] * enbw))
@@ -0,0 +1,189 @@
+"""Streaming per-channel statistics: O(1) work per sample, nothing rescanned.
+
+``RunningStats`` covers everything since the last reset (Welford's update).
+``WindowStats`` covers the last N samples or the last T seconds: a deque of the
+samples in the window, Welford add/remove for mean and variance, and monotonic
+deques for min and max. ``ChannelStats`` bundles one of each for a parser pattern.
+"""
+import math
+from collections import deque
+
+import numpy as np
+
+
+class RunningStats:
+    """Count, min, max, mean, standard deviation, RMS and rate of everything added."""
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max', 'first_t', 'last_t')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.first_t = None
+        self.last_t = None
+
+    def add(self, t, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        if x < self.min:
+            self.min = x
+        if x > self.max:
+            self.max = x
+        if self.first_t is None:
+            self.first_t = t
+        self.last_t = t
+
+    def extend(self, times, values):
+        """Bulk add, merging the chunk's moments in one step (Chan et al.)."""
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if not n:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.count + n
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.mean += delta * n / total
+        self.count = total
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        if self.first_t is None:
+            self.first_t = float(times[0])
+        self.last_t = float(times[-1])
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(max(self.variance, 0.0))
+
+    @property
+    def rms(self):
+        # Mean square = mean^2 + population variance
+        return math.sqrt(self.mean * self.mean + max(self.m2, 0.0) / self.count) if self.count else 0.0
+
+    @property
+    def rate(self):
+        """Samples per second over the covered time span."""
+        if self.count < 2 or self.last_t == self.first_t:
+            return 0.0
+        return (self.count - 1) / (self.last_t - self.first_t)
+
+    def as_dict(self):
+        if not self.count:
+            return {"count": 0, "min": None, "max": None, "mean": None, "std": None, "rms": None, "rate": 0.0}
+        return {"count": self.count, "min": self.min, "max": self.max, "mean": self.mean, "std": self.std,
+                "rms": self.rms, "rate": self.rate}
+
+
+class WindowStats(RunningStats):
+    """``RunningStats`` over a sliding window of at most ``max_samples`` samples and/or ``max_seconds``."""
+
+    __slots__ = ('max_samples', 'max_seconds', 'samples', 'lows', 'highs', 'added')
+
+    def __init__(self, max_samples=None, max_seconds=None):
+        self.max_samples = max_samples
+        self.max_seconds = max_seconds
+        self.samples = deque()
+        # Min/max candidates as (sample number, value); values rise (lows) or fall (highs) left to right
+        self.lows = deque()
+        self.highs = deque()
+        super().__init__()
+
+    def reset(self):
+        super().reset()
+        self.samples.clear()
+        self.lows.clear()
+        self.highs.clear()
+        self.added = 0
+
+    def add(self, t, x):
+        samples, lows, highs = self.samples, self.lows, self.highs
+        samples.append((t, x))
+        i = self.added
+        self.added = i + 1
+        count = self.count + 1
+        delta = x - self.mean
+        mean = self.mean + delta / count
+        m2 = self.m2 + delta * (x - mean)
+        while lows and lows[-1][1] > x:
+            lows.pop()
+        lows.append((i, x))
+        while highs and highs[-1][1] < x:
+            highs.pop()
+        highs.append((i, x))
+        # Evict from the left; the oldest sample is number i + 1 - count
+        limit = self.max_samples
+        horizon = None if self.max_seconds is None else t - self.max_seconds
+        while (limit is not None and count > limit) or (horizon is not None and samples[0][0] < horizon):
+            _, old = samples.popleft()
+            oldest = i + 1 - count
+            if lows[0][0] == oldest:
+                lows.popleft()
+            if highs[0][0] == oldest:
+                highs.popleft()
+            # The new sample always stays, so count never reaches zero here
+            count -= 1
+            delta = old - mean
+            mean -= delta / count
+            m2 -= delta * (old - mean)
+        self.count, self.mean, self.m2 = count, mean, m2
+        self.min = lows[0][1]
+        self.max = highs[0][1]
+        self.first_t = samples[0][0]
+        self.last_t = t
+
+    def extend(self, times, values):
+        # Only the samples that can still be inside the window are worth adding
+        start = 0
+        if self.max_samples is not None:
+            start = max(0, len(values) - self.max_samples)
+        if self.max_seconds is not None and len(times):
+            start = max(start, int(np.searchsorted(times, times[-1] - self.max_seconds, side='left')))
+        for t, x in zip(np.asarray(times[start:]).tolist(), np.asarray(values[start:]).tolist()):
+            self.add(t, x)
+
+
+class ChannelStats:
+    """Totals plus last-``window_samples`` and last-``window_seconds`` statistics for one pattern."""
+
+    __slots__ = ('total', 'last_n', 'last_t')
+
+    def __init__(self, window_samples=1000, window_seconds=10.0):
+        self.total = RunningStats()
+        self.last_n = WindowStats(max_samples=window_samples)
+        self.last_t = WindowStats(max_seconds=window_seconds)
+
+    def add(self, t, x):
+        self.total.add(t, x)
+        self.last_n.add(t, x)
+        self.last_t.add(t, x)
+
+    def extend(self, times, values):
+        self.total.extend(times, values)
+        self.last_n.extend(times, values)
+        self.last_t.extend(times, values)
+
+    def reset(self):
+        self.total.reset()
+        self.last_n.reset()
+        self.last_t.reset()
+
+    def windows(self):
+        """``(label, stats)`` pairs in display order."""
+        return [("all", self.total), (f"last {self.last_n.max_samples}", self.last_n),
+                (f"last {self.last_t.max_seconds:g} s", self.last_t)]
+
+    def as_dict(self):
+        return {label: stats.as_dict() for label, stats in self.windows()}
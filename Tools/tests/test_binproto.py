@@ -0,0 +1,70 @@
+import random
+
+from cocowatt.binproto import (FrameDecoder, MAX_CHANNELS, encode_frame, frame_size, generate_frames,
+                               raw_to_volt)
+
+
+def test_round_trip():
+    data = encode_frame(7, 123456, [0, 2048, 4095])
+    assert len(data) == frame_size(3)
+    frames = FrameDecoder().feed(data)
+    assert [(f.seq, f.tick, f.values) for f in frames] == [(7, 123456, (0, 2048, 4095))]
+
+
+def test_byte_at_a_time():
+    data = generate_frames(50, channels=2)
+    decoder = FrameDecoder()
+    frames = []
+    for i in range(len(data)):
+        frames += decoder.feed(data[i:i + 1])
+    assert [f.seq for f in frames] == list(range(50))
+    assert decoder.skipped_bytes == 0
+    assert len(decoder) == 0
+
+
+def test_resync_after_noise():
+    rng = random.Random(3)
+    noise = bytes(rng.randrange(256) for _ in range(200)).replace(b'\xa5', b'')
+    data = noise + encode_frame(1, 10, [100]) + noise + b'\xa5' + encode_frame(2, 20, [200])
+    decoder = FrameDecoder()
+    frames = decoder.feed(data)
+    assert [(f.seq, f.values) for f in frames] == [(1, (100,)), (2, (200,))]
+    assert decoder.skipped_bytes == 2 * len(noise) + 1
+
+
+def test_sync_word_split_across_reads():
+    data = encode_frame(5, 0, [1])
+    decoder = FrameDecoder()
+    assert decoder.feed(b'junk' + data[:1]) == []
+    assert [f.seq for f in decoder.feed(data[1:])] == [5]
+    assert decoder.skipped_bytes == 4
+
+
+def test_crc_error_rejects_frame():
+    data = generate_frames(10, corrupt={4})
+    decoder = FrameDecoder()
+    frames = decoder.feed(data)
+    assert [f.seq for f in frames] == [0, 1, 2, 3, 5, 6, 7, 8, 9]
+    assert decoder.crc_errors == 1
+    assert decoder.lost_frames == 1
+
+
+def test_bad_channel_count_is_skipped():
+    bogus = b'\xa5\x5a' + bytes(6) + bytes([MAX_CHANNELS + 1])
+    decoder = FrameDecoder()
+    frames = decoder.feed(bogus + encode_frame(1, 0, [1]))
+    assert [f.seq for f in frames] == [1]
+    assert decoder.skipped_bytes == len(bogus)
+
+
+def test_lost_frames_across_wrap():
+    data = generate_frames(6, start_seq=65533, drop={65535, 0})
+    decoder = FrameDecoder()
+    assert [f.seq for f in decoder.feed(data)] == [65533, 65534, 1, 2]
+    assert decoder.lost_frames == 2
+
+
+def test_raw_to_volt():
+    assert raw_to_volt(0) == 0.0
+    assert raw_to_volt(4095) == 5.0
+    assert raw_to_volt(5000) == 5.0
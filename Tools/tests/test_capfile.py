@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from cocowatt.capfile import BLOCK, CaptureReader, CaptureWriter
+
+PATTERNS = ["ADC Volt:", "ADC Volt2:"]
+
+
+def write_rows(path, rows, block_rows=100):
+    times = 1000.0 + np.arange(rows) * 0.01
+    with CaptureWriter(path, PATTERNS, block_rows=block_rows) as writer:
+        for i, t in enumerate(times):
+            values = {"ADC Volt:": i * 0.5}
+            if i % 3 == 0:
+                values["ADC Volt2:"] = -i
+            writer.append(t, f"line {i}", values)
+    return times
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "run.cwcap"
+    times = write_rows(path, 1050)
+    with CaptureReader(path) as reader:
+        assert reader.patterns == PATTERNS
+        assert reader.rows == 1050
+        assert len(reader.blocks) == 11
+        assert not reader.recovered
+        assert reader.t_min == times[0] and reader.t_max == times[-1]
+        t, columns, lines = reader.read(lines=True)
+        assert np.array_equal(t, times)
+        assert np.array_equal(columns["ADC Volt:"], np.arange(1050) * 0.5)
+        assert np.isnan(columns["ADC Volt2:"][1]) and columns["ADC Volt2:"][3] == -3
+        assert lines == [f"line {i}" for i in range(1050)]
+
+
+def test_time_range_reads_only_overlapping_blocks(tmp_path):
+    path = tmp_path / "run.cwcap"
+    times = write_rows(path, 1000)
+    with CaptureReader(path) as reader:
+        lo, hi = times[250], times[420]
+        assert list(reader.block_range(lo, hi)) == [2, 3, 4]
+        t, columns, lines = reader.read(lo, hi, ["ADC Volt:"])
+        assert np.array_equal(t, times[250:421])
+        assert list(columns) == ["ADC Volt:"] and lines is None
+        st, sv = reader.series("ADC Volt2:", lo, hi)
+        assert np.array_equal(sv, -np.arange(252, 421, 3))
+        assert np.array_equal(st, times[252:421:3])
+
+
+def test_extend_matches_append(tmp_path):
+    times = 5.0 + np.arange(250)
+    lines = [f"row\n{i}" for i in range(250)]
+    with CaptureWriter(tmp_path / "bulk.cwcap", PATTERNS, block_rows=64) as writer:
+        writer.extend(times[:10], lines[:10], {"ADC Volt:": np.arange(10.0)})
+        writer.extend(times[10:], lines[10:], {"ADC Volt:": np.arange(10.0, 250.0)})
+    with CaptureReader(tmp_path / "bulk.cwcap") as reader:
+        assert [b["rows"] for b in reader.blocks] == [64, 64, 64, 58]
+        t, columns, texts = reader.read(lines=True)
+        assert np.array_equal(t, times)
+        assert np.array_equal(columns["ADC Volt:"], np.arange(250.0))
+        assert np.isnan(columns["ADC Volt2:"]).all()
+        assert texts[3] == "row 3"
+
+
+def test_recovers_file_without_index(tmp_path):
+    path = tmp_path / "crashed.cwcap"
+    writer = CaptureWriter(path, PATTERNS, block_rows=100)
+    for i in range(250):
+        writer.append(float(i), f"line {i}", {"ADC Volt:": float(i)})
+    writer.file.close()  # Killed before close(): two full blocks on disk, no index
+    with CaptureReader(path) as reader:
+        assert reader.recovered
+        assert reader.rows == 200
+        assert np.array_equal(reader.series("ADC Volt:")[1], np.arange(200.0))
+
+
+@pytest.mark.parametrize("cut", [0, 2, BLOCK.size, BLOCK.size + 2])
+def test_recovers_file_cut_in_a_block_header(tmp_path, cut):
+    path = tmp_path / "crashed.cwcap"
+    write_rows(path, 250)
+    with CaptureReader(path) as reader:
+        second = reader.blocks[1]["offset"]
+    with open(path, 'r+b') as f:
+        f.truncate(second + cut)
+    with CaptureReader(path) as reader:
+        assert reader.recovered
+        assert reader.rows == 100
+        assert np.array_equal(reader.series("ADC Volt:")[1], np.arange(100) * 0.5)
+
+
+def test_not_a_capture(tmp_path):
+    path = tmp_path / "other.cwcap"
+    path.write_bytes(b"time,data\n")
+    with pytest.raises(ValueError):
+        CaptureReader(path)
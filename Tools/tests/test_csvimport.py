@@ -0,0 +1,57 @@
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from cocowatt.csvimport import parse_clock
+
+
+def strptime_seconds(stamp):
+    try:
+        dt = datetime.strptime(stamp, "%H:%M:%S.%f" if '.' in stamp else "%H:%M:%S")
+    except ValueError:
+        return np.nan
+    return dt.hour * 3600 + dt.minute * 60 + dt.second + dt.microsecond / 1e6
+
+
+@pytest.mark.parametrize("stamp, expected", [
+    ("12:34:56.789", 45296.789),
+    ("12:34:56", 45296.0),
+    ("09:05:01.2", 32701.2),
+    ("9:05:01.2", 32701.2),
+    ("9:05:01", 32701.0),
+    ("23:59:59.123456789", 86399.123456789),
+    ("12:34:56.", np.nan),
+    ("12:34", np.nan),
+    ("12-34-56", np.nan),
+    ("", np.nan),
+    ("Timestamp", np.nan),
+])
+def test_parse_clock(stamp, expected):
+    assert np.allclose(parse_clock([stamp]), [expected], equal_nan=True, rtol=0, atol=1e-9)
+
+
+def test_long_fraction_is_not_cut_off():
+    seconds = parse_clock(["00:00:01.1234567891", "00:00:02.5"])
+    assert np.allclose(seconds, [1.1234567891, 2.5], rtol=0, atol=1e-12)
+
+
+def test_junk_cell_does_not_widen_the_batch():
+    seconds = parse_clock(["x" * 100_000, "01:00:00.5"])
+    assert np.isnan(seconds[0]) and seconds[1] == 3600.5
+
+
+def test_matches_strptime():
+    rng = random.Random(7)
+    stamps = []
+    for _ in range(2000):
+        h = str(rng.randrange(24)).zfill(rng.choice([1, 2]))
+        stamp = f"{h}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+        if rng.random() < 0.7:
+            stamp += "." + "".join(rng.choice("0123456789") for _ in range(rng.randint(1, 6)))
+        if rng.random() < 0.05:
+            stamp = stamp.replace(":", rng.choice([".", " ", "::"]), 1)
+        stamps.append(stamp)
+    expected = [strptime_seconds(s) for s in stamps]
+    assert np.allclose(parse_clock(stamps), expected, equal_nan=True, rtol=0, atol=1e-9)
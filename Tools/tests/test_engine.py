@@ -0,0 +1,35 @@
+from cocowatt.engine import CaptureEngine
+
+
+def feed(engine, count):
+    for i in range(count):
+        engine.handle_batch([{'t': i, 'data': f"A: {i} B: {-i}"}])
+
+
+def test_set_patterns_keeps_unchanged_series():
+    engine = CaptureEngine(patterns=["A:", "B:"])
+    feed(engine, 5)
+    history = engine.parser_history["A:"]
+    engine.set_patterns(["A:", "C:"], reset=True)
+    assert engine.parser_history["A:"] is history and len(history) == 5
+    assert len(engine.parser_history["C:"]) == 0
+    assert "B:" not in engine.parser_history
+    assert engine.parser_values == {"A:": 4.0, "C:": None}
+    assert list(engine.parser_stats) == ["A:"]
+    feed(engine, 1)
+    assert len(history) == 6
+
+
+def test_listener_failure_is_counted(capsys):
+    engine = CaptureEngine(patterns=["A:"])
+    seen = []
+
+    def broken(entries, parsed):
+        raise RuntimeError("listener broke")
+
+    engine.add_listener(broken)
+    engine.add_listener(lambda entries, parsed: seen.extend(parsed))
+    feed(engine, 3)
+    assert engine.listener_errors == 3
+    assert [p["A:"] for p in seen] == [0.0, 1.0, 2.0]
+    assert capsys.readouterr().err.count("RuntimeError: listener broke") == 1
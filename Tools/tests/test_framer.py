@@ -0,0 +1,49 @@
+import random
+
+from cocowatt.framer import LineFramer
+
+
+def frame(stream, sizes, limit=64):
+    framer = LineFramer(limit)
+    lines = []
+    pos = 0
+    for size in sizes:
+        lines += framer.feed(stream[pos:pos + size])
+        pos += size
+    lines += framer.feed(stream[pos:])
+    tail = framer.flush()
+    return lines + ([tail] if tail else []), framer.split_lines
+
+
+def test_terminators():
+    framer = LineFramer()
+    assert framer.feed(b"a\r\nb\rc\nd") == ["a", "b", "c"]
+    assert len(framer) == 1
+    assert framer.feed(b"\n\n\r\n") == ["d"]
+    assert framer.flush() == ""
+
+
+def test_crlf_split_across_reads():
+    framer = LineFramer()
+    assert framer.feed(b"a\r") == ["a"]
+    assert framer.feed(b"\nb\r\n") == ["b"]
+
+
+def test_overlong_line_is_split():
+    lines, splits = frame(b"x" * 150 + b"\nend\n", [], limit=64)
+    assert lines == ["x" * 64, "x" * 64, "x" * 22, "end"]
+    assert splits == 2
+
+
+def test_output_independent_of_chunking():
+    rng = random.Random(1)
+    parts = []
+    for _ in range(300):
+        line = bytes(rng.choice(b"abc xyz=0123456789") for _ in range(rng.choice([0, 5, 40, 63, 64, 65, 200])))
+        parts.append(line + rng.choice([b"\n", b"\r", b"\r\n"]))
+    stream = b"".join(parts) + b"partial"
+    expected = frame(stream, [len(stream)])
+    for _ in range(50):
+        sizes = [rng.randint(1, 300) for _ in range(len(stream) // 50)]
+        assert frame(stream, sizes) == expected
+    assert frame(stream, [1] * len(stream)) == expected
@@ -0,0 +1,100 @@
+import os
+import time
+
+import pytest
+
+from cocowatt.multiport import MultiCapture
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="needs a pty")
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def pairs():
+    from cocowatt.sim import PtyPair
+    pairs = [PtyPair(), PtyPair()]
+    yield pairs
+    for pair in pairs:
+        pair.close()
+
+
+@pytest.fixture
+def capture():
+    capture = MultiCapture()
+    entries = []
+    capture.add_listener(lambda batch, parsed: entries.extend(batch))
+    capture.entries = entries
+    yield capture
+    capture.close()
+
+
+def test_devices_stay_separate(capture, pairs):
+    a = capture.add(pairs[0].port, name="a")
+    b = capture.add(pairs[1].port, name="b")
+    for i in range(10):
+        pairs[0].write(f"ADC Volt: {i}\n".encode())
+        pairs[1].write(f"ADC Volt: {100 + i}\n".encode())
+    assert wait_for(lambda: len(capture.entries) == 20)
+    by_device = {name: [e['data'] for e in capture.entries if e['device'] == name] for name in "ab"}
+    assert by_device["a"] == [f"ADC Volt: {i}" for i in range(10)]
+    assert by_device["b"] == [f"ADC Volt: {100 + i}" for i in range(10)]
+    assert a.values["ADC Volt:"] == 9.0 and b.values["ADC Volt:"] == 109.0
+    assert list(a.history["ADC Volt:"].values) == list(range(10))
+    assert [e['data'] for e in b.recent] == by_device["b"]
+    snapshot = capture.snapshot()
+    assert snapshot["a"]["lines"] == 10 and snapshot["b"]["lines"] == 10
+
+
+def test_partial_line_is_flushed_per_device(capture, pairs):
+    capture.add(pairs[0].port, name="a")
+    capture.add(pairs[1].port, name="b")
+    pairs[1].write(b"no terminator")
+    assert wait_for(lambda: [(e['device'], e['data']) for e in capture.entries] == [("b", "no terminator")])
+
+
+def test_remove_while_running(capture, pairs):
+    a = capture.add(pairs[0].port, name="a")
+    capture.add(pairs[1].port, name="b")
+    pairs[0].write(b"a 1\n")
+    assert wait_for(lambda: len(capture.entries) == 1)
+    fd = a.fd
+    capture.remove("a")
+    assert "a" not in capture.devices
+    assert not a.conn.is_open and a.fd is None
+    assert fd not in capture.selector.get_map()
+    pairs[1].write(b"b 1\n")
+    assert wait_for(lambda: len(capture.entries) == 2)
+    assert capture.selector_thread.is_alive()
+    assert not any(e['data'].startswith("[ERROR]") for e in capture.entries)
+    capture.remove("a")  # Removing twice is a no-op
+    readded = capture.add(pairs[0].port, name="a")
+    pairs[0].write(b"a 2\n")
+    assert wait_for(lambda: len(capture.entries) == 3)
+    assert capture.entries[-1]['device'] == "a" and readded.lines_received == 1
+
+
+def test_duplicate_name(capture, pairs):
+    capture.add(pairs[0].port, name="a")
+    with pytest.raises(ValueError):
+        capture.add(pairs[1].port, name="a")
+
+
+def test_listener_errors_are_counted(capture, pairs, capsys):
+    def broken(batch, parsed):
+        raise RuntimeError("listener broke")
+
+    capture.add_listener(broken)
+    capture.add(pairs[0].port, name="a")
+    for i in range(3):
+        pairs[0].write(f"line {i}\n".encode())
+        assert wait_for(lambda: capture.listener_errors == i + 1)
+    assert len(capture.entries) == 3
+    assert capsys.readouterr().err.count("RuntimeError: listener broke") == 1
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from cocowatt.parser import PatternParser
+
+PATTERNS = ["ADC Volt:", "ADC Volt2:", "Temp"]
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("ADC Volt: 2.749", {"ADC Volt:": 2.749}),
+    ("ADC Volt: 2.5.", {"ADC Volt:": 2.5}),
+    ("ADC Volt: 5. done", {"ADC Volt:": 5.0}),
+    ("ADC Volt: 2.749.1", {}),
+    ("ADC Volt: 27491x", {"ADC Volt:": 27491.0}),
+    ("ADC Volt2: -1e-3, ADC Volt: .5", {"ADC Volt2:": -0.001, "ADC Volt:": 0.5}),
+    ("Temp=21.5 Temp=99", {"Temp": 21.5}),
+    ("ADC Volt: n/a", {}),
+])
+def test_parse(line, expected):
+    assert PatternParser(PATTERNS).parse(line) == expected
+
+
+def test_parse_many_matches_parse():
+    lines = ["ADC Volt: 1.5.", "noise", "ADC Volt2: 3 ADC Volt: 2.749.1", "Temp: 4.", "ADC Volt: 7"]
+    parser = PatternParser(PATTERNS)
+    many = parser.parse_many(lines)
+    for pattern in PATTERNS:
+        rows, values = many[pattern]
+        single = [(i, parser.parse(line)[pattern]) for i, line in enumerate(lines) if pattern in parser.parse(line)]
+        assert list(rows) == [i for i, _ in single]
+        assert np.array_equal(values, [v for _, v in single])
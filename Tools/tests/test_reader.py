@@ -0,0 +1,67 @@
+import os
+import time
+
+import pytest
+
+from cocowatt.engine import CaptureEngine, READER_MODES
+
+pytestmark = pytest.mark.skipif(os.name == "nt", reason="needs a pty")
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return condition()
+
+
+@pytest.fixture
+def pair():
+    from cocowatt.sim import PtyPair
+    with PtyPair() as pair:
+        yield pair
+
+
+@pytest.fixture(params=READER_MODES)
+def engine(request):
+    engine = CaptureEngine(reader_mode=request.param)
+    lines = []
+    engine.add_listener(lambda entries, parsed: lines.extend(e['data'] for e in entries))
+    engine.lines = lines
+    yield engine
+    engine.close()
+
+
+def test_reads_lines(engine, pair):
+    engine.open(pair.port)
+    for i in range(20):
+        pair.write(f"ADC Volt: {i}\r\n".encode())
+    assert wait_for(lambda: len(engine.lines) == 20)
+    assert engine.lines == [f"ADC Volt: {i}" for i in range(20)]
+    assert engine.parser_values["ADC Volt:"] == 19.0
+
+
+def test_partial_line_is_flushed(engine, pair):
+    engine.open(pair.port)
+    pair.write(b"no terminator")
+    assert wait_for(lambda: engine.lines == ["no terminator"])
+
+
+def test_reconnect(engine, pair):
+    engine.open(pair.port)
+    old_reader = engine.reader_thread
+    pair.write(b"before\n")
+    assert wait_for(lambda: engine.lines == ["before"])
+    engine.close()
+    if old_reader is not None:
+        assert not old_reader.is_alive()
+    engine.open(pair.port)
+    engine.open(pair.port)  # Reopening an open engine must not leave a second reader behind
+    for i in range(20):
+        pair.write(f"after {i}\n".encode())
+    assert wait_for(lambda: len(engine.lines) == 21)
+    time.sleep(0.2)
+    assert engine.lines == ["before"] + [f"after {i}" for i in range(20)]
+    assert not any(line.startswith("[ERROR]") for line in engine.lines)